@@ -0,0 +1,252 @@
+"""Memory benchmark for the in-memory product catalog.
+
+Fills a scratch database with synthetic products, then measures (with
+tracemalloc) what keeping the whole fleet resident costs as the compact
+ProductCatalog and as the tuple-per-product tag index it replaced, along
+with load, lookup and update times. The catalog is measured twice: with
+its dict indexes, and with the open-addressing tables of slot numbers it
+used before (OpenAddressingCatalog below), to show whether saving the
+per-product key objects is worth a hand-written hash table.
+
+    python -m benchmarks.bench_catalog --sizes 100000 --output catalog.json
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from array import array
+from datetime import datetime
+from pathlib import Path
+
+# Keep the import of modules.database away from the user's database
+os.environ.setdefault("HIDO_DB_PATH", os.path.join(tempfile.gettempdir(), "hido_bench_default.db"))
+
+from modules import database  # noqa: E402
+from modules.catalog import ProductCatalog  # noqa: E402
+from benchmarks.bench_database import CATEGORIES, time_operation  # noqa: E402
+
+DEFAULT_SIZES = (10_000, 100_000)
+STATUSES = ("Available", "Available", "Available", "Rented", "Maintenance")
+
+# Open-addressing table markers (anything >= 0 is a slot number)
+_EMPTY = -1
+_DELETED = -2
+# Tables are rebuilt (dropping deleted entries) past this fill ratio
+_MAX_LOAD = 0.6
+_MIN_TABLE_SIZE = 64
+# Fibonacci hashing for product ids: sequential ids would otherwise form
+# one long probe run
+_ID_HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+_HASH_BITS = 0xFFFFFFFFFFFFFFFF
+
+
+class OpenAddressingCatalog(ProductCatalog):
+    """ProductCatalog indexed by linear-probing tables of slot numbers.
+
+    Keys are read back from the packed columns, so no per-product key
+    objects are kept; what that saves over the dicts is what this
+    benchmark measures.
+    """
+
+    def _new_index(self, capacity):
+        size = _MIN_TABLE_SIZE
+        while size * _MAX_LOAD < capacity:
+            size *= 2
+        self._tag_table = array("i", [_EMPTY]) * size
+        self._id_table = array("i", [_EMPTY]) * size
+        # Filled or deleted entries (the same for both tables)
+        self._table_used = 0
+
+    def _probe(self, table, key_hash, matches):
+        """Return (index of the matching entry or -1, index to insert at)."""
+        mask = len(table) - 1
+        index = key_hash & mask
+        insert_at = -1
+        while True:
+            slot = table[index]
+            if slot == _EMPTY:
+                return -1, index if insert_at < 0 else insert_at
+            if slot == _DELETED:
+                if insert_at < 0:
+                    insert_at = index
+            elif matches(slot):
+                return index, index
+            index = (index + 1) & mask
+
+    def _probe_tag(self, tag_id):
+        tag_bytes = tag_id.encode("utf-8")
+        tags, ends = self._tags, self._tag_ends
+        return self._probe(self._tag_table, hash(tag_bytes), lambda slot: tags[
+            ends[slot - 1] if slot else 0:ends[slot]] == tag_bytes)
+
+    def _probe_id(self, product_id):
+        key_hash = ((product_id * _ID_HASH_MULTIPLIER) & _HASH_BITS) >> 32
+        return self._probe(self._id_table, key_hash, lambda slot: self._ids[slot] == product_id)
+
+    def _index(self, slot, tag_id, product_id):
+        if self._table_used + 1 > len(self._tag_table) * _MAX_LOAD:
+            # Rebuild bigger; that indexes every live slot, this one included
+            self._new_index((len(self._ids) - len(self._retired)) * 2)
+            for live_slot in self._live_slots():
+                self._insert(live_slot, self._tag(live_slot), self._ids[live_slot])
+        else:
+            self._insert(slot, tag_id, product_id)
+
+    def _insert(self, slot, tag_id, product_id):
+        _, tag_index = self._probe_tag(tag_id)
+        _, id_index = self._probe_id(product_id)
+        # A fresh entry (not a reused deleted one) raises the fill
+        if self._tag_table[tag_index] == _EMPTY or self._id_table[id_index] == _EMPTY:
+            self._table_used += 1
+        self._tag_table[tag_index] = slot
+        self._id_table[id_index] = slot
+
+    def _unindex(self, slot, tag_id, product_id):
+        id_index, _ = self._probe_id(product_id)
+        self._id_table[id_index] = _DELETED
+        tag_index, _ = self._probe_tag(tag_id)
+        if tag_index >= 0 and self._tag_table[tag_index] == slot:
+            self._tag_table[tag_index] = _DELETED
+
+    def _find_tag(self, tag_id):
+        index, _ = self._probe_tag(tag_id)
+        return self._tag_table[index] if index >= 0 else None
+
+    def _find_id(self, product_id):
+        index, _ = self._probe_id(product_id)
+        return self._id_table[index] if index >= 0 else None
+
+    def _index_memory_usage(self):
+        return sys.getsizeof(self._tag_table) + sys.getsizeof(self._id_table)
+
+
+def generate_products(count, seed=0):
+    rng = random.Random(seed)
+    conn = database.get_db_connection()
+    with conn:
+        conn.executemany("""
+            INSERT INTO products (name, tag_id, category, status, rental_type, rental_rate)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (
+            (f"{rng.choice(CATEGORIES)} {i:06d}", f"a55a{i:036x}", rng.choice(CATEGORIES),
+             rng.choice(STATUSES), rng.choice(("Per Day", "Per Hour")), rng.randint(50, 5000))
+            for i in range(1, count + 1)
+        ))
+
+
+def measure(build):
+    """Return (object, bytes still allocated by it, peak bytes while building, seconds).
+
+    Memory is traced on a first build; the time is that of a second,
+    untraced build (tracemalloc slows allocation-heavy code down a lot).
+    """
+    gc.collect()
+    tracemalloc.start()
+    built = build()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    started = time.perf_counter()
+    built = build()
+    seconds = time.perf_counter() - started
+    return built, current, peak, seconds
+
+
+def tuple_index():
+    # The previous representation: every row as a tuple, indexed twice
+    rows = database.get_db_connection().execute(
+        f"SELECT {database.PRODUCT_COLUMNS_SQL} FROM products").fetchall()
+    return {row[2]: row for row in rows}, {row[0]: row[2] for row in rows}
+
+
+def load_catalog(catalog_class, count):
+    cursor = database.get_db_connection().execute(
+        f"SELECT {database.PRODUCT_COLUMNS_SQL} FROM products ORDER BY id")
+    return catalog_class(cursor, capacity=count)
+
+
+def bench_catalog(catalog_class, count, tags, iterations, seed):
+    """Memory, load, lookup and update figures for one catalog implementation."""
+    catalog, catalog_bytes, catalog_peak, catalog_seconds = measure(
+        lambda: load_catalog(catalog_class, count))
+    rng = random.Random(seed + 2)
+    return {
+        "mb": round(catalog_bytes / 1e6, 2),
+        "peak_mb": round(catalog_peak / 1e6, 2),
+        "load_s": round(catalog_seconds, 3),
+        "bytes_per_product": round(catalog_bytes / count, 1),
+        "lookup_by_tag": time_operation(lambda i: catalog.by_tag(tags[i]), iterations),
+        # What a checkout/check-in costs the catalog: replace a product
+        "replace_product": time_operation(
+            lambda i: catalog.put(catalog.get(rng.randint(1, count))), iterations),
+    }
+
+
+def run_size(count, iterations, workdir, seed=0):
+    path = Path(workdir) / f"bench_catalog_{count}.db"
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(f"{path}{suffix}"):
+            os.remove(f"{path}{suffix}")
+    database.use_database(path)
+    generate_products(count, seed)
+
+    rng = random.Random(seed + 1)
+    tags = [f"a55a{rng.randint(1, count):036x}" for _ in range(iterations)]
+
+    index, index_bytes, index_peak, index_seconds = measure(tuple_index)
+    del index
+    catalog = bench_catalog(ProductCatalog, count, tags, iterations, seed)
+    open_addressing = bench_catalog(OpenAddressingCatalog, count, tags, iterations, seed)
+
+    results = {
+        "products": count,
+        "tuple_index_mb": round(index_bytes / 1e6, 2),
+        "tuple_index_peak_mb": round(index_peak / 1e6, 2),
+        "tuple_index_load_s": round(index_seconds, 3),
+        "catalog": catalog,
+        "open_addressing_catalog": open_addressing,
+        # The same update through the database, as _reindex_product does it
+        "update_product_status": time_operation(
+            lambda i: database.update_product_status(rng.randint(1, count), "Available"), iterations),
+    }
+    print(f"{count:>9} products: tuple index {results['tuple_index_mb']:>7} MB")
+    for label, figures in (("catalog (dicts)", catalog), ("open addressing", open_addressing)):
+        print(f"{'':>19}{label:<16} {figures['mb']:>7} MB "
+              f"(peak {figures['peak_mb']} MB, load {figures['load_s']} s), "
+              f"lookup p50 {figures['lookup_by_tag']['p50_us']} us, "
+              f"update p50/p95 {figures['replace_product']['p50_us']}/"
+              f"{figures['replace_product']['p95_us']} us")
+
+    database.close_all_connections()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the memory use of the product catalog.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help="numbers of products to generate")
+    parser.add_argument("--iterations", type=int, default=1000, help="timed lookups per size")
+    parser.add_argument("--output", default="bench_catalog.json", help="JSON results file")
+    parser.add_argument("--workdir", default=tempfile.gettempdir(), help="where scratch databases go")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "results": [run_size(count, args.iterations, args.workdir, args.seed)
+                    for count in args.sizes],
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
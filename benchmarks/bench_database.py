@@ -0,0 +1,190 @@
+"""Scale benchmarks for modules/database.py.
+
+Fills a scratch database with synthetic products and rentals at each
+size, times the database operations the application uses, and writes the
+results as JSON so runs can be compared.
+
+    python -m benchmarks.bench_database --sizes 10000 100000 1000000 --output bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Keep the import of modules.database away from the user's database
+os.environ.setdefault("HIDO_DB_PATH", os.path.join(tempfile.gettempdir(), "hido_bench_default.db"))
+
+from modules import database  # noqa: E402
+
+DEFAULT_SIZES = (10_000, 100_000, 1_000_000)
+CATEGORIES = ["Excavator", "Generator", "Compressor", "Mixer", "Drill", "Scaffold", "Pump", "Lift"]
+# Share of products that currently have an open rental
+OPEN_RENTAL_RATIO = 0.02
+INSERT_CHUNK = 50_000
+
+
+def generate_data(size, seed=0):
+    """Fill the current database with ``size`` rentals over ``size // 10`` products."""
+    rng = random.Random(seed)
+    conn = database.get_db_connection()
+    product_count = max(100, size // 10)
+    open_count = int(product_count * OPEN_RENTAL_RATIO)
+
+    with conn:
+        conn.executemany("""
+            INSERT INTO products (name, tag_id, category, status, rental_type, rental_rate)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (
+            (f"Machine {i}", f"a55a{i:036x}", rng.choice(CATEGORIES),
+             "Rented" if i <= open_count else "Available",
+             rng.choice(("Per Day", "Per Hour")), rng.randint(50, 5000))
+            for i in range(1, product_count + 1)
+        ))
+
+    start = datetime(2015, 1, 1)
+    step = timedelta(minutes=5)
+
+    def rentals(first, last):
+        for i in range(first, last):
+            start_time = start + step * i
+            # The last rental of each of the first `open_count` products is open
+            if i >= size - open_count:
+                product_id = i - (size - open_count) + 1
+                end_time, cost = None, 0
+            else:
+                product_id = rng.randint(open_count + 1, product_count)
+                end_time = (start_time + timedelta(hours=rng.randint(1, 72))).strftime("%Y-%m-%d %H:%M:%S")
+                cost = rng.randint(100, 20000)
+            yield (product_id, f"Customer {i % 5000}", f"9{i % 1000000000:09d}", None,
+                   f"KL-{i % 100:02d}-{i % 10000:04d}", "Yard", "Per Day", rng.randint(1, 7),
+                   cost, start_time.strftime("%Y-%m-%d %H:%M:%S"), end_time)
+
+    for first in range(0, size, INSERT_CHUNK):
+        with conn:
+            conn.executemany("""
+                INSERT INTO rentals (product_id, customer_name, phone, email, vehicle, place,
+                                     rental_type, rental_duration, total_cost, start_time, end_time)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, rentals(first, min(size, first + INSERT_CHUNK)))
+    conn.execute("ANALYZE")
+    return product_count
+
+
+def time_operation(func, iterations):
+    samples = []
+    for i in range(iterations):
+        started = time.perf_counter()
+        func(i)
+        samples.append((time.perf_counter() - started) * 1e6)
+    samples.sort()
+    return {
+        "iterations": iterations,
+        "mean_us": round(statistics.fmean(samples), 1),
+        "p50_us": round(samples[len(samples) // 2], 1),
+        "p95_us": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 1),
+        "max_us": round(samples[-1], 1),
+    }
+
+
+def run_size(size, iterations, workdir, seed=0):
+    path = Path(workdir) / f"bench_{size}.db"
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(f"{path}{suffix}"):
+            os.remove(f"{path}{suffix}")
+    database.use_database(path)
+
+    started = time.perf_counter()
+    product_count = generate_data(size, seed)
+    generate_seconds = time.perf_counter() - started
+
+    rng = random.Random(seed + 1)
+    open_count = int(product_count * OPEN_RENTAL_RATIO)
+    tags = [f"a55a{rng.randint(1, product_count):036x}" for _ in range(iterations)]
+    product_ids = [rng.randint(1, product_count) for _ in range(iterations)]
+    available_ids = rng.sample(range(open_count + 1, product_count + 1), min(iterations, product_count - open_count))
+
+    # A keyset from the middle of the history for a deep page
+    conn = database.get_db_connection()
+    middle = conn.execute(
+        "SELECT start_time, id FROM rentals ORDER BY start_time DESC, id DESC LIMIT 1 OFFSET ?",
+        (size // 2,)).fetchone()
+    # The application loads the product catalog at startup, before any scan
+    database.get_catalog()
+
+    def checkout_and_return(i):
+        product_id = available_ids[i % len(available_ids)]
+        rental_id = database.checkout(product_id, "Bench", "9000000000", None, "KL-00", "Yard", 1)
+        database.checkin(rental_id, 100.0)
+
+    def legacy_history(_):
+        # The unpaged join the Rental Flow tab used to load
+        conn.execute("""
+            SELECT rentals.id, rentals.customer_name, rentals.phone, products.name,
+                   rentals.rental_type, rentals.place, rentals.rental_duration,
+                   rentals.start_time, rentals.end_time, rentals.total_cost
+            FROM rentals
+            INNER JOIN products ON rentals.product_id = products.id
+        """).fetchall()
+
+    operations = {
+        "add_product": (lambda i: database.add_product(
+            f"Bench {i}", f"bench-{size}-{i}", "Bench", "Available", "Per Day", 100), iterations),
+        "fetch_product_by_tag": (lambda i: database.fetch_product_by_tag(tags[i]), iterations),
+        "lookup_product_by_tag": (lambda i: database.lookup_product_by_tag(tags[i]), iterations),
+        "fetch_active_rental": (lambda i: database.fetch_active_rental(product_ids[i]), iterations),
+        "checkout_and_checkin": (checkout_and_return, iterations),
+        "rental_history_first_page": (lambda i: database.fetch_rental_history_page(), iterations),
+        "rental_history_deep_page": (lambda i: database.fetch_rental_history_page(middle), iterations),
+        "rental_history_full_join": (legacy_history, max(1, iterations // 100)),
+    }
+
+    results = []
+    for name, (func, count) in operations.items():
+        result = time_operation(func, count)
+        result.update({"size": size, "operation": name})
+        results.append(result)
+        print(f"{size:>9} {name:<28} p50 {result['p50_us']:>12} us  p95 {result['p95_us']:>12} us")
+
+    database.close_all_connections()
+    return {"size": size, "products": product_count, "generate_seconds": round(generate_seconds, 2)}, results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the rental database layer at scale.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help="numbers of rentals to generate")
+    parser.add_argument("--iterations", type=int, default=200, help="timed calls per operation")
+    parser.add_argument("--output", default="bench_output.json", help="JSON results file")
+    parser.add_argument("--workdir", default=tempfile.gettempdir(), help="where scratch databases go")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    datasets, results = [], []
+    for size in args.sizes:
+        dataset, size_results = run_size(size, args.iterations, args.workdir, args.seed)
+        datasets.append(dataset)
+        results.extend(size_results)
+
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "datasets": datasets,
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
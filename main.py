@@ -1,20 +1,132 @@
-import tkinter as tk
-from ttkbootstrap import Style
+import time
 
-# Import modules
-from modules.ui import create_ui
+_process_start = time.perf_counter()
+
+import argparse
+import threading
 
 # Initialize the application
 
 
-def main():
+class StartupTimer:
+    """Records how long each startup stage took, for the startup report."""
+
+    def __init__(self, started=None):
+        self.started = time.perf_counter() if started is None else started
+        self.last = self.started
+        self.stages = []  # (stage, stage seconds, seconds since start)
+
+    def mark(self, stage):
+        now = time.perf_counter()
+        self.stages.append((stage, now - self.last, now - self.started))
+        self.last = now
+
+    def report(self):
+        lines = ["Startup timing:"]
+        for stage, took, elapsed in self.stages:
+            lines.append(f"  {stage:<22} {took * 1000:8.1f} ms  (at {elapsed * 1000:8.1f} ms)")
+        return "\n".join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="HiDo Machinery Rental Management System")
+    parser.add_argument("--rebuild-summaries", action="store_true",
+                        help="recompute the daily rental summary tables and exit")
+    parser.add_argument("--headless", action="store_true",
+                        help="run the rental service (database, RFID readers, local API) without the UI")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="address the headless service listens on "
+                             "(the API has no authentication; keep it local)")
+    parser.add_argument("--port", type=int, default=8765,
+                        help="port the headless service listens on")
+    parser.add_argument("--no-rfid", action="store_true",
+                        help="don't open RFID readers in headless mode")
+    parser.add_argument("--service", metavar="URL",
+                        help="run the UI as a client of the rental service at URL (e.g. "
+                             "http://127.0.0.1:8765): tag scans, lookups, checkouts and "
+                             "check-ins go through the service (default: $HIDO_SERVICE_URL)")
+    parser.add_argument("--metrics", action="store_true",
+                        help="collect timing metrics from the start (see Tools > Diagnostics)")
+    parser.add_argument("--metrics-dump", metavar="FILE",
+                        help="write the collected metrics to FILE on exit (.json or text)")
+    parser.add_argument("--startup-report", metavar="FILE",
+                        help="also append the startup timing report to FILE")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    timer = StartupTimer(_process_start)
+    args = parse_args(argv)
+
+    from modules import metrics
+    if args.metrics or args.metrics_dump:
+        metrics.enable()
+    try:
+        run(args, timer)
+    finally:
+        if args.metrics_dump:
+            metrics.dump(args.metrics_dump)
+            print(f"Metrics written to {args.metrics_dump}")
+
+
+def run(args, timer):
+    if args.rebuild_summaries:
+        from modules.database import rebuild_rental_summaries
+        rows = rebuild_rental_summaries()
+        print(f"Rebuilt rental summaries: {rows} rows")
+        return
+
+    if args.headless:
+        from modules.service import run_service
+        run_service(args.host, args.port, use_rfid=not args.no_rfid)
+        return
+
+    # Import modules
+    from ttkbootstrap import Style
+    timer.mark("toolkit import")
+    from modules.ui import create_ui
+    from modules.service_client import configured_service_url
+    timer.mark("application import")
+
     style = Style(theme="superhero")
     root = style.master
     root.title("HiDo Machinery Rental Management System")
     root.geometry("800x600")
+    timer.mark("window created")
 
     # Call the UI creation function
-    create_ui(root)
+    create_ui(root, service_url=args.service or configured_service_url())
+    timer.mark("ui built")
+
+    def write_report():
+        report = timer.report()
+        print(report)
+        if args.startup_report:
+            with open(args.startup_report, "a", encoding="utf-8") as f:
+                f.write(report + "\n")
+
+    # Open and migrate the database off the UI thread once the window is
+    # showing, so the first scan doesn't pay for it
+    def prepare_database():
+        from modules.database import initialize_db, get_catalog
+        from modules.scan_journal import start_journal
+        try:
+            initialize_db()
+            timer.mark("database ready")
+            start_journal()
+            # Load the product catalog before the first scan needs it
+            get_catalog()
+            timer.mark("catalog loaded")
+        except Exception as e:
+            print(f"Database initialization failed: {e}")
+        write_report()
+
+    def on_first_frame():
+        timer.mark("first frame")
+        threading.Thread(target=prepare_database, daemon=True).start()
+
+    root.after_idle(lambda: root.after(0, on_first_frame))
 
     root.mainloop()
 
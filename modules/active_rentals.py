@@ -0,0 +1,90 @@
+import threading
+from datetime import datetime, timezone
+
+from .database import fetch_open_rentals, add_rental_listener, remove_rental_listener
+from .pricing import SECONDS_PER_UNIT, accrued_costs, parse_db_timestamp
+from .utils import format_times_to_ist
+
+
+class ActiveRental:
+    """One machine currently on hire."""
+    __slots__ = ("rental_id", "product_id", "product_name", "customer_name", "phone",
+                 "start_time", "rental_type", "rental_rate", "due_at",
+                 "start_display", "due_display")
+
+    def __init__(self, row):
+        (self.rental_id, self.product_id, self.product_name, self.customer_name,
+         self.phone, self.start_time, self.rental_type, self.rental_rate,
+         rental_duration) = row
+        seconds_per_unit = SECONDS_PER_UNIT.get(self.rental_type, 0)
+        self.due_at = parse_db_timestamp(self.start_time) + (rental_duration or 0) * seconds_per_unit
+        due_time = datetime.fromtimestamp(self.due_at, timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        # Display strings are fixed for the life of the rental; format them once
+        self.start_display, self.due_display = format_times_to_ist((self.start_time, due_time))
+
+
+class ActiveRentalsView:
+    """In-memory view of the rentals that are currently open.
+
+    Seeded with one query, then kept current from the database layer's
+    checkout/checkin events, so reading it never touches the database.
+    """
+
+    def __init__(self):
+        self._rentals = {}  # rental_id -> ActiveRental
+        self._lock = threading.Lock()
+        self._listening = False
+        # While seed() runs its query: (rentals opened, rental ids closed)
+        self._seeding = None
+
+    def seed(self):
+        """Start following checkout/checkin events and load the open rentals.
+
+        The listener goes in first, so nothing committed while the query
+        runs is missed; events seen meanwhile are merged over its result.
+        """
+        with self._lock:
+            self._seeding = ({}, set())
+        if not self._listening:
+            add_rental_listener(self._on_rental_event)
+            self._listening = True
+        try:
+            rentals = {row[0]: ActiveRental(row) for row in fetch_open_rentals()}
+        except Exception:
+            with self._lock:
+                self._seeding = None
+            raise
+        with self._lock:
+            opened, closed = self._seeding
+            self._seeding = None
+            rentals.update(opened)
+            for rental_id in closed:
+                rentals.pop(rental_id, None)
+            self._rentals = rentals
+
+    def close(self):
+        if self._listening:
+            remove_rental_listener(self._on_rental_event)
+            self._listening = False
+
+    def _on_rental_event(self, event, data):
+        with self._lock:
+            if event == "checkout" and data:
+                rental = self._rentals[data[0]] = ActiveRental(data)
+                if self._seeding is not None:
+                    self._seeding[0][data[0]] = rental
+            elif event == "checkin":
+                self._rentals.pop(data, None)
+                if self._seeding is not None:
+                    self._seeding[1].add(data)
+
+    def __len__(self):
+        return len(self._rentals)
+
+    def snapshot(self, now=None):
+        """Return [(ActiveRental, accrued_cost)] ordered by due time."""
+        with self._lock:
+            rentals = sorted(self._rentals.values(), key=lambda rental: rental.due_at)
+        costs = accrued_costs(
+            ((r.rental_id, r.start_time, r.rental_type, r.rental_rate) for r in rentals), now)
+        return [(rental, costs[rental.rental_id]) for rental in rentals]
@@ -0,0 +1,120 @@
+import csv
+import json
+import sys
+from itertools import islice
+
+from .database import get_db_connection, reset_catalog
+
+# Rows per duplicate check / executemany batch (kept under SQLite's
+# 999-parameter limit for the IN (...) lookup)
+IMPORT_CHUNK_SIZE = 500
+RENTAL_TYPES = ("Per Day", "Per Hour")
+
+
+def read_product_records(path):
+    """Yield (line_number, record) pairs from a CSV (with header) or JSONL file."""
+    if str(path).lower().endswith((".jsonl", ".ndjson")):
+        with open(path, encoding="utf-8") as f:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    record = {"_error": f"Invalid JSON: {e}"}
+                if not isinstance(record, dict):
+                    record = {"_error": "Expected a JSON object."}
+                yield line_number, record
+    else:
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            # Line 1 is the header
+            for line_number, record in enumerate(csv.DictReader(f), start=2):
+                yield line_number, record
+
+
+def _validate(record):
+    """Return (row, None) for a valid record or (None, reason)."""
+    if "_error" in record:
+        return None, record["_error"]
+    name = str(record.get("name") or "").strip()
+    tag_id = str(record.get("tag_id") or record.get("tag") or "").strip()
+    if not name or not tag_id:
+        return None, "Product Name and RFID Tag are required."
+    rental_type = str(record.get("rental_type") or "Per Day").strip()
+    if rental_type not in RENTAL_TYPES:
+        return None, f"Unknown rental type: {rental_type}"
+    try:
+        rental_rate = float(record.get("rental_rate") or 0)
+    except (TypeError, ValueError):
+        return None, "Rental Rate must be a number."
+    category = str(record.get("category") or "").strip()
+    status = str(record.get("status") or "Available").strip()
+    return (name, tag_id, category, status, rental_type, rental_rate), None
+
+
+def import_products(path, chunk_size=IMPORT_CHUNK_SIZE):
+    """Import products from a CSV or JSONL file in a single transaction.
+
+    Records are streamed in chunks; duplicate tags (within the file or
+    already registered) are found with one set-based query per chunk and
+    valid rows are inserted with executemany. Returns a dict with the
+    number of imported products and the rejected rows as
+    (line_number, tag_id, reason) tuples.
+    """
+    conn = get_db_connection()
+    records = read_product_records(path)
+    seen_tags = set()
+    imported = 0
+    rejected = []
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        while True:
+            chunk = list(islice(records, chunk_size))
+            if not chunk:
+                break
+
+            valid = []
+            for line_number, record in chunk:
+                row, reason = _validate(record)
+                if reason:
+                    rejected.append((line_number, record.get("tag_id"), reason))
+                elif row[1] in seen_tags:
+                    rejected.append((line_number, row[1], "Duplicate RFID tag in file."))
+                else:
+                    seen_tags.add(row[1])
+                    valid.append((line_number, row))
+
+            if valid:
+                placeholders = ",".join("?" * len(valid))
+                existing = {tag for (tag,) in conn.execute(
+                    f"SELECT tag_id FROM products WHERE tag_id IN ({placeholders})",
+                    [row[1] for _, row in valid])}
+                rows = []
+                for line_number, row in valid:
+                    if row[1] in existing:
+                        rejected.append(
+                            (line_number, row[1], "A product with this RFID tag already exists."))
+                    else:
+                        rows.append(row)
+                conn.executemany("""
+                    INSERT INTO products (name, tag_id, category, status, rental_type, rental_rate)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, rows)
+                imported += len(rows)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    if imported:
+        reset_catalog()
+    return {"imported": imported, "rejected": rejected}
+
+
+if __name__ == "__main__":
+    # Usage: python -m modules.bulk_import products.csv
+    report = import_products(sys.argv[1])
+    print(f"Imported {report['imported']} products, rejected {len(report['rejected'])}.")
+    for line_number, tag_id, reason in report["rejected"]:
+        print(f"  line {line_number} ({tag_id}): {reason}")
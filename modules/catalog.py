@@ -0,0 +1,261 @@
+"""Compact in-memory product catalog.
+
+The whole fleet is kept resident for RFID lookups, so products are stored
+column-wise instead of as one tuple (and a dozen objects) each:
+
+- ids and rental rates in flat arrays,
+- category, status and rental type as small integer codes into tables of
+  interned strings,
+- names and tags packed as UTF-8 into two byte buffers with end offsets,
+- tag -> slot and id -> slot lookups as two dicts.
+
+Slots are append-only: updating a product appends a new slot and retires
+the old one (see ``_retired``), and the columns are compacted once enough
+slots are retired. Reads hand out Product records built on demand. Every
+public method holds the catalog's lock, so scans can read while other
+threads write.
+
+benchmarks/bench_catalog.py compares the dicts with open-addressing
+tables of slot numbers (no per-product key objects).
+"""
+import sys
+import threading
+from array import array
+
+# Columns are rebuilt without retired slots once those outnumber live ones
+_MIN_RETIRED_TO_COMPACT = 1024
+
+
+class Product:
+    """One product, as handed out by the catalog."""
+    __slots__ = ("id", "name", "tag_id", "category", "status", "rental_type", "rental_rate")
+
+    def __init__(self, id, name, tag_id, category, status, rental_type, rental_rate):
+        self.id = id
+        self.name = name
+        self.tag_id = tag_id
+        self.category = category
+        self.status = status
+        self.rental_type = rental_type
+        self.rental_rate = rental_rate
+
+    @classmethod
+    def from_row(cls, row):
+        """Build from a (id, name, tag_id, category, status, rental_type, rental_rate) row."""
+        return cls(*row)
+
+    def values(self):
+        """The product as a row, in the column order used by the products table."""
+        return (self.id, self.name, self.tag_id, self.category, self.status,
+                self.rental_type, self.rental_rate)
+
+    def __eq__(self, other):
+        return isinstance(other, Product) and self.values() == other.values()
+
+    def __repr__(self):
+        return f"Product({self.id}, {self.name!r}, tag={self.tag_id!r}, status={self.status!r})"
+
+
+class _StringTable:
+    """Interned strings and their small integer codes."""
+    __slots__ = ("values", "codes")
+
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def code(self, value):
+        value = "" if value is None else value
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(sys.intern(value))
+        return code
+
+
+class ProductCatalog:
+    """All products, column-wise."""
+
+    def __init__(self, rows=(), capacity=0):
+        self._lock = threading.Lock()
+        self._categories = _StringTable()
+        self._statuses = _StringTable()
+        self._rental_types = _StringTable()
+        self.load(rows, capacity)
+
+    def _reset(self, capacity=0):
+        self._ids = array("q")
+        self._rates = array("d")
+        self._category_codes = array("H")
+        self._status_codes = array("B")
+        self._rental_type_codes = array("B")
+        self._names = bytearray()
+        self._name_ends = array("I")
+        self._tags = bytearray()
+        self._tag_ends = array("I")
+        # Slots replaced by a newer one or removed
+        self._retired = set()
+        self._new_index(capacity)
+
+    def load(self, rows, capacity=0):
+        """Replace the contents with ``rows`` (product rows or Product records).
+
+        ``capacity`` is the expected number of products, if known, for
+        indexes that can be sized up front.
+        """
+        with self._lock:
+            self._reset(capacity)
+            for row in rows:
+                self._append(row.values() if isinstance(row, Product) else row)
+
+    # --- Packed columns -------------------------------------------------
+
+    def _name(self, slot):
+        start = self._name_ends[slot - 1] if slot else 0
+        return self._names[start:self._name_ends[slot]].decode("utf-8")
+
+    def _tag(self, slot):
+        start = self._tag_ends[slot - 1] if slot else 0
+        return self._tags[start:self._tag_ends[slot]].decode("utf-8")
+
+    def _record(self, slot):
+        return Product(
+            self._ids[slot],
+            self._name(slot),
+            self._tag(slot),
+            self._categories.values[self._category_codes[slot]],
+            self._statuses.values[self._status_codes[slot]],
+            self._rental_types.values[self._rental_type_codes[slot]],
+            self._rates[slot],
+        )
+
+    def _live_slots(self):
+        retired = self._retired
+        return [slot for slot in range(len(self._ids)) if slot not in retired]
+
+    # --- Indexes (tag -> slot, id -> slot) --------------------------------
+
+    def _new_index(self, capacity):
+        self._slot_by_tag = {}
+        self._slot_by_id = {}
+
+    def _index(self, slot, tag_id, product_id):
+        self._slot_by_tag[tag_id] = slot
+        self._slot_by_id[product_id] = slot
+
+    def _unindex(self, slot, tag_id, product_id):
+        if self._slot_by_tag.get(tag_id) == slot:
+            del self._slot_by_tag[tag_id]
+        del self._slot_by_id[product_id]
+
+    def _find_tag(self, tag_id):
+        """The live slot holding ``tag_id``, or None."""
+        return self._slot_by_tag.get(tag_id)
+
+    def _find_id(self, product_id):
+        """The live slot holding ``product_id``, or None."""
+        return self._slot_by_id.get(product_id)
+
+    # --- Writes ---------------------------------------------------------
+
+    def _append(self, row):
+        product_id, name, tag_id, category, status, rental_type, rental_rate = row
+        live = len(self._ids) - len(self._retired)
+        if len(self._retired) > max(_MIN_RETIRED_TO_COMPACT, live):
+            self._compact()
+        tag_id = tag_id or ""
+        slot = len(self._ids)
+        self._ids.append(product_id)
+        self._rates.append(rental_rate or 0)
+        self._category_codes.append(self._categories.code(category))
+        self._status_codes.append(self._statuses.code(status))
+        self._rental_type_codes.append(self._rental_types.code(rental_type))
+        self._names += (name or "").encode("utf-8")
+        self._name_ends.append(len(self._names))
+        self._tags += tag_id.encode("utf-8")
+        self._tag_ends.append(len(self._tags))
+        self._index(slot, tag_id, product_id)
+
+    def _retire(self, product_id):
+        slot = self._find_id(product_id)
+        if slot is None:
+            return False
+        self._unindex(slot, self._tag(slot), product_id)
+        self._retired.add(slot)
+        return True
+
+    def _compact(self):
+        # Rebuild the columns from the live slots, dropping retired ones
+        rows = [self._record(slot).values() for slot in self._live_slots()]
+        self._reset(len(rows) * 2)
+        for row in rows:
+            self._append(row)
+
+    def put(self, row):
+        """Insert or replace a product from a row or Product record."""
+        if isinstance(row, Product):
+            row = row.values()
+        with self._lock:
+            self._retire(row[0])
+            # Another product may still hold the tag (tags are unique in the
+            # database, so it is being renamed in the same batch); the newer row wins
+            slot = self._find_tag(row[2] or "")
+            if slot is not None:
+                self._retire(self._ids[slot])
+            self._append(row)
+
+    def remove(self, product_id):
+        """Drop a product; returns whether it was present."""
+        with self._lock:
+            return self._retire(product_id)
+
+    # --- Reads ----------------------------------------------------------
+
+    def by_tag(self, tag_id):
+        """Return the Product with this RFID tag, or None."""
+        with self._lock:
+            slot = self._find_tag(tag_id or "")
+            return self._record(slot) if slot is not None else None
+
+    def get(self, product_id):
+        """Return the Product with this id, or None."""
+        with self._lock:
+            slot = self._find_id(product_id)
+            return self._record(slot) if slot is not None else None
+
+    def __len__(self):
+        return len(self._ids) - len(self._retired)
+
+    def __contains__(self, product_id):
+        with self._lock:
+            return self._find_id(product_id) is not None
+
+    def __iter__(self):
+        """Products in the order they were added or last updated.
+
+        Iterates over a snapshot taken when iteration starts.
+        """
+        with self._lock:
+            products = [self._record(slot) for slot in self._live_slots()]
+        return iter(products)
+
+    def memory_usage(self):
+        """Approximate bytes held by the catalog's buffers, indexes and string tables."""
+        with self._lock:
+            return self._memory_usage()
+
+    def _memory_usage(self):
+        buffers = (self._ids, self._rates, self._category_codes, self._status_codes,
+                   self._rental_type_codes, self._names, self._name_ends, self._tags,
+                   self._tag_ends, self._retired)
+        total = sum(sys.getsizeof(buffer) for buffer in buffers)
+        total += self._index_memory_usage()
+        for table in (self._categories, self._statuses, self._rental_types):
+            total += sys.getsizeof(table.values) + sys.getsizeof(table.codes)
+            total += sum(sys.getsizeof(value) for value in table.values)
+        return total
+
+    def _index_memory_usage(self):
+        # The dicts and their tag keys; the int keys and values are not counted
+        return (sys.getsizeof(self._slot_by_tag) + sys.getsizeof(self._slot_by_id)
+                + sum(sys.getsizeof(tag) for tag in self._slot_by_tag))
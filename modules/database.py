@@ -1,76 +1,239 @@
+import json
 import os
+import re
 import shutil
 from pathlib import Path
 import sqlite3
 import sys
+import threading
+import time
+
+from .catalog import Product, ProductCatalog
+from .metrics import timed
+from .migrations import run_migrations
+
+
+# HIDO_DB_PATH points the application at another database file
+# (benchmarks, test setups); otherwise the bundled database is copied to a
+# persistent location. Nothing is resolved or touched until the first query.
+DB_PATH_ENV = "HIDO_DB_PATH"
+
+db_path = None
+_db_ready = False
+_init_lock = threading.Lock()
+
+
+def _default_db_path():
+    if os.environ.get(DB_PATH_ENV):
+        return Path(os.environ[DB_PATH_ENV])
+
+    # Get the bundled database location (PyInstaller runtime fix)
+    if getattr(sys, 'frozen', False):
+        # Running in PyInstaller bundle
+        bundled_db_path = os.path.join(sys._MEIPASS, "db/rental.db")
+    else:
+        # Running in development
+        bundled_db_path = "db/rental.db"
+
+    # Copy the database to a persistent location
+    user_home = Path.home()
+    db_dir = user_home / "HiDoAppData"
+    db_dir.mkdir(exist_ok=True)
+    persistent_path = db_dir / "rental.db"
+
+    if not persistent_path.exists():
+        shutil.copy(bundled_db_path, persistent_path)
+    return persistent_path
+
+
+# Connection manager: every thread keeps one persistent connection to the
+# persistent database instead of opening and closing one per query.
+STATEMENT_CACHE_SIZE = 256
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-8000",
+)
+
+_local = threading.local()
+_connections = []
+_connections_lock = threading.Lock()
+# Bumped by close_all_connections() so threads drop their closed connection
+_generation = 0
+
+
+def _open_connection():
+    conn = sqlite3.connect(
+        db_path,
+        timeout=5,
+        cached_statements=STATEMENT_CACHE_SIZE,
+        check_same_thread=False,
+    )
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    return conn
 
 
-# Get the bundled database location (PyInstaller runtime fix)
-if getattr(sys, 'frozen', False):
-    # Running in PyInstaller bundle
-    bundled_db_path = os.path.join(sys._MEIPASS, "db/rental.db")
-else:
-    # Running in development
-    bundled_db_path = "db/rental.db"
+@timed("db.get_db_connection")
+def get_db_connection():
+    """Return the calling thread's persistent connection, opening it on first use."""
+    if not _db_ready:
+        _ensure_initialized()
+    conn = getattr(_local, "conn", None)
+    if conn is None or _local.generation != _generation:
+        conn = _open_connection()
+        _local.conn = conn
+        _local.generation = _generation
+        with _connections_lock:
+            _connections.append(conn)
+    return conn
+
+
+@timed("db.close_db_connection")
+def close_db_connection():
+    """Close the calling thread's connection (e.g. when a worker thread exits)."""
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        _local.conn = None
+        with _connections_lock:
+            if conn in _connections:
+                _connections.remove(conn)
+        conn.close()
 
-# Copy the database to a persistent location
-user_home = Path.home()
-db_dir = user_home / "HiDoAppData"
-db_dir.mkdir(exist_ok=True)
-db_path = db_dir / "rental.db"
 
-if not db_path.exists():
-    shutil.copy(bundled_db_path, db_path)
+@timed("db.close_all_connections")
+def close_all_connections():
+    """Close every connection opened by the manager. Called on application exit.
+
+    Threads that query again afterwards transparently open a new connection.
+    """
+    global _generation
+    with _connections_lock:
+        connections = list(_connections)
+        _connections.clear()
+        _generation += 1
+    for conn in connections:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+    _local.conn = None
+
+
+@timed("db.use_database")
+def use_database(path):
+    """Switch every subsequent query to the database at ``path`` and migrate it."""
+    global db_path, _search_indexed
+    close_all_connections()
+    db_path = Path(path)
+    reset_catalog()
+    _search_indexed = None
+    return initialize_db()
+
+
+@timed("db.initialize_db")
+def initialize_db():
+    """Create or upgrade the schema to the latest migration."""
+    global db_path, _db_ready
+    with _init_lock:
+        if db_path is None:
+            db_path = _default_db_path()
+        conn = _open_connection()
+        try:
+            version = run_migrations(conn)
+        finally:
+            conn.close()
+        _db_ready = True
+    return version
+
+
+def _ensure_initialized():
+    # Runs the database setup once, on the first query of the process
+    with _init_lock:
+        if _db_ready:
+            return
+    initialize_db()
+
+
+# In-memory catalog of every product, used for RFID scans and the product
+# table. Built on the first use and kept in step by the product write
+# functions below (and by fetch_product_changes for other writers).
+# _catalog_lock is held while the catalog is loaded and while it is
+# updated, so a write that lands during a load waits for it and is then
+# applied, instead of being missed by both.
+_catalog = None
+_catalog_lock = threading.Lock()
+
+PRODUCT_COLUMNS_SQL = "id, name, tag_id, category, status, rental_type, rental_rate"
+
+
+def _fetch_product_row(product_id):
+    cursor = get_db_connection().execute(f"""
+        SELECT {PRODUCT_COLUMNS_SQL}
+        FROM products
+        WHERE id = ?
+    """, (product_id,))
+    return cursor.fetchone()
 
-# Function to return a connection to the persistent database
 
+def _reindex_product(product_id):
+    """Refresh one product in the catalog after it was written."""
+    with _catalog_lock:
+        if _catalog is None:
+            return
+        row = _fetch_product_row(product_id)
+        if row:
+            _catalog.put(row)
+        else:
+            _catalog.remove(product_id)
 
-def get_db_connection():
-    return sqlite3.connect(db_path)
 
+@timed("db.rebuild_catalog")
+def rebuild_catalog():
+    """(Re)load the product catalog from the products table."""
+    with _catalog_lock:
+        return _load_catalog()
 
-def initialize_db():
-    conn = sqlite3.connect("db/rental.db")
-    cursor = conn.cursor()
 
-    # Create the products table
-    cursor.execute("""
-    CREATE TABLE IF NOT EXISTS products (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT NOT NULL,
-        tag_id TEXT UNIQUE NOT NULL,
-        category TEXT,
-        status TEXT DEFAULT 'Available',
-        rental_type TEXT DEFAULT 'Per Day',
-        rental_rate REAL DEFAULT 0,
-        last_action_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )
-    """)
-
-    # Create the rentals table
-    cursor.execute("""
-    CREATE TABLE IF NOT EXISTS rentals (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        product_id INTEGER NOT NULL,
-        customer_name TEXT NOT NULL,
-        phone TEXT NOT NULL,
-        email TEXT,
-        vehicle TEXT,
-        place TEXT NOT NULL,
-        rental_type TEXT DEFAULT 'Per Day',
-        rental_duration INTEGER NOT NULL,
-        total_cost REAL DEFAULT 0,
-        start_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        end_time TIMESTAMP,
-        FOREIGN KEY (product_id) REFERENCES products (id)
-    )
-    """)
-    conn.commit()
-    conn.close()
+def _load_catalog():
+    # Called with _catalog_lock held
+    global _catalog
+    conn = get_db_connection()
+    count = conn.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+    cursor = conn.execute(f"SELECT {PRODUCT_COLUMNS_SQL} FROM products ORDER BY id")
+    _catalog = ProductCatalog(cursor, capacity=count)
+    return _catalog
 
 
+@timed("db.reset_catalog")
+def reset_catalog():
+    """Drop the catalog after bulk writes; it is rebuilt on the next use."""
+    global _catalog
+    with _catalog_lock:
+        _catalog = None
+
+
+@timed("db.get_catalog")
+def get_catalog():
+    """Return the product catalog, loading it on first use."""
+    catalog = _catalog
+    if catalog is None:
+        with _catalog_lock:
+            # Another thread may have loaded it while this one waited
+            catalog = _catalog if _catalog is not None else _load_catalog()
+    return catalog
+
+
+@timed("db.lookup_product_by_tag")
+def lookup_product_by_tag(tag_id):
+    """Return the Product for an RFID tag from the in-memory catalog, or None."""
+    return get_catalog().by_tag(tag_id)
+
+
+@timed("db.add_product")
 def add_product(name, tag_id, category, status, rental_type, rental_rate):
-    conn = sqlite3.connect("db/rental.db")
+    conn = get_db_connection()
     cursor = conn.cursor()
     try:
         # Check if tag_id already exists
@@ -79,119 +242,523 @@ def add_product(name, tag_id, category, status, rental_type, rental_rate):
             return "Error: A product with this RFID tag already exists."
 
         # Insert the new product
-        cursor.execute("""
-            INSERT INTO products (name, tag_id, category, status, rental_type, rental_rate)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (name, tag_id, category, status, rental_type, rental_rate))
-        conn.commit()
+        with conn:
+            cursor.execute("""
+                INSERT INTO products (name, tag_id, category, status, rental_type, rental_rate)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (name, tag_id, category, status, rental_type, rental_rate))
+        _reindex_product(cursor.lastrowid)
     except sqlite3.IntegrityError as e:
         return f"Errorxxxx: {e}"
-    finally:
-        conn.close()
 
 
+@timed("db.update_product")
 def update_product(product_id, name, tag_id, category, status, rental_type, rental_rate):
-    conn = sqlite3.connect("db/rental.db")
-    cursor = conn.cursor()
-    cursor.execute("""
-        UPDATE products
-        SET name = ?, tag_id = ?, category = ?, status = ?, rental_type = ?, rental_rate = ?
-        WHERE id = ?
-    """, (name, tag_id, category, status, rental_type, rental_rate, product_id))
-    conn.commit()
-    conn.close()
+    conn = get_db_connection()
+    with conn:
+        conn.execute("""
+            UPDATE products
+            SET name = ?, tag_id = ?, category = ?, status = ?, rental_type = ?, rental_rate = ?
+            WHERE id = ?
+        """, (name, tag_id, category, status, rental_type, rental_rate, product_id))
+    _reindex_product(product_id)
 
 
+@timed("db.delete_product")
 def delete_product(product_id):
-    conn = sqlite3.connect("db/rental.db")
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM products WHERE id = ?", (product_id,))
-    conn.commit()
-    conn.close()
+    conn = get_db_connection()
+    with conn:
+        conn.execute("DELETE FROM products WHERE id = ?", (product_id,))
+    _reindex_product(product_id)
 
 
+@timed("db.fetch_all_products")
 def fetch_all_products():
-    conn = sqlite3.connect("db/rental.db")
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT id, name, tag_id, category, status, rental_type, rental_rate
+    """Return every product as a Product record (from the catalog)."""
+    return list(get_catalog())
+
+
+@timed("db.fetch_product_changes")
+def fetch_product_changes(since_seq):
+    """Return the products changed since a change log position.
+
+    Returns ``(seq, rows, deleted_ids)`` where ``seq`` is the position to
+    pass next time, ``rows`` are the current rows of inserted/updated
+    products and ``deleted_ids`` the ids of removed products. ``rows`` and
+    ``deleted_ids`` are None when ``since_seq`` is older than the retained
+    change log (or None), in which case the caller should reload everything.
+    Rows are Product records; the catalog is updated with them as well, so
+    it follows changes written by other processes.
+    """
+    conn = get_db_connection()
+    min_seq, max_seq = conn.execute(
+        "SELECT MIN(seq), MAX(seq) FROM product_changes").fetchone()
+    if max_seq is None:
+        # Nothing has been written since the change log was created
+        min_seq = max_seq = 0
+    if since_seq is None or since_seq < min_seq - 1:
+        return max_seq, None, None
+    if since_seq >= max_seq:
+        return max_seq, [], []
+
+    changed_ids = {row[0] for row in conn.execute("""
+        SELECT DISTINCT product_id FROM product_changes
+        WHERE seq > ? AND seq <= ?
+    """, (since_seq, max_seq))}
+    rows = conn.execute(f"""
+        SELECT {PRODUCT_COLUMNS_SQL}
         FROM products
-    """)
-    rows = cursor.fetchall()
-    conn.close()
-    return rows
-
-
+        WHERE id IN (
+            SELECT product_id FROM product_changes WHERE seq > ? AND seq <= ?
+        )
+    """, (since_seq, max_seq)).fetchall()
+    deleted_ids = changed_ids - {row[0] for row in rows}
+    with _catalog_lock:
+        if _catalog is not None:
+            for row in rows:
+                _catalog.put(row)
+            for product_id in deleted_ids:
+                _catalog.remove(product_id)
+    return max_seq, [Product.from_row(row) for row in rows], sorted(deleted_ids)
+
+
+@timed("db.add_rental")
 def add_rental(product_id, customer_name, phone, email, vehicle, place, rental_duration):
-    conn = sqlite3.connect("db/rental.db")
-    cursor = conn.cursor()
-    try:
+    conn = get_db_connection()
+    with conn:
         # Insert rental details into the table
-        cursor.execute("""
+        cursor = conn.execute("""
             INSERT INTO rentals (
                 product_id, customer_name, phone, email, vehicle, place, rental_duration
             ) VALUES (?, ?, ?, ?, ?, ?, ?)
         """, (product_id, customer_name, phone, email, vehicle, place, rental_duration))
-        conn.commit()
-        rental_id = cursor.lastrowid
-    except Exception as e:
-        conn.rollback()
-        raise e
-    finally:
-        conn.close()
-    return rental_id
-
-
+    return cursor.lastrowid
+
+
+# Summary rows are keyed by the IST calendar day on which a rental ended
+SUMMARY_DAY_SQL = "date({}, '+5 hours', '+30 minutes')"
+_RECORD_SUMMARY_SQL = f"""
+    INSERT INTO rental_daily_summary (day, product_id, category, rental_count, rented_seconds, revenue)
+    SELECT
+        {SUMMARY_DAY_SQL.format("rentals.end_time")},
+        rentals.product_id,
+        COALESCE(products.category, ''),
+        1,
+        CAST(ROUND((julianday(rentals.end_time) - julianday(rentals.start_time)) * 86400) AS INTEGER),
+        COALESCE(rentals.total_cost, 0)
+    FROM rentals
+    INNER JOIN products ON rentals.product_id = products.id
+    WHERE rentals.id = ? AND rentals.end_time IS NOT NULL
+    ON CONFLICT (day, product_id, category) DO UPDATE SET
+        rental_count = rental_count + excluded.rental_count,
+        rented_seconds = rented_seconds + excluded.rented_seconds,
+        revenue = revenue + excluded.revenue
+"""
+
+
+def _record_rental_summary(conn, rental_id):
+    """Add a just-closed rental to the daily summary (inside the caller's transaction)."""
+    conn.execute(_RECORD_SUMMARY_SQL, (rental_id,))
+
+
+@timed("db.end_rental")
 def end_rental(rental_id, total_cost):
-    print("end rental")
-    conn = sqlite3.connect("db/rental.db")
-    cursor = conn.cursor()
-    cursor.execute("""
-        UPDATE rentals
-        SET end_time = CURRENT_TIMESTAMP, total_cost = ?
-        WHERE id = ?
-    """, (total_cost, rental_id))
-    conn.commit()
-    conn.close()
-
-
+    conn = get_db_connection()
+    with conn:
+        cursor = conn.execute("""
+            UPDATE rentals
+            SET end_time = CURRENT_TIMESTAMP, total_cost = ?
+            WHERE id = ? AND end_time IS NULL
+        """, (total_cost, rental_id))
+        if cursor.rowcount:
+            _record_rental_summary(conn, rental_id)
+
+
+@timed("db.fetch_product_by_tag")
 def fetch_product_by_tag(tag_id):
-    conn = sqlite3.connect("db/rental.db")
-    cursor = conn.cursor()
-    cursor.execute("""
+    conn = get_db_connection()
+    cursor = conn.execute("""
         SELECT id, name, status, rental_type, rental_rate
         FROM products
         WHERE tag_id = ?
     """, (tag_id,))
-    product = cursor.fetchone()
-    conn.close()
-    return product
-
-
+    return cursor.fetchone()
+
+
+_OPEN_RENTALS_SQL = """
+    SELECT
+        rentals.id,
+        rentals.product_id,
+        products.name,
+        rentals.customer_name,
+        rentals.phone,
+        rentals.start_time,
+        products.rental_type,
+        products.rental_rate,
+        rentals.rental_duration
+    FROM rentals
+    INNER JOIN products ON rentals.product_id = products.id
+    WHERE rentals.end_time IS NULL
+"""
+
+
+@timed("db.fetch_open_rentals")
+def fetch_open_rentals():
+    """Return every open rental as (rental_id, product_id, product_name,
+    customer_name, phone, start_time, rental_type, rental_rate,
+    rental_duration), priced by the product's current rental type and rate."""
+    return get_db_connection().execute(_OPEN_RENTALS_SQL).fetchall()
+
+
+@timed("db.fetch_open_rental")
+def fetch_open_rental(rental_id):
+    """Return one open rental in the fetch_open_rentals() shape, or None."""
+    cursor = get_db_connection().execute(
+        _OPEN_RENTALS_SQL + "AND rentals.id = ?", (rental_id,))
+    return cursor.fetchone()
+
+
+@timed("db.update_product_status")
 def update_product_status(product_id, status):
-    conn = sqlite3.connect("db/rental.db")
-    cursor = conn.cursor()
-    cursor.execute("""
-        UPDATE products
-        SET status = ?, last_action_time = CURRENT_TIMESTAMP
-        WHERE id = ?
-    """, (status, product_id))
-    conn.commit()
-    conn.close()
+    conn = get_db_connection()
+    with conn:
+        conn.execute("""
+            UPDATE products
+            SET status = ?, last_action_time = CURRENT_TIMESTAMP
+            WHERE id = ?
+        """, (status, product_id))
+    _reindex_product(product_id)
 
 
+@timed("db.fetch_active_rental")
 def fetch_active_rental(product_id):
-    conn = sqlite3.connect("db/rental.db")
-    cursor = conn.cursor()
-    cursor.execute("""
+    conn = get_db_connection()
+    cursor = conn.execute("""
         SELECT id, start_time
         FROM rentals
         WHERE product_id = ? AND end_time IS NULL
     """, (product_id,))
-    rental = cursor.fetchone()
-    conn.close()
-    return rental
+    return cursor.fetchone()
+
+
+# Listeners told about rentals opened/closed through checkout()/checkin(),
+# called after the commit as callback("checkout", open_rental_row) or
+# callback("checkin", rental_id) on the thread that made the change.
+_rental_listeners = []
+
+
+@timed("db.add_rental_listener")
+def add_rental_listener(callback):
+    _rental_listeners.append(callback)
+
+
+@timed("db.remove_rental_listener")
+def remove_rental_listener(callback):
+    if callback in _rental_listeners:
+        _rental_listeners.remove(callback)
+
+
+def _notify_rental_listeners(event, data):
+    for callback in list(_rental_listeners):
+        try:
+            callback(event, data)
+        except Exception as e:
+            print(f"Error in rental listener: {e}")
+
+
+# Scan journal row for an applied checkout/check-in (see modules/scan_journal.py)
+_JOURNAL_ACTION_SQL = """
+    INSERT INTO scan_journal (recorded_at, kind, decision, tag_id, reader_id,
+                              product_id, rental_id, params)
+    VALUES (?, 'action', ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _journal_action(conn, journal, action, product_id, rental_id, params):
+    # Inside the action's transaction, so the action and its journal row
+    # commit (or roll back) together; ``journal`` is (tag_id, reader_id)
+    tag_id, reader_id = journal
+    conn.execute(_JOURNAL_ACTION_SQL, (time.time(), action, tag_id, reader_id,
+                                       product_id, rental_id, json.dumps(params)))
+
+
+@timed("db.checkout")
+def checkout(product_id, customer_name, phone, email, vehicle, place, rental_duration,
+             journal=None):
+    """Open a rental and mark the product as rented in a single transaction.
+
+    Returns the new rental id. Raises ValueError if the product does not
+    exist or is not Available (already rented, or e.g. Not Available).
+    With ``journal=(tag_id, reader_id)`` the checkout is also recorded in
+    the scan journal, in the same transaction.
+    """
+    conn = get_db_connection()
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        cursor = conn.execute("""
+            UPDATE products
+            SET status = 'Rented', last_action_time = CURRENT_TIMESTAMP
+            WHERE id = ? AND status = 'Available'
+        """, (product_id,))
+        if cursor.rowcount == 0:
+            raise ValueError("Product is not available (rented, out of service) or does not exist.")
+        cursor = conn.execute("""
+            INSERT INTO rentals (
+                product_id, customer_name, phone, email, vehicle, place, rental_type, rental_duration
+            )
+            SELECT id, ?, ?, ?, ?, ?, rental_type, ?
+            FROM products
+            WHERE id = ?
+        """, (customer_name, phone, email, vehicle, place, rental_duration, product_id))
+        rental_id = cursor.lastrowid
+        if journal is not None:
+            _journal_action(conn, journal, "checkout", product_id, rental_id, {
+                "customer_name": customer_name, "phone": phone, "email": email,
+                "vehicle": vehicle, "place": place, "rental_duration": rental_duration,
+            })
+    _reindex_product(product_id)
+    if _rental_listeners:
+        _notify_rental_listeners("checkout", fetch_open_rental(rental_id))
+    return rental_id
 
 
-# Initialize the database when the module is imported
-initialize_db()
+@timed("db.checkin")
+def checkin(rental_id, total_cost, journal=None):
+    """Close a rental and mark its product as available in a single transaction.
+
+    Returns the product id. Raises ValueError if the rental does not exist
+    or is already closed. With ``journal=(tag_id, reader_id)`` the
+    check-in is also recorded in the scan journal, in the same transaction.
+    """
+    conn = get_db_connection()
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        cursor = conn.execute("""
+            UPDATE rentals
+            SET end_time = CURRENT_TIMESTAMP, total_cost = ?
+            WHERE id = ? AND end_time IS NULL
+        """, (total_cost, rental_id))
+        if cursor.rowcount == 0:
+            raise ValueError("Rental is already closed or does not exist.")
+        _record_rental_summary(conn, rental_id)
+        product_id = conn.execute(
+            "SELECT product_id FROM rentals WHERE id = ?", (rental_id,)).fetchone()[0]
+        conn.execute("""
+            UPDATE products
+            SET status = 'Available', last_action_time = CURRENT_TIMESTAMP
+            WHERE id = ?
+        """, (product_id,))
+        if journal is not None:
+            _journal_action(conn, journal, "checkin", product_id, rental_id,
+                            {"total_cost": total_cost})
+    _reindex_product(product_id)
+    if _rental_listeners:
+        _notify_rental_listeners("checkin", rental_id)
+    return product_id
+
+
+@timed("db.rebuild_rental_summaries")
+def rebuild_rental_summaries():
+    """Recompute the daily rental summary from the rentals table.
+
+    Returns the number of summary rows written.
+    """
+    conn = get_db_connection()
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DELETE FROM rental_daily_summary")
+        cursor = conn.execute(f"""
+            INSERT INTO rental_daily_summary (day, product_id, category, rental_count, rented_seconds, revenue)
+            SELECT
+                {SUMMARY_DAY_SQL.format("rentals.end_time")},
+                rentals.product_id,
+                COALESCE(products.category, ''),
+                COUNT(*),
+                CAST(ROUND(SUM(julianday(rentals.end_time) - julianday(rentals.start_time)) * 86400) AS INTEGER),
+                SUM(COALESCE(rentals.total_cost, 0))
+            FROM rentals
+            INNER JOIN products ON rentals.product_id = products.id
+            WHERE rentals.end_time IS NOT NULL
+            GROUP BY 1, 2, 3
+        """)
+    return cursor.rowcount
+
+
+@timed("db.fetch_revenue_by_category")
+def fetch_revenue_by_category(start_day=None, end_day=None):
+    """Return (day, category, rental_count, rented_seconds, revenue) rows from
+    the summary table, for IST days between start_day and end_day (inclusive)."""
+    query = """
+        SELECT day, category, SUM(rental_count), SUM(rented_seconds), SUM(revenue)
+        FROM rental_daily_summary
+        WHERE day >= COALESCE(?, day) AND day <= COALESCE(?, day)
+        GROUP BY day, category
+        ORDER BY day, category
+    """
+    return get_db_connection().execute(query, (start_day, end_day)).fetchall()
+
+
+@timed("db.fetch_product_utilization")
+def fetch_product_utilization(start_day=None, end_day=None):
+    """Return (product_id, category, rental_count, rented_seconds, revenue) rows
+    per product from the summary table over the given IST days."""
+    query = """
+        SELECT product_id, category, SUM(rental_count), SUM(rented_seconds), SUM(revenue)
+        FROM rental_daily_summary
+        WHERE day >= COALESCE(?, day) AND day <= COALESCE(?, day)
+        GROUP BY product_id, category
+        ORDER BY SUM(revenue) DESC
+    """
+    return get_db_connection().execute(query, (start_day, end_day)).fetchall()
+
+
+HISTORY_PAGE_SIZE = 100
+
+
+@timed("db.fetch_rental_history_page")
+def fetch_rental_history_page(after=None, limit=HISTORY_PAGE_SIZE):
+    """Return one page of rental history, newest first.
+
+    Uses keyset pagination on (start_time, id): pass the (start_time, id)
+    of the last row of the previous page as ``after`` to get the next one,
+    so each page costs the same no matter how deep into the history it is.
+    """
+    query = """
+        SELECT
+            rentals.id,
+            rentals.customer_name,
+            rentals.phone,
+            products.name AS product_name,
+            rentals.rental_type,
+            rentals.place,
+            rentals.rental_duration,
+            rentals.start_time,
+            rentals.end_time,
+            rentals.total_cost
+        FROM rentals
+        INNER JOIN products ON rentals.product_id = products.id
+    """
+    params = ()
+    if after is not None:
+        query += "WHERE (rentals.start_time, rentals.id) < (?, ?)\n"
+        params = tuple(after)
+    query += "ORDER BY rentals.start_time DESC, rentals.id DESC LIMIT ?"
+    cursor = get_db_connection().execute(query, params + (limit,))
+    return cursor.fetchall()
+
+
+# Search boxes return at most this many matches
+SEARCH_LIMIT = 100
+_search_indexed = None
+
+
+def _has_search_index():
+    # The FTS5 tables are only created when the SQLite build supports them
+    global _search_indexed
+    if _search_indexed is None:
+        _search_indexed = get_db_connection().execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'rentals_fts'").fetchone() is not None
+    return _search_indexed
+
+
+def _search_words(text):
+    return re.findall(r"\w+", text or "")
+
+
+def _match_expression(words):
+    # Every word must match the start of a token: "ram 98" finds
+    # "Ramesh, 9847..." as it is typed
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def _like_conditions(columns, words):
+    # LIKE fallback for SQLite builds without FTS5
+    condition = "(" + " OR ".join(f"{column} LIKE ?" for column in columns) + ")"
+    params = [f"%{word}%" for word in words for _ in columns]
+    return " AND ".join([condition] * len(words)), params
+
+
+@timed("db.search_products")
+def search_products(text, limit=SEARCH_LIMIT):
+    """Return the Products whose name, category or tag match ``text``, best match first."""
+    words = _search_words(text)
+    if not words:
+        return []
+    conn = get_db_connection()
+    if _has_search_index():
+        cursor = conn.execute("""
+            SELECT products.id, products.name, products.tag_id, products.category,
+                   products.status, products.rental_type, products.rental_rate
+            FROM products_fts
+            INNER JOIN products ON products.id = products_fts.rowid
+            WHERE products_fts MATCH ?
+            ORDER BY products_fts.rank
+            LIMIT ?
+        """, (_match_expression(words), limit))
+    else:
+        where, params = _like_conditions(("name", "category", "tag_id"), words)
+        cursor = conn.execute(f"""
+            SELECT id, name, tag_id, category, status, rental_type, rental_rate
+            FROM products
+            WHERE {where}
+            LIMIT ?
+        """, params + [limit])
+    return [Product.from_row(row) for row in cursor]
+
+
+@timed("db.search_rentals")
+def search_rentals(text, limit=SEARCH_LIMIT):
+    """Return the rentals whose customer name, phone, vehicle or place match
+    ``text``, newest first, in the same shape as fetch_rental_history_page."""
+    words = _search_words(text)
+    if not words:
+        return []
+    conn = get_db_connection()
+    if _has_search_index():
+        # Matches are taken from the index newest first, so the query stops
+        # after ``limit`` hits however long the history is
+        cursor = conn.execute("""
+            SELECT
+                rentals.id,
+                rentals.customer_name,
+                rentals.phone,
+                products.name AS product_name,
+                rentals.rental_type,
+                rentals.place,
+                rentals.rental_duration,
+                rentals.start_time,
+                rentals.end_time,
+                rentals.total_cost
+            FROM (
+                SELECT rowid FROM rentals_fts
+                WHERE rentals_fts MATCH ?
+                ORDER BY rowid DESC
+                LIMIT ?
+            ) AS hits
+            INNER JOIN rentals ON rentals.id = hits.rowid
+            INNER JOIN products ON rentals.product_id = products.id
+            ORDER BY rentals.id DESC
+        """, (_match_expression(words), limit))
+    else:
+        where, params = _like_conditions(
+            ("rentals.customer_name", "rentals.phone", "rentals.vehicle", "rentals.place"), words)
+        cursor = conn.execute(f"""
+            SELECT
+                rentals.id,
+                rentals.customer_name,
+                rentals.phone,
+                products.name AS product_name,
+                rentals.rental_type,
+                rentals.place,
+                rentals.rental_duration,
+                rentals.start_time,
+                rentals.end_time,
+                rentals.total_cost
+            FROM rentals
+            INNER JOIN products ON rentals.product_id = products.id
+            WHERE {where}
+            ORDER BY rentals.id DESC
+            LIMIT ?
+        """, params + [limit])
+    return cursor.fetchall()
+
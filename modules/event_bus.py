@@ -0,0 +1,101 @@
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+from . import scan_trace
+
+
+class TagEventDispatcher:
+    """Moves RFID tag events off the reader thread.
+
+    The reader thread only calls ``publish``. Each event is handled by
+    ``handler`` on a worker pool (database work), and its result is passed
+    to ``on_result`` on the Tk main loop by a batched ``after()`` pump.
+
+    Events carrying a ``trace`` get their lookup and render stages stamped
+    here; ``on_result`` may stamp "rendered" itself before opening a dialog.
+    """
+
+    def __init__(self, widget, handler, on_result, max_workers=2,
+                 poll_interval_ms=50, max_batch=50):
+        self.widget = widget
+        self.handler = handler
+        self.on_result = on_result
+        self.poll_interval_ms = poll_interval_ms
+        self.max_batch = max_batch
+        self._ui_queue = queue.Queue()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="tag-worker")
+        self._running = False
+        self._pumping = False
+
+    def start(self):
+        """Start pumping results into the Tk main loop."""
+        self._running = True
+        self.widget.after(self.poll_interval_ms, self._pump)
+
+    def stop(self):
+        """Stop accepting events and shut down the worker pool."""
+        self._running = False
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def publish(self, event):
+        """Queue a tag event for processing. Safe to call from any thread."""
+        if self._running:
+            self._executor.submit(self._process, event)
+
+    def submit(self, func, on_result=None, on_error=None):
+        """Run ``func()`` on the worker pool, then pass its result to
+        ``on_result`` (or the exception to ``on_error``) on the Tk main loop.
+        """
+        def run():
+            try:
+                result = func()
+            except Exception as e:
+                if on_error is None:
+                    print(f"Error in background task: {e}")
+                else:
+                    self.call_in_ui(on_error, e)
+                return
+            if on_result is not None:
+                self.call_in_ui(on_result, result)
+
+        self._executor.submit(run)
+
+    def call_in_ui(self, func, *args):
+        """Run ``func(*args)`` on the Tk main loop. Safe to call from any thread."""
+        self._ui_queue.put((func, args, None))
+
+    def _process(self, event):
+        trace = getattr(event, "trace", None)
+        scan_trace.mark(trace, "lookup_start")
+        try:
+            result = self.handler(event)
+        except Exception as e:
+            print(f"Error handling tag event {event}: {e}")
+            return
+        scan_trace.mark(trace, "lookup_done")
+        self._ui_queue.put((self.on_result, (result,), trace))
+
+    def _pump(self):
+        if not self._running:
+            return
+        # A modal dialog opened by a previous item keeps processing Tk
+        # events; don't re-enter while it is open, just let items queue up.
+        if not self._pumping:
+            self._pumping = True
+            try:
+                for _ in range(self.max_batch):
+                    try:
+                        func, args, trace = self._ui_queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    try:
+                        func(*args)
+                    except Exception as e:
+                        print(f"Error updating UI: {e}")
+                    if trace is not None:
+                        trace.mark("rendered")
+                        scan_trace.finish(trace)
+            finally:
+                self._pumping = False
+        self.widget.after(self.poll_interval_ms, self._pump)
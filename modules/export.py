@@ -0,0 +1,117 @@
+import argparse
+import csv
+import json
+from datetime import datetime
+
+from .database import get_db_connection
+from .utils import format_times_to_ist, IST_OFFSET
+
+# Rows fetched from SQLite (and time-converted) per batch
+EXPORT_BATCH_SIZE = 1000
+WRITE_BUFFER_SIZE = 1 << 20
+EXPORT_COLUMNS = (
+    "rental_id", "customer_name", "phone", "email", "vehicle", "place",
+    "product_name", "category", "rental_type", "rental_duration",
+    "start_time", "end_time", "total_cost",
+)
+# Positions of the timestamp columns in EXPORT_COLUMNS
+START_TIME_COLUMN = 10
+END_TIME_COLUMN = 11
+
+
+def _ist_date_to_utc(date_text):
+    """Midnight IST of a YYYY-MM-DD date, as a UTC timestamp string like the ones stored."""
+    midnight = datetime.strptime(date_text, "%Y-%m-%d")
+    return (midnight - IST_OFFSET).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def iter_rental_history(start_date=None, end_date=None, batch_size=EXPORT_BATCH_SIZE):
+    """Yield batches of rental history rows with times converted to IST.
+
+    ``start_date``/``end_date`` (YYYY-MM-DD, IST, end inclusive) filter on
+    the rental start time. Rows are read with fetchmany, so memory use
+    does not depend on how many rentals match.
+    """
+    query = """
+        SELECT
+            rentals.id,
+            rentals.customer_name,
+            rentals.phone,
+            rentals.email,
+            rentals.vehicle,
+            rentals.place,
+            products.name,
+            products.category,
+            rentals.rental_type,
+            rentals.rental_duration,
+            rentals.start_time,
+            rentals.end_time,
+            rentals.total_cost
+        FROM rentals
+        INNER JOIN products ON rentals.product_id = products.id
+    """
+    conditions, params = [], []
+    if start_date:
+        conditions.append("rentals.start_time >= ?")
+        params.append(_ist_date_to_utc(start_date))
+    if end_date:
+        conditions.append("rentals.start_time < datetime(?, '+1 day')")
+        params.append(_ist_date_to_utc(end_date))
+    if conditions:
+        query += "WHERE " + " AND ".join(conditions) + "\n"
+    query += "ORDER BY rentals.start_time, rentals.id"
+
+    cursor = get_db_connection().cursor()
+    cursor.execute(query, params)
+    try:
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            start_times = format_times_to_ist([row[START_TIME_COLUMN] for row in rows])
+            end_times = format_times_to_ist([row[END_TIME_COLUMN] for row in rows])
+            yield [
+                row[:START_TIME_COLUMN] + (start, end) + row[END_TIME_COLUMN + 1:]
+                for row, start, end in zip(rows, start_times, end_times)
+            ]
+    finally:
+        cursor.close()
+
+
+def export_rental_history(path, fmt=None, start_date=None, end_date=None,
+                          batch_size=EXPORT_BATCH_SIZE):
+    """Stream the rental history to a CSV or JSONL file and return the row count.
+
+    ``fmt`` is "csv" or "jsonl"; by default it follows the file extension.
+    """
+    if fmt is None:
+        fmt = "jsonl" if str(path).lower().endswith((".jsonl", ".ndjson")) else "csv"
+    if fmt not in ("csv", "jsonl"):
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8", buffering=WRITE_BUFFER_SIZE) as f:
+        if fmt == "csv":
+            writer = csv.writer(f)
+            writer.writerow(EXPORT_COLUMNS)
+            for batch in iter_rental_history(start_date, end_date, batch_size):
+                writer.writerows(batch)
+                count += len(batch)
+        else:
+            dumps = json.dumps
+            for batch in iter_rental_history(start_date, end_date, batch_size):
+                f.write("".join(
+                    dumps(dict(zip(EXPORT_COLUMNS, row))) + "\n" for row in batch))
+                count += len(batch)
+    return count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the rental history.")
+    parser.add_argument("path", help="output file (.csv or .jsonl)")
+    parser.add_argument("--from", dest="start_date", help="first rental start date, YYYY-MM-DD")
+    parser.add_argument("--to", dest="end_date", help="last rental start date, YYYY-MM-DD")
+    parser.add_argument("--format", choices=("csv", "jsonl"))
+    args = parser.parse_args()
+    exported = export_rental_history(args.path, args.format, args.start_date, args.end_date)
+    print(f"Exported {exported} rentals to {args.path}")
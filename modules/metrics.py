@@ -0,0 +1,187 @@
+"""Low-overhead counters and latency histograms.
+
+Collection is off by default. While it is off, an instrumented function
+costs one extra call and a flag check; turn it on with ``HIDO_METRICS=1``,
+``python main.py --metrics`` or from the Diagnostics window.
+
+    @timed("db.fetch_all_products")
+    def fetch_all_products(): ...
+
+    with timer("ui.load_products"):
+        ...
+
+    increment("rfid.frames_rejected", 2)
+"""
+import functools
+import json
+import math
+import os
+import threading
+import time
+
+METRICS_ENV = "HIDO_METRICS"
+# Histogram bucket i counts durations in [2**(i-1), 2**i) microseconds
+HISTOGRAM_BUCKETS = 32
+
+enabled = os.environ.get(METRICS_ENV, "") not in ("", "0")
+_lock = threading.Lock()
+_counters = {}
+_histograms = {}
+_started_at = time.time()
+
+
+def enable(on=True):
+    global enabled
+    enabled = on
+
+
+def reset():
+    """Drop every recorded value."""
+    global _started_at
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+        _started_at = time.time()
+
+
+class Histogram:
+    """Latency distribution in power-of-two microsecond buckets."""
+    __slots__ = ("count", "total", "minimum", "maximum", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.minimum = math.inf
+        self.maximum = 0.0
+        self.buckets = [0] * HISTOGRAM_BUCKETS
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if seconds < self.minimum:
+            self.minimum = seconds
+        if seconds > self.maximum:
+            self.maximum = seconds
+        # frexp(x)[1] is floor(log2(x)) + 1, i.e. the bucket index
+        index = math.frexp(seconds * 1e6)[1] if seconds >= 1e-6 else 0
+        self.buckets[min(max(index, 0), HISTOGRAM_BUCKETS - 1)] += 1
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of samples, in seconds."""
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for index, bucket in enumerate(self.buckets):
+            seen += bucket
+            if seen >= target:
+                return min((2 ** index) / 1e6, self.maximum)
+        return self.maximum
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "total_ms": round(self.total * 1000, 3),
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "min_ms": round(self.minimum * 1000, 3) if self.count else 0.0,
+            "max_ms": round(self.maximum * 1000, 3),
+            "p50_ms": round(self.percentile(0.50) * 1000, 3),
+            "p95_ms": round(self.percentile(0.95) * 1000, 3),
+            "p99_ms": round(self.percentile(0.99) * 1000, 3),
+        }
+
+
+def increment(name, amount=1):
+    if not enabled:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+def observe(name, seconds):
+    """Record one duration for ``name``."""
+    if not enabled:
+        return
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram()
+        histogram.add(seconds)
+
+
+def timed(name):
+    """Decorator recording the call count, failures and duration of a function."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return func(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except BaseException:
+                increment(name + ".errors")
+                raise
+            finally:
+                observe(name, time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+
+class timer:
+    """Context manager recording the duration of a block."""
+    __slots__ = ("name", "started")
+
+    def __init__(self, name):
+        self.name = name
+        self.started = None
+
+    def __enter__(self):
+        if enabled:
+            self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.started is not None:
+            observe(self.name, time.perf_counter() - self.started)
+        return False
+
+
+def snapshot():
+    """Return every counter and histogram summary as a JSON-friendly dict."""
+    with _lock:
+        counters = dict(_counters)
+        histograms = {name: h.summary() for name, h in _histograms.items()}
+    return {
+        "enabled": enabled,
+        "since": _started_at,
+        "taken_at": time.time(),
+        "counters": dict(sorted(counters.items())),
+        "timings": dict(sorted(histograms.items())),
+    }
+
+
+def format_report(stats=None):
+    """Plain-text table of a snapshot, slowest total time first."""
+    stats = stats or snapshot()
+    lines = [f"{'timing':<40} {'count':>8} {'mean ms':>9} {'p95 ms':>9} {'max ms':>9} {'total ms':>10}"]
+    for name, s in sorted(stats["timings"].items(), key=lambda item: -item[1]["total_ms"]):
+        lines.append(f"{name:<40} {s['count']:>8} {s['mean_ms']:>9.3f} {s['p95_ms']:>9.3f} "
+                     f"{s['max_ms']:>9.3f} {s['total_ms']:>10.1f}")
+    if stats["counters"]:
+        lines.append("")
+        lines.append(f"{'counter':<40} {'value':>8}")
+        for name, value in stats["counters"].items():
+            lines.append(f"{name:<40} {value:>8}")
+    return "\n".join(lines)
+
+
+def dump(path):
+    """Write a snapshot to ``path``: JSON for .json files, otherwise the text report."""
+    stats = snapshot()
+    with open(path, "w", encoding="utf-8") as f:
+        if str(path).lower().endswith(".json"):
+            json.dump(stats, f, indent=2)
+        else:
+            f.write(format_report(stats) + "\n")
+    return path
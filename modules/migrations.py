@@ -0,0 +1,357 @@
+import sqlite3
+
+
+# Versioned schema migrations. Each migration runs once, inside its own
+# transaction, and is recorded in the schema_version table so existing
+# databases (e.g. ~/HiDoAppData/rental.db) are upgraded in place.
+
+
+def _create_base_tables(cursor):
+    # Create the products table
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS products (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        tag_id TEXT UNIQUE NOT NULL,
+        category TEXT,
+        status TEXT DEFAULT 'Available',
+        rental_type TEXT DEFAULT 'Per Day',
+        rental_rate REAL DEFAULT 0,
+        last_action_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+
+    # Create the rentals table
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS rentals (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        product_id INTEGER NOT NULL,
+        customer_name TEXT NOT NULL,
+        phone TEXT NOT NULL,
+        email TEXT,
+        vehicle TEXT,
+        place TEXT NOT NULL,
+        rental_type TEXT DEFAULT 'Per Day',
+        rental_duration INTEGER NOT NULL,
+        total_cost REAL DEFAULT 0,
+        start_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        end_time TIMESTAMP,
+        FOREIGN KEY (product_id) REFERENCES products (id)
+    )
+    """)
+
+
+def _add_rental_indexes(cursor):
+    # Open rentals per product (fetch_active_rental); stays small because
+    # closed rentals drop out of the partial index.
+    cursor.execute("""
+    CREATE INDEX IF NOT EXISTS idx_rentals_open
+    ON rentals (product_id) WHERE end_time IS NULL
+    """)
+    # Rental history ordering
+    cursor.execute("""
+    CREATE INDEX IF NOT EXISTS idx_rentals_start_time
+    ON rentals (start_time)
+    """)
+    # Product listings filtered by status/category
+    cursor.execute("""
+    CREATE INDEX IF NOT EXISTS idx_products_status_category
+    ON products (status, category)
+    """)
+
+
+def _add_product_change_log(cursor):
+    # Change feed for products: every insert/update/delete appends the
+    # product id, so views can refresh only the rows that changed.
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS product_changes (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        product_id INTEGER NOT NULL
+    )
+    """)
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS trg_products_insert_change
+    AFTER INSERT ON products
+    BEGIN
+        INSERT INTO product_changes (product_id) VALUES (NEW.id);
+    END
+    """)
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS trg_products_update_change
+    AFTER UPDATE ON products
+    BEGIN
+        INSERT INTO product_changes (product_id) VALUES (NEW.id);
+    END
+    """)
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS trg_products_delete_change
+    AFTER DELETE ON products
+    BEGIN
+        INSERT INTO product_changes (product_id) VALUES (OLD.id);
+    END
+    """)
+    # Keep only the most recent entries; readers that fall further behind
+    # than this do a full reload instead.
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS trg_product_changes_prune
+    AFTER INSERT ON product_changes
+    BEGIN
+        DELETE FROM product_changes WHERE seq <= NEW.seq - 10000;
+    END
+    """)
+
+
+def _batch_product_change_pruning(cursor):
+    # Trim the change log once every 1000 entries instead of on every
+    # insert; it then holds between 10000 and 11000 entries
+    cursor.execute("DROP TRIGGER IF EXISTS trg_product_changes_prune")
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS trg_product_changes_prune
+    AFTER INSERT ON product_changes
+    WHEN NEW.seq % 1000 = 0
+    BEGIN
+        DELETE FROM product_changes WHERE seq <= NEW.seq - 10000;
+    END
+    """)
+
+
+def _add_rental_summaries(cursor):
+    # Per day (IST, by return time), product and category totals of closed
+    # rentals, maintained when a rental is closed.
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS rental_daily_summary (
+        day TEXT NOT NULL,
+        product_id INTEGER NOT NULL,
+        category TEXT NOT NULL DEFAULT '',
+        rental_count INTEGER NOT NULL DEFAULT 0,
+        rented_seconds INTEGER NOT NULL DEFAULT 0,
+        revenue REAL NOT NULL DEFAULT 0,
+        PRIMARY KEY (day, product_id, category)
+    )
+    """)
+    cursor.execute("""
+    CREATE INDEX IF NOT EXISTS idx_rental_daily_summary_category
+    ON rental_daily_summary (category, day)
+    """)
+    # Fill it from the rentals closed so far
+    cursor.execute("DELETE FROM rental_daily_summary")
+    cursor.execute("""
+    INSERT INTO rental_daily_summary (day, product_id, category, rental_count, rented_seconds, revenue)
+    SELECT
+        date(rentals.end_time, '+5 hours', '+30 minutes'),
+        rentals.product_id,
+        COALESCE(products.category, ''),
+        COUNT(*),
+        CAST(ROUND(SUM(julianday(rentals.end_time) - julianday(rentals.start_time)) * 86400) AS INTEGER),
+        SUM(COALESCE(rentals.total_cost, 0))
+    FROM rentals
+    INNER JOIN products ON rentals.product_id = products.id
+    WHERE rentals.end_time IS NOT NULL
+    GROUP BY 1, 2, 3
+    """)
+
+
+def _fts5_available(cursor):
+    try:
+        cursor.execute("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(x)")
+        cursor.execute("DROP TABLE temp.fts5_probe")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def _add_search_index(cursor):
+    # Full-text indexes for the search boxes. They are external-content
+    # tables: only the index is stored, the text stays in products/rentals.
+    # Without FTS5 in the SQLite build the tables are skipped and searches
+    # fall back to LIKE scans, until _ensure_search_index() finds a build
+    # that has it.
+    if not _fts5_available(cursor):
+        return
+    cursor.execute("""
+    CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+        name, category, tag_id,
+        content='products', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """)
+    cursor.execute("""
+    CREATE VIRTUAL TABLE IF NOT EXISTS rentals_fts USING fts5(
+        customer_name, phone, vehicle, place,
+        content='rentals', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """)
+    # Keep the indexes in step with the tables. Updates only touch the index
+    # when an indexed column changes (status changes don't).
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS trg_products_fts_insert
+    AFTER INSERT ON products
+    BEGIN
+        INSERT INTO products_fts (rowid, name, category, tag_id)
+        VALUES (NEW.id, NEW.name, NEW.category, NEW.tag_id);
+    END
+    """)
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS trg_products_fts_delete
+    AFTER DELETE ON products
+    BEGIN
+        INSERT INTO products_fts (products_fts, rowid, name, category, tag_id)
+        VALUES ('delete', OLD.id, OLD.name, OLD.category, OLD.tag_id);
+    END
+    """)
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS trg_products_fts_update
+    AFTER UPDATE OF name, category, tag_id ON products
+    BEGIN
+        INSERT INTO products_fts (products_fts, rowid, name, category, tag_id)
+        VALUES ('delete', OLD.id, OLD.name, OLD.category, OLD.tag_id);
+        INSERT INTO products_fts (rowid, name, category, tag_id)
+        VALUES (NEW.id, NEW.name, NEW.category, NEW.tag_id);
+    END
+    """)
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS trg_rentals_fts_insert
+    AFTER INSERT ON rentals
+    BEGIN
+        INSERT INTO rentals_fts (rowid, customer_name, phone, vehicle, place)
+        VALUES (NEW.id, NEW.customer_name, NEW.phone, NEW.vehicle, NEW.place);
+    END
+    """)
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS trg_rentals_fts_delete
+    AFTER DELETE ON rentals
+    BEGIN
+        INSERT INTO rentals_fts (rentals_fts, rowid, customer_name, phone, vehicle, place)
+        VALUES ('delete', OLD.id, OLD.customer_name, OLD.phone, OLD.vehicle, OLD.place);
+    END
+    """)
+    cursor.execute("""
+    CREATE TRIGGER IF NOT EXISTS trg_rentals_fts_update
+    AFTER UPDATE OF customer_name, phone, vehicle, place ON rentals
+    BEGIN
+        INSERT INTO rentals_fts (rentals_fts, rowid, customer_name, phone, vehicle, place)
+        VALUES ('delete', OLD.id, OLD.customer_name, OLD.phone, OLD.vehicle, OLD.place);
+        INSERT INTO rentals_fts (rowid, customer_name, phone, vehicle, place)
+        VALUES (NEW.id, NEW.customer_name, NEW.phone, NEW.vehicle, NEW.place);
+    END
+    """)
+    # Index what is already there
+    cursor.execute("INSERT INTO products_fts (products_fts) VALUES ('rebuild')")
+    cursor.execute("INSERT INTO rentals_fts (rentals_fts) VALUES ('rebuild')")
+
+
+def _add_scan_journal(cursor):
+    # Append-only record of tag scans and of the checkouts/check-ins they
+    # lead to. A checkout/check-in writes its "action" row in its own
+    # transaction (see database.checkout()); refused ones are "rejected".
+    # ref_id and idx_scan_journal_intents belonged to the earlier
+    # intent/outcome rows and are no longer written.
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS scan_journal (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        recorded_at REAL NOT NULL,
+        kind TEXT NOT NULL,
+        decision TEXT NOT NULL,
+        tag_id TEXT,
+        reader_id TEXT,
+        product_id INTEGER,
+        rental_id INTEGER,
+        params TEXT,
+        ref_id INTEGER
+    )
+    """)
+    cursor.execute("""
+    CREATE INDEX IF NOT EXISTS idx_scan_journal_ref
+    ON scan_journal (ref_id) WHERE ref_id IS NOT NULL
+    """)
+    cursor.execute("""
+    CREATE INDEX IF NOT EXISTS idx_scan_journal_intents
+    ON scan_journal (id) WHERE kind = 'intent'
+    """)
+    cursor.execute("""
+    CREATE INDEX IF NOT EXISTS idx_scan_journal_recorded_at
+    ON scan_journal (recorded_at)
+    """)
+
+
+SEARCH_INDEX_VERSION = 5
+
+MIGRATIONS = [
+    (1, "Create products and rentals tables", _create_base_tables),
+    (2, "Add indexes for open rentals, rental history and product status", _add_rental_indexes),
+    (3, "Add product change log", _add_product_change_log),
+    (4, "Add daily rental summary table", _add_rental_summaries),
+    (SEARCH_INDEX_VERSION, "Add full-text search indexes for products and rentals",
+     _add_search_index),
+    (6, "Add scan journal", _add_scan_journal),
+    (7, "Prune the product change log in batches", _batch_product_change_pruning),
+]
+
+
+def get_schema_version(conn):
+    """Return the highest applied migration version (0 for a fresh database)."""
+    row = conn.execute(
+        "SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()
+    return row[0]
+
+
+def run_migrations(conn):
+    """Apply every pending migration in order and return the resulting version."""
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY,
+        description TEXT NOT NULL,
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+    current_version = get_schema_version(conn)
+
+    for version, description, migrate in MIGRATIONS:
+        if version <= current_version:
+            continue
+        cursor = conn.cursor()
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+            # Another process may have applied it while we waited for the lock
+            applied_version = get_schema_version(conn)
+            if applied_version >= version:
+                conn.rollback()
+                current_version = applied_version
+                continue
+            migrate(cursor)
+            cursor.execute(
+                "INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                (version, description))
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        current_version = version
+
+    if current_version >= SEARCH_INDEX_VERSION:
+        _ensure_search_index(conn)
+    return current_version
+
+
+def _has_search_tables(conn):
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'rentals_fts'").fetchone() is not None
+
+
+def _ensure_search_index(conn):
+    # The search index migration is recorded even when the SQLite build
+    # lacks FTS5; create the tables once a build with FTS5 opens the database
+    if _has_search_tables(conn):
+        return
+    cursor = conn.cursor()
+    if not _fts5_available(cursor):
+        return
+    try:
+        cursor.execute("BEGIN IMMEDIATE")
+        if not _has_search_tables(conn):
+            _add_search_index(cursor)
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
@@ -0,0 +1,87 @@
+import math
+import time
+from datetime import datetime, timezone
+
+from .database import fetch_open_rentals
+
+SECONDS_PER_UNIT = {
+    "Per Hour": 3600,
+    "Per Day": 24 * 3600,
+}
+
+# Optional pricing rules per rental type. Without a rule a rental costs
+# units * rate, prorated (the original behaviour). A rule may set:
+#   "minimum_units":  bill at least this many units
+#   "minimum_charge": bill at least this amount
+#   "tiers": [(from_unit, rate_multiplier), ...] in ascending order; units
+#            past from_unit are billed at rate * rate_multiplier, e.g.
+#            [(0, 1.0), (7, 0.8), (30, 0.6)] for weekly/monthly discounts
+PRICING_RULES = {}
+
+
+def parse_db_timestamp(timestamp):
+    """Seconds since the epoch of a UTC timestamp as stored by SQLite."""
+    return datetime.fromisoformat(timestamp).replace(tzinfo=timezone.utc).timestamp()
+
+
+def price_units(units, rental_rate, rule=None):
+    """Price a number of (possibly fractional) rental units under a rule."""
+    if not rule:
+        return units * rental_rate
+    units = max(units, rule.get("minimum_units", 0))
+    tiers = rule.get("tiers")
+    if tiers:
+        cost = 0.0
+        for i, (from_unit, multiplier) in enumerate(tiers):
+            if units <= from_unit:
+                break
+            to_unit = tiers[i + 1][0] if i + 1 < len(tiers) else math.inf
+            cost += (min(units, to_unit) - from_unit) * rental_rate * multiplier
+    else:
+        cost = units * rental_rate
+    return max(cost, rule.get("minimum_charge", 0))
+
+
+def calculate_rental_cost(start_time, rental_type, rental_rate, end_time=None,
+                          rules=PRICING_RULES):
+    """Cost of one rental from its stored start time until ``end_time``
+    (a stored timestamp) or now."""
+    seconds_per_unit = SECONDS_PER_UNIT.get(rental_type)
+    if not seconds_per_unit:
+        return 0
+    end = parse_db_timestamp(end_time) if end_time else time.time()
+    duration = max(0.0, end - parse_db_timestamp(start_time))
+    return round(price_units(duration / seconds_per_unit, rental_rate,
+                             rules.get(rental_type)), 2)
+
+
+def accrued_costs(rentals, now=None, rules=PRICING_RULES):
+    """Accrued cost of many open rentals in one pass.
+
+    ``rentals`` are (rental_id, start_time, rental_type, rental_rate)
+    sequences; returns a {rental_id: cost} dict priced up to ``now``
+    (epoch seconds, default: current time).
+    """
+    now = time.time() if now is None else now
+    parsed = {}  # start_time -> epoch seconds; many rentals share a start
+    costs = {}
+    for rental_id, start_time, rental_type, rental_rate in rentals:
+        seconds_per_unit = SECONDS_PER_UNIT.get(rental_type)
+        if not seconds_per_unit or not start_time:
+            costs[rental_id] = 0
+            continue
+        start = parsed.get(start_time)
+        if start is None:
+            start = parsed[start_time] = parse_db_timestamp(start_time)
+        units = max(0.0, now - start) / seconds_per_unit
+        costs[rental_id] = round(
+            price_units(units, rental_rate or 0, rules.get(rental_type)), 2)
+    return costs
+
+
+def outstanding_value(now=None, rules=PRICING_RULES):
+    """Return (open rental count, total accrued cost) over every open rental."""
+    rentals = fetch_open_rentals()
+    costs = accrued_costs(
+        ((row[0], row[5], row[6], row[7]) for row in rentals), now, rules)
+    return len(rentals), round(sum(costs.values()), 2)
@@ -1,4 +1,4 @@
-from modules.database import fetch_all_products, update_product
+from modules.database import lookup_product_by_tag, update_product_status
 import datetime
 
 
@@ -6,13 +6,12 @@ def detect_rfid(tag_id):
     """
     Detect RFID tag and determine the flow (rented or returned).
     """
-    products = fetch_all_products()
-    product = next((p for p in products if p[2] == tag_id), None)
+    product = lookup_product_by_tag(tag_id)
 
     if not product:
         return {"error": "Product not found"}
 
-    product_id, name, tag_id, category, status, *_ = product
+    product_id, name, category, status = product.id, product.name, product.category, product.status
 
     if status == "Available":
         # Product is being rented
@@ -24,15 +23,7 @@ def detect_rfid(tag_id):
         return {"error": f"Unknown status: {status}"}
 
     # Update the product's status and last_action_time
-    update_product(
-        product_id,
-        name=name,
-        tag_id=tag_id,
-        category=category,
-        status=new_status,
-        rental_type=product[6],  # Retain current rental type
-        rental_rate=product[7]   # Retain current rental rate
-    )
+    update_product_status(product_id, new_status)
 
     return {
         "product_id": product_id,
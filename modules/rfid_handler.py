@@ -1,106 +1,276 @@
+import os
+import selectors
 import threading
+import time
 import serial
-import serial.tools.list_ports
-from tkinter import messagebox
 import platform
 
+from . import metrics
+from .rfid_protocol import make_parser, DEFAULT_FRAMING
+from .scan_trace import ScanTrace
+from .tag_dedup import TagDeduplicator, DEFAULT_DEDUP_WINDOW
+
+BAUD_RATE = 115200
+# Comma-separated list of reader ports; when unset, readers are discovered.
+RFID_PORTS_ENV = "HIDO_RFID_PORTS"
+# How frames are cut from the byte stream: "line" (default) or "length";
+# see rfid_protocol
+RFID_FRAMING_ENV = "HIDO_RFID_FRAMING"
+# Set to 0 for readers whose frame checksum doesn't match rfid_protocol's
+# (length framing only)
+RFID_VERIFY_CHECKSUM_ENV = "HIDO_RFID_VERIFY_CHECKSUM"
+# A reader that has sent this many rejected frames and no good one is
+# reported once: its frames don't match the configured framing
+REJECTED_FRAMES_WARNING = 20
+# How long one pass of the I/O loop waits for data before re-checking `running`
+SELECT_TIMEOUT = 0.5
+# Sleep between polling passes on platforms without select() on serial ports
+POLL_INTERVAL = 0.01
+
+
+class TagEvent:
+    """A tag read by one of the readers."""
+    __slots__ = ("tag_id", "reader_id", "received_at", "trace")
+
+    def __init__(self, tag_id, reader_id, received_at, trace=None):
+        self.tag_id = tag_id
+        self.reader_id = reader_id
+        self.received_at = received_at
+        self.trace = trace  # ScanTrace with the scan's stage timestamps
+
+    def __repr__(self):
+        return f"TagEvent({self.tag_id!r}, reader={self.reader_id!r})"
+
+
+def checksum_verification_enabled():
+    """Whether frame checksums are verified, from HIDO_RFID_VERIFY_CHECKSUM (default on)."""
+    value = os.environ.get(RFID_VERIFY_CHECKSUM_ENV, "1").strip().lower()
+    return value not in ("0", "false", "no", "off")
+
+
+def configured_framing():
+    """The frame layout to parse, from HIDO_RFID_FRAMING (default "line")."""
+    return os.environ.get(RFID_FRAMING_ENV, "").strip().lower() or DEFAULT_FRAMING
+
 
 class RFIDReaderThread(threading.Thread):
-    def __init__(self):
+    """Services every connected RFID reader from one I/O loop.
+
+    On POSIX the serial ports are multiplexed with a selector; on Windows,
+    where serial handles can't be selected, they are polled in turn.
+    """
+
+    def __init__(self, ports=None, dedup_window=DEFAULT_DEDUP_WINDOW, verify_checksum=None,
+                 framing=None):
         super().__init__()
         self.running = True
-        self.ser = None
+        self.ports = ports  # None: use HIDO_RFID_PORTS or discover
+        # None: use HIDO_RFID_FRAMING / HIDO_RFID_VERIFY_CHECKSUM
+        self.framing = configured_framing() if framing is None else framing
+        self.verify_checksum = (checksum_verification_enabled() if verify_checksum is None
+                                else verify_checksum)
+        make_parser(self.framing)  # fail fast on an unknown framing
+        # Repeat reads are dropped here, before they reach the callback
+        self.deduplicator = TagDeduplicator(dedup_window)
+        self.readers = {}  # reader_id (port name) -> serial.Serial
+        self.parsers = {}  # reader_id -> LineParser or FrameParser
+        self.layout_warned = set()  # readers reported for rejecting every frame
         self.on_tag_detected_callback = None  # Callback for tag detection
-        print("Class called")
+        self.on_error_callback = None  # Callback for reader errors
 
     def set_on_tag_detected_callback(self, callback):
-        """Set the callback function for detected tags."""
+        """Set the callback for detected tags, called with a TagEvent."""
         self.on_tag_detected_callback = callback
 
-    def find_serial_port(self):
-        """Find the appropriate serial port dynamically based on the OS."""
+    def set_on_error_callback(self, callback):
+        """Set the callback for reader errors, called as callback(title, message).
+
+        The callback runs on the reader thread, so UI code should marshal it
+        to the Tk main loop instead of showing dialogs directly.
+        """
+        self.on_error_callback = callback
+
+    def report_error(self, title, message):
+        if self.on_error_callback:
+            self.on_error_callback(title, message)
+        else:
+            print(f"{title}: {message}")
+
+    def find_serial_ports(self):
+        """Return every reader port: the configured ones, or those discovered for this OS."""
+        configured = os.environ.get(RFID_PORTS_ENV)
+        if configured:
+            return [port.strip() for port in configured.split(",") if port.strip()]
+        # list_ports pulls in the platform enumeration backend; only load it
+        # when discovery actually runs
+        import serial.tools.list_ports
         try:
-            ports = list(serial.tools.list_ports.comports())
-            for port in ports:
-                if platform.system() == "Windows":
+            system = platform.system()
+            found = []
+            for port in serial.tools.list_ports.comports():
+                device = port.device
+                if system == "Windows":
                     # Windows ports usually have "COM" in their names
-                    if "COM" in port.device.upper():
-                        return port.device
-                elif platform.system() == "Darwin":  # macOS
+                    if "COM" in device.upper():
+                        found.append(device)
+                elif system == "Darwin":  # macOS
                     # macOS ports usually contain "usbserial" or "tty"
-                    if "usbserial" in port.device.lower() or "tty" in port.device.lower():
-                        return port.device
-            return None
+                    if "usbserial" in device.lower() or "tty" in device.lower():
+                        found.append(device)
+                elif system == "Linux":
+                    # USB serial adapters and CDC-ACM readers
+                    if device.startswith(("/dev/ttyUSB", "/dev/ttyACM")):
+                        found.append(device)
+            return found
         except Exception as e:
-            messagebox.showerror(
+            self.report_error(
                 "RFID Reader Error",
                 f"Error detecting serial port: {e}. Ensure the device is connected.",
             )
-            return None
+            return []
+
+    def find_serial_port(self):
+        """Return the first reader port, or None."""
+        ports = self.find_serial_ports()
+        return ports[0] if ports else None
+
+    def open_readers(self):
+        """Open every reader port; ports that fail are reported and skipped."""
+        for port in (self.ports or self.find_serial_ports()):
+            try:
+                self.readers[port] = serial.Serial(port, BAUD_RATE, timeout=0)
+                self.parsers[port] = make_parser(self.framing, self.verify_checksum)
+                print(f"Connected to RFID reader on port {port}")
+            except serial.SerialException as e:
+                self.report_error(
+                    "RFID Reader Error", f"SerialException on {port}: {e}. Ensure the device is connected."
+                )
+        return bool(self.readers)
+
+    def close_reader(self, reader_id):
+        ser = self.readers.pop(reader_id, None)
+        self.parsers.pop(reader_id, None)
+        if ser and ser.is_open:
+            ser.close()
+
+    def read_reader(self, reader_id, block=True):
+        """Read all buffered bytes from one reader and dispatch the tags they complete.
+
+        With ``block=False`` nothing is read unless bytes are already waiting.
+        """
+        ser = self.readers[reader_id]
+        try:
+            waiting = ser.in_waiting
+            if not waiting and not block:
+                return False
+            raw_data = ser.read(waiting or 1)
+        except (serial.SerialException, OSError) as e:
+            # A port that disappears raises OSError (EIO) from in_waiting;
+            # drop just that reader
+            self.report_error(
+                "RFID Reader Error", f"{type(e).__name__} on {reader_id}: {e}. Ensure the device is connected."
+            )
+            self.close_reader(reader_id)
+            return False
+        if not raw_data:
+            return False
+        received_at = time.time()
+        received = time.perf_counter()
+        parser = self.parsers[reader_id]
+        rejected = parser.frames_rejected
+        tag_ids = parser.feed(raw_data)
+        parsed = time.perf_counter()
+        if (not parser.frames_parsed and parser.frames_rejected >= REJECTED_FRAMES_WARNING
+                and reader_id not in self.layout_warned):
+            self.layout_warned.add(reader_id)
+            self.report_error(
+                "RFID Reader Error",
+                f"Every frame from {reader_id} was rejected ({self.framing} framing). "
+                f"Check the reader's frame layout and {RFID_FRAMING_ENV}.")
+        if metrics.enabled:
+            metrics.increment("rfid.bytes_read", len(raw_data))
+            metrics.increment("rfid.frames_parsed", len(tag_ids))
+            metrics.increment("rfid.frames_rejected", parser.frames_rejected - rejected)
+        for tag_id in tag_ids:
+            if not self.deduplicator.accept(tag_id):
+                metrics.increment("rfid.duplicates_dropped")
+                continue
+            metrics.increment("rfid.tags_dispatched")
+            trace = ScanTrace(tag_id, reader_id, received)
+            trace.mark("parsed", parsed)
+            trace.mark("deduped")
+            if self.on_tag_detected_callback:
+                self.on_tag_detected_callback(
+                    TagEvent(tag_id, reader_id, received_at, trace))
+        return True
 
     def run(self):
         try:
-            serial_port = self.find_serial_port()
-            if not serial_port:
+            if not self.open_readers():
                 raise FileNotFoundError("No compatible serial port found.")
-
-            self.ser = serial.Serial(serial_port, 115200, timeout=1)
-            print(f"Connected to RFID reader on port {serial_port}")
-
-            while self.running:
-                raw_data = self.ser.readline()
-                if raw_data:
-                    tag_id = self.parse_tag_data(raw_data)
-                    if tag_id and self.on_tag_detected_callback:
-                        self.on_tag_detected_callback(tag_id)
-        except serial.SerialException as e:
-            messagebox.showerror(
-                "RFID Reader Error", f"SerialException: {e}. Ensure the device is connected."
-            )
+            if os.name == "posix":
+                self.run_selector_loop()
+            else:
+                self.run_polling_loop()
         except FileNotFoundError:
-            messagebox.showerror(
+            self.report_error(
                 "RFID Reader Error", "Serial port not found. Ensure the device is connected."
             )
         except Exception as e:
-            # Error: list indices must be integers or slices, not tuple
-            print(f"Errorzzz: {e}")
-            messagebox.showerror(
+            self.report_error(
                 "RFID Reader Error", f"Unexpected error occurred: {e}"
             )
         finally:
-            if self.ser and self.ser.is_open:
-                self.ser.close()
+            for reader_id in list(self.readers):
+                self.close_reader(reader_id)
+
+    def run_selector_loop(self):
+        with selectors.DefaultSelector() as selector:
+            for reader_id, ser in self.readers.items():
+                selector.register(ser.fileno(), selectors.EVENT_READ, reader_id)
+            while self.running and self.readers:
+                for key, _ in selector.select(SELECT_TIMEOUT):
+                    reader_id = key.data
+                    if reader_id in self.readers:
+                        self.read_reader(reader_id)
+                    if reader_id not in self.readers:
+                        # Reader failed and was closed
+                        selector.unregister(key.fileobj)
+
+    def run_polling_loop(self):
+        while self.running and self.readers:
+            got_data = False
+            for reader_id in list(self.readers):
+                got_data = self.read_reader(reader_id, block=False) or got_data
+            if not got_data:
+                time.sleep(POLL_INTERVAL)
 
     def stop(self):
-        """Stop the RFID reader thread."""
+        """Stop the RFID reader thread; readers are closed when its loop exits."""
         self.running = False
-        if self.ser and self.ser.is_open:
-            self.ser.close()
 
     @staticmethod
     def parse_tag_data(raw_data):
-        """Parse the raw RFID data to extract the stable tag ID."""
-        try:
-            hex_data = raw_data.hex()
-            if hex_data.startswith("a55a"):  # Example header check
-                return hex_data[:40]  # Extract the first 40 characters
-        except Exception as e:
-            print(f"Error parsing tag data: {e}")
-        return None
+        """Parse one complete raw RFID frame to extract the stable tag ID."""
+        tag_ids = make_parser().feed(raw_data)
+        return tag_ids[0] if tag_ids else None
 
 
 # Singleton pattern for managing the RFID thread
 rfid_thread = None
 
 
-def start_rfid_thread(callback=None):
+def start_rfid_thread(callback=None, error_callback=None, ports=None,
+                      dedup_window=DEFAULT_DEDUP_WINDOW, verify_checksum=None, framing=None):
     """Start the RFID thread."""
     print("Starting RFID thread")
     global rfid_thread
     if not rfid_thread or not rfid_thread.is_alive():
-        rfid_thread = RFIDReaderThread()
+        rfid_thread = RFIDReaderThread(ports, dedup_window, verify_checksum, framing)
         if callback:
             rfid_thread.set_on_tag_detected_callback(callback)
+        if error_callback:
+            rfid_thread.set_on_error_callback(error_callback)
         rfid_thread.start()
     return rfid_thread
 
@@ -0,0 +1,209 @@
+"""Append-only journal of tag scans and the actions they lead to.
+
+Scans are queued in memory and written by one writer thread, which
+commits whatever has queued up in a single transaction every
+FLUSH_INTERVAL seconds or MAX_BATCH entries, so a burst of scans costs a
+handful of commits instead of one or more per scan.
+
+    record_scan(event, "rented", product_id=3)      # buffered, returns at once
+    run_action("checkin", tag_id=..., rental_id=7, total_cost=120.0)
+
+``run_action`` applies a checkout or check-in through
+database.checkout()/checkin(), which write its "action" entry in the same
+transaction: the action and its journal entry commit together or not at
+all, so there is nothing to replay after a crash. A refused action is
+journaled as "rejected" through the writer, without waiting.
+"""
+import json
+import queue
+import threading
+import time
+
+from .database import get_db_connection, close_db_connection, checkout, checkin
+from . import metrics
+
+# Longest a queued entry waits before its batch is committed (seconds)
+FLUSH_INTERVAL = 0.005
+# Most entries written in one transaction
+MAX_BATCH = 256
+# Entries older than this are removed by prune_journal(), which the writer
+# runs when idle every PRUNE_INTERVAL seconds (and on start), PRUNE_BATCH
+# rows per transaction so queued scans never wait long
+RETENTION_DAYS = 90
+PRUNE_INTERVAL = 6 * 3600
+PRUNE_BATCH = 5000
+
+ACTIONS = {
+    "checkout": checkout,
+    "checkin": checkin,
+}
+
+_INSERT_SQL = """
+    INSERT INTO scan_journal (recorded_at, kind, decision, tag_id, reader_id,
+                              product_id, rental_id, params)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+class JournalWriter(threading.Thread):
+    """Writes queued journal entries in group commits."""
+
+    def __init__(self, flush_interval=FLUSH_INTERVAL, max_batch=MAX_BATCH,
+                 prune_interval=PRUNE_INTERVAL):
+        super().__init__(name="scan-journal", daemon=True)
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.prune_interval = prune_interval
+        self.next_prune = time.monotonic()
+        self.entries = queue.Queue()
+        self.running = True
+
+    def submit(self, row):
+        self.entries.put(row)
+
+    def stop(self):
+        """Write everything queued so far, then stop."""
+        self.running = False
+        self.entries.put(None)
+        self.join()
+
+    def run(self):
+        try:
+            while self.running or not self.entries.empty():
+                try:
+                    item = self.entries.get(timeout=self._prune_wait())
+                except queue.Empty:
+                    self._prune()
+                    continue
+                if item is None:
+                    continue
+                batch = [item]
+                deadline = time.perf_counter() + self.flush_interval
+                while len(batch) < self.max_batch:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = self.entries.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        break
+                    batch.append(item)
+                _write_batch(batch)
+        finally:
+            close_db_connection()
+
+    def _prune_wait(self):
+        if not self.prune_interval or not self.running:
+            return None
+        return max(0.0, self.next_prune - time.monotonic())
+
+    def _prune(self):
+        try:
+            removed = prune_journal(limit=PRUNE_BATCH)
+        except Exception as e:
+            print(f"Error pruning scan journal: {e}")
+            removed = 0
+        # A full batch means there is more to remove on the next idle moment
+        if removed < PRUNE_BATCH:
+            self.next_prune = time.monotonic() + self.prune_interval
+
+
+def _write_batch(batch):
+    # One transaction for the whole batch
+    started = time.perf_counter()
+    conn = get_db_connection()
+    try:
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(_INSERT_SQL, batch)
+    except Exception as e:
+        print(f"Error writing scan journal: {e}")
+    metrics.observe("journal.group_commit", time.perf_counter() - started)
+    metrics.increment("journal.entries", len(batch))
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def start_journal(flush_interval=FLUSH_INTERVAL, max_batch=MAX_BATCH,
+                  prune_interval=PRUNE_INTERVAL):
+    """Start the journal writer (once); entries recorded before this are written directly.
+
+    The writer also prunes old entries; ``prune_interval=None`` turns that off.
+    """
+    global _writer
+    with _writer_lock:
+        if _writer is None or not _writer.is_alive():
+            _writer = JournalWriter(flush_interval, max_batch, prune_interval)
+            _writer.start()
+    return _writer
+
+
+def stop_journal():
+    """Flush the queued entries and stop the writer."""
+    global _writer
+    with _writer_lock:
+        writer, _writer = _writer, None
+    if writer is not None:
+        writer.stop()
+
+
+def _append(row):
+    writer = _writer
+    if writer is None:
+        # No writer running (tools, tests): write synchronously
+        _write_batch([row])
+    else:
+        writer.submit(row)
+
+
+def record_scan(event, decision, product_id=None, rental_id=None):
+    """Journal a tag event (a TagEvent) and what was decided for it. Does not wait."""
+    _append((event.received_at, "scan", decision, event.tag_id, event.reader_id,
+             product_id, rental_id, None))
+
+
+def record_rejected(action, params, reason, tag_id=None, reader_id=None):
+    """Journal an action that was refused or failed. Does not wait."""
+    _append((time.time(), "rejected", action, tag_id, reader_id,
+             params.get("product_id"), params.get("rental_id"),
+             json.dumps(dict(params, reason=reason))))
+
+
+def run_action(action, tag_id=None, reader_id=None, **params):
+    """Apply and journal a checkout or check-in.
+
+    Returns what checkout()/checkin() return; any exception they raise is
+    re-raised after the rejection is journaled.
+    """
+    if action not in ACTIONS:
+        raise ValueError(f"Unknown journal action: {action}")
+    try:
+        return ACTIONS[action](**params, journal=(tag_id, reader_id))
+    except Exception as e:
+        record_rejected(action, params, str(e) or type(e).__name__, tag_id, reader_id)
+        raise
+
+
+def prune_journal(retention_days=RETENTION_DAYS, limit=None):
+    """Delete journal entries older than ``retention_days``.
+
+    Deletes at most ``limit`` entries (oldest first) if given; returns how
+    many were deleted.
+    """
+    cutoff = time.time() - retention_days * 86400
+    conn = get_db_connection()
+    with conn:
+        cursor = conn.execute("""
+            DELETE FROM scan_journal
+            WHERE id IN (
+                SELECT id FROM scan_journal
+                WHERE recorded_at < ?
+                ORDER BY recorded_at
+                LIMIT ?
+            )
+        """, (cutoff, -1 if limit is None else limit))
+    return cursor.rowcount
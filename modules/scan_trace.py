@@ -0,0 +1,121 @@
+"""Per-scan latency tracing, from serial read to screen update.
+
+Every tag the reader thread accepts gets a ScanTrace carried on its
+TagEvent. Each stage stamps it as the scan passes through:
+
+    received      bytes completing the frame came back from the port
+    parsed        the frame was decoded into a tag ID
+    deduped       the deduplicator let the tag through
+    lookup_start  a dispatcher worker picked the event up
+    lookup_done   the database lookups finished
+    rendered      the UI showed the result (before any dialog waits on staff)
+
+Finished traces go to a ring buffer; ``summary()`` reports p50/p95/p99 of
+each stage's latency (time since the previous stamped stage) and of the
+whole scan.
+"""
+import itertools
+import math
+import threading
+import time
+from collections import deque
+
+from . import metrics
+
+STAGES = ("received", "parsed", "deduped", "lookup_start", "lookup_done", "rendered")
+_STAGE_INDEX = {stage: index for index, stage in enumerate(STAGES)}
+# Finished traces kept for the summaries
+TRACE_BUFFER_SIZE = 1024
+
+_ids = itertools.count(1)
+_traces = deque(maxlen=TRACE_BUFFER_SIZE)
+_lock = threading.Lock()
+
+
+class ScanTrace:
+    """Stage timestamps (time.perf_counter) of one scan."""
+    __slots__ = ("trace_id", "tag_id", "reader_id", "stamps")
+
+    def __init__(self, tag_id, reader_id, received=None):
+        self.trace_id = next(_ids)
+        self.tag_id = tag_id
+        self.reader_id = reader_id
+        self.stamps = [None] * len(STAGES)
+        self.stamps[0] = time.perf_counter() if received is None else received
+
+    def mark(self, stage, at=None):
+        """Stamp ``stage``; the first stamp of a stage wins."""
+        index = _STAGE_INDEX[stage]
+        if self.stamps[index] is None:
+            self.stamps[index] = time.perf_counter() if at is None else at
+
+    def durations(self):
+        """{stage: seconds since the previous stamped stage}, plus "total"."""
+        result = {}
+        previous = self.stamps[0]
+        for stage, stamp in zip(STAGES[1:], self.stamps[1:]):
+            if stamp is None:
+                continue
+            result[stage] = stamp - previous
+            previous = stamp
+        result["total"] = previous - self.stamps[0]
+        return result
+
+    def __repr__(self):
+        return f"ScanTrace({self.trace_id}, {self.tag_id!r})"
+
+
+def mark(trace, stage):
+    """Stamp ``stage`` on ``trace``; a no-op for events without a trace."""
+    if trace is not None:
+        trace.mark(stage)
+
+
+def finish(trace):
+    """Store a completed trace in the ring buffer."""
+    if trace is None:
+        return
+    with _lock:
+        _traces.append(trace)
+    if metrics.enabled:
+        for stage, seconds in trace.durations().items():
+            metrics.observe("scan." + stage, seconds)
+
+
+def recent(limit=None):
+    """The most recent finished traces, oldest first."""
+    with _lock:
+        traces = list(_traces)
+    return traces[-limit:] if limit else traces
+
+
+def clear():
+    with _lock:
+        _traces.clear()
+
+
+def _percentile(ordered, fraction):
+    # Nearest-rank percentile of an already sorted list
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def summary():
+    """{stage: {"count", "p50_ms", "p95_ms", "p99_ms", "max_ms"}} over the buffered traces."""
+    samples = {}
+    for trace in recent():
+        for stage, seconds in trace.durations().items():
+            samples.setdefault(stage, []).append(seconds)
+    result = {}
+    for stage in STAGES[1:] + ("total",):
+        values = samples.get(stage)
+        if not values:
+            continue
+        values.sort()
+        result[stage] = {
+            "count": len(values),
+            "p50_ms": round(_percentile(values, 0.50) * 1000, 3),
+            "p95_ms": round(_percentile(values, 0.95) * 1000, 3),
+            "p99_ms": round(_percentile(values, 0.99) * 1000, 3),
+            "max_ms": round(values[-1] * 1000, 3),
+        }
+    return result
@@ -0,0 +1,371 @@
+"""Headless rental service.
+
+One process owns the database and the RFID readers and serves them over
+a small HTTP/JSON API to local clients (scripts, kiosks, other tools on
+the same machine; see service_client.RentalServiceClient):
+
+    GET  /health
+    GET  /products/by-tag/<tag_id>     product and its open rental, if any
+    POST /checkout                     {"product_id" | "tag_id", "customer_name", "phone",
+                                        "email", "vehicle", "place", "rental_duration"}
+    POST /checkin                      {"rental_id", "total_cost" (optional, priced if absent)}
+    GET  /rentals?after_start=&after_id=&limit=   rental history page, newest first
+    GET  /rentals/open                 machines on hire with accrued cost
+    GET  /scans?since=<seq>            tag events read by the service's readers
+    GET  /scans/latency                p50/p95/p99 per scan stage over recent scans
+    GET  /metrics                      counters and timings (when collection is enabled)
+
+Start it with ``python main.py --headless``.
+
+Scope: the API has no authentication, so it listens on 127.0.0.1 by
+default and is not meant to be exposed to other machines as is. Started
+with ``--service URL`` (or HIDO_SERVICE_URL), the Tk UI is a client of
+the service for tag scans, lookups, checkouts and check-ins; its other
+tabs still open the database directly, and products it writes are picked
+up by the service (see sync_products()).
+"""
+import asyncio
+import json
+import math
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qs, unquote
+
+from .database import (lookup_product_by_tag, fetch_active_rental, fetch_open_rental,
+                       fetch_rental_history_page, close_all_connections, get_catalog,
+                       rebuild_catalog, fetch_product_changes, HISTORY_PAGE_SIZE)
+from .pricing import calculate_rental_cost
+from .active_rentals import ActiveRentalsView
+from .scan_journal import record_scan, run_action, start_journal, stop_journal
+from . import metrics, scan_trace
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# Database worker threads (each keeps its own pooled connection)
+DB_WORKERS = 4
+# Tag events kept for /scans
+SCAN_BUFFER_SIZE = 1000
+MAX_BODY_SIZE = 1 << 20
+# How often product changes made by other processes (the UI, bulk imports)
+# are pulled into the catalog, in seconds
+PRODUCT_SYNC_INTERVAL = 2.0
+
+HISTORY_COLUMNS = ("id", "customer_name", "phone", "product_name", "rental_type", "place",
+                   "rental_duration", "start_time", "end_time", "total_cost")
+PRODUCT_COLUMNS = ("id", "name", "tag_id", "category", "status", "rental_type", "rental_rate")
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _int_field(value, name, minimum=None):
+    """A request field as an int; HTTPError 400 if it isn't one (or is below ``minimum``)."""
+    if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+        value = None
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise HTTPError(400, f"{name} must be an integer.")
+    if minimum is not None and number < minimum:
+        raise HTTPError(400, f"{name} must be at least {minimum}.")
+    return number
+
+
+def _cost_field(value, name):
+    """A request field as a non-negative amount; HTTPError 400 otherwise."""
+    try:
+        if isinstance(value, bool):
+            raise TypeError
+        amount = float(value)
+    except (TypeError, ValueError):
+        raise HTTPError(400, f"{name} must be a number.")
+    if not math.isfinite(amount) or amount < 0:
+        raise HTTPError(400, f"{name} must be a non-negative amount.")
+    return amount
+
+
+class RentalService:
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, use_rfid=True):
+        self.host = host
+        self.port = port
+        self.use_rfid = use_rfid
+        self.executor = ThreadPoolExecutor(max_workers=DB_WORKERS, thread_name_prefix="db-worker")
+        self.active_rentals = ActiveRentalsView()
+        self.scans = deque(maxlen=SCAN_BUFFER_SIZE)
+        self.scan_seq = 0
+        self._scan_lock = threading.Lock()
+        self.product_seq = None  # product change log position of the catalog
+        self._product_lock = threading.Lock()
+        self.routes = {
+            ("GET", "/health"): self.handle_health,
+            ("POST", "/checkout"): self.handle_checkout,
+            ("POST", "/checkin"): self.handle_checkin,
+            ("GET", "/rentals"): self.handle_history,
+            ("GET", "/rentals/open"): self.handle_open_rentals,
+            ("GET", "/scans"): self.handle_scans,
+            ("GET", "/scans/latency"): self.handle_scan_latency,
+            ("GET", "/metrics"): self.handle_metrics,
+        }
+
+    # --- RFID ---------------------------------------------------------
+
+    def on_tag_detected(self, event):
+        """Record a tag event from the reader thread for /scans."""
+        with self._scan_lock:
+            self.scan_seq += 1
+            self.scans.append({
+                "seq": self.scan_seq,
+                "tag_id": event.tag_id,
+                "reader_id": event.reader_id,
+                "received_at": event.received_at,
+                "trace_id": event.trace.trace_id if event.trace else None,
+            })
+        scan_trace.finish(event.trace)
+        record_scan(event, "received")
+
+    # --- Products -------------------------------------------------------
+
+    def sync_products(self):
+        """Apply product changes written by other processes to the catalog."""
+        with self._product_lock:
+            seq, rows, _ = fetch_product_changes(self.product_seq)
+            if rows is None:
+                # Change log position unknown or expired: reload everything
+                rebuild_catalog()
+            self.product_seq = seq
+
+    def find_product(self, tag_id):
+        """The Product for a tag; on a catalog miss, sync once in case it was just added."""
+        product = lookup_product_by_tag(tag_id)
+        if product is None:
+            self.sync_products()
+            product = lookup_product_by_tag(tag_id)
+        return product
+
+    async def poll_products(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(PRODUCT_SYNC_INTERVAL)
+            try:
+                await loop.run_in_executor(self.executor, self.sync_products)
+            except Exception as e:
+                print(f"Error syncing products: {e}")
+
+    # --- Handlers (run on the database worker pool) ---------------------
+
+    def handle_health(self, query, body):
+        return {"status": "ok", "on_hire": len(self.active_rentals)}
+
+    def handle_lookup(self, tag_id):
+        product = self.find_product(tag_id)
+        if not product:
+            raise HTTPError(404, "No product associated with this tag.")
+        rental = fetch_active_rental(product.id) if product.status == "Rented" else None
+        return {
+            "product": {column: getattr(product, column) for column in PRODUCT_COLUMNS},
+            "rental": {"id": rental[0], "start_time": rental[1]} if rental else None,
+        }
+
+    def handle_checkout(self, query, body):
+        product_id = body.get("product_id")
+        if product_id is None and body.get("tag_id"):
+            product = self.find_product(body["tag_id"])
+            if not product:
+                raise HTTPError(404, "No product associated with this tag.")
+            product_id = product.id
+        required = ("customer_name", "phone", "place", "rental_duration")
+        if product_id is None or any(not body.get(field) for field in required):
+            raise HTTPError(400, "Please fill all required fields!")
+        product_id = _int_field(product_id, "product_id")
+        duration = _int_field(body["rental_duration"], "rental_duration", minimum=1)
+        try:
+            rental_id = run_action(
+                "checkout", body.get("tag_id"), product_id=product_id,
+                customer_name=body["customer_name"], phone=body["phone"], email=body.get("email"),
+                vehicle=body.get("vehicle"), place=body["place"], rental_duration=duration)
+        except ValueError as e:
+            # checkout() refuses products that aren't available
+            raise HTTPError(409, str(e))
+        return {"rental_id": rental_id, "product_id": product_id}
+
+    def handle_checkin(self, query, body):
+        if body.get("rental_id") is None:
+            raise HTTPError(400, "rental_id is required.")
+        rental_id = _int_field(body["rental_id"], "rental_id")
+        if body.get("total_cost") is None:
+            rental = fetch_open_rental(rental_id)
+            if not rental:
+                raise HTTPError(409, "Rental is already closed or does not exist.")
+            total_cost = calculate_rental_cost(rental[5], rental[6], rental[7])
+        else:
+            total_cost = _cost_field(body["total_cost"], "total_cost")
+        try:
+            product_id = run_action("checkin", rental_id=rental_id, total_cost=total_cost)
+        except ValueError as e:
+            # checkin() refuses rentals that are closed or don't exist
+            raise HTTPError(409, str(e))
+        return {"rental_id": rental_id, "product_id": product_id, "total_cost": total_cost}
+
+    def handle_history(self, query, body):
+        after = None
+        try:
+            if "after_start" in query and "after_id" in query:
+                after = (query["after_start"], int(query["after_id"]))
+            limit = min(int(query.get("limit", HISTORY_PAGE_SIZE)), 1000)
+        except ValueError:
+            raise HTTPError(400, "after_id and limit must be integers.")
+        rows = fetch_rental_history_page(after, limit)
+        return {"rentals": [dict(zip(HISTORY_COLUMNS, row)) for row in rows]}
+
+    def handle_open_rentals(self, query, body):
+        return {"rentals": [
+            {
+                "rental_id": rental.rental_id,
+                "product_id": rental.product_id,
+                "product_name": rental.product_name,
+                "customer_name": rental.customer_name,
+                "phone": rental.phone,
+                "start_time": rental.start_time,
+                "due_at": rental.due_at,
+                "accrued_cost": cost,
+            }
+            for rental, cost in self.active_rentals.snapshot()
+        ]}
+
+    def handle_scans(self, query, body):
+        try:
+            since = int(query.get("since", 0))
+        except ValueError:
+            raise HTTPError(400, "since must be an integer.")
+        with self._scan_lock:
+            scans = [scan for scan in self.scans if scan["seq"] > since]
+            seq = self.scan_seq
+        return {"seq": seq, "scans": scans}
+
+    def handle_scan_latency(self, query, body):
+        return scan_trace.summary()
+
+    def handle_metrics(self, query, body):
+        return metrics.snapshot()
+
+    # --- HTTP ---------------------------------------------------------
+
+    def route(self, method, path):
+        if method == "GET" and path.startswith("/products/by-tag/"):
+            tag_id = unquote(path[len("/products/by-tag/"):])
+            return lambda query, body: self.handle_lookup(tag_id)
+        handler = self.routes.get((method, path))
+        if handler is None:
+            if any(route_path == path for _, route_path in self.routes):
+                raise HTTPError(405, f"{method} not allowed on {path}")
+            raise HTTPError(404, f"Unknown endpoint {path}")
+        return handler
+
+    async def handle_connection(self, reader, writer):
+        status, payload = 200, None
+        try:
+            request_line = (await reader.readline()).decode("latin-1").strip()
+            if not request_line:
+                writer.close()
+                return
+            try:
+                method, target, _ = request_line.split(" ", 2)
+            except ValueError:
+                raise HTTPError(400, "Malformed request line.")
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode("latin-1").strip()
+                if not line:
+                    break
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            try:
+                length = int(headers.get("content-length", 0))
+            except ValueError:
+                length = -1
+            if length < 0:
+                raise HTTPError(400, "Invalid Content-Length.")
+            if length > MAX_BODY_SIZE:
+                raise HTTPError(413, "Request body too large.")
+            body = {}
+            if length:
+                try:
+                    body = json.loads(await reader.readexactly(length))
+                except asyncio.IncompleteReadError:
+                    raise HTTPError(400, "Request body shorter than Content-Length.")
+                except ValueError:
+                    # Not JSON, or not UTF-8
+                    raise HTTPError(400, "Body must be JSON.")
+                if not isinstance(body, dict):
+                    raise HTTPError(400, "Body must be a JSON object.")
+
+            url = urlsplit(target)
+            query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            handler = self.route(method.upper(), url.path)
+            loop = asyncio.get_running_loop()
+            with metrics.timer("service." + url.path.split("/")[1]):
+                payload = await loop.run_in_executor(self.executor, handler, query, body)
+        except HTTPError as e:
+            status, payload = e.status, {"error": str(e)}
+        except Exception as e:
+            status, payload = 500, {"error": f"An error occurred: {e}"}
+
+        data = json.dumps(payload).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            "Connection: close\r\n\r\n".encode("latin-1") + data)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self):
+        start_journal()
+        # Take the change log position first so nothing written while the
+        # catalog loads is missed
+        self.product_seq = fetch_product_changes(None)[0]
+        get_catalog()
+        self.active_rentals.seed()
+        if self.use_rfid:
+            from .rfid_handler import start_rfid_thread
+            start_rfid_thread(self.on_tag_detected)
+        server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        print(f"Rental service listening on http://{self.host}:{self.port}")
+        poller = asyncio.create_task(self.poll_products())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            poller.cancel()
+
+    def shutdown(self):
+        if self.use_rfid:
+            from .rfid_handler import stop_rfid_thread
+            stop_rfid_thread()
+        self.active_rentals.close()
+        self.executor.shutdown(wait=True)
+        stop_journal()
+        close_all_connections()
+
+
+def run_service(host=DEFAULT_HOST, port=DEFAULT_PORT, use_rfid=True):
+    """Run the headless service until interrupted."""
+    if host not in ("127.0.0.1", "localhost", "::1"):
+        print(f"Warning: the rental service has no authentication; anyone who can reach "
+              f"{host}:{port} can check machines in and out.")
+    service = RentalService(host, port, use_rfid)
+    try:
+        asyncio.run(service.serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.shutdown()
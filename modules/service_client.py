@@ -0,0 +1,136 @@
+import json
+import os
+import threading
+from urllib import request, error
+from urllib.parse import quote, urlencode
+
+from .catalog import Product
+from .rfid_handler import TagEvent
+
+# Matches the service's default --host/--port
+DEFAULT_SERVICE_URL = "http://127.0.0.1:8765"
+# Set to the service's URL to run the UI as a client of the service
+SERVICE_URL_ENV = "HIDO_SERVICE_URL"
+# How often ScanPoller asks the service for new tag events (seconds)
+SCAN_POLL_INTERVAL = 0.2
+
+
+def configured_service_url():
+    """The service URL from HIDO_SERVICE_URL, or None to use the database directly."""
+    return os.environ.get(SERVICE_URL_ENV, "").strip() or None
+
+
+class ServiceError(Exception):
+    """An error response from the rental service."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class RentalServiceClient:
+    """Client for the headless rental service, for the UI, local scripts and tools."""
+
+    def __init__(self, base_url=DEFAULT_SERVICE_URL, timeout=5):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def _call(self, method, path, body=None):
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        req = request.Request(self.base_url + path, data=data, method=method,
+                              headers={"Content-Type": "application/json"})
+        try:
+            with request.urlopen(req, timeout=self.timeout) as response:
+                return json.loads(response.read())
+        except error.HTTPError as e:
+            try:
+                message = json.loads(e.read()).get("error", str(e))
+            except ValueError:
+                message = str(e)
+            raise ServiceError(e.code, message) from None
+
+    def health(self):
+        return self._call("GET", "/health")
+
+    def lookup_tag(self, tag_id):
+        return self._call("GET", "/products/by-tag/" + quote(tag_id, safe=""))
+
+    def find_tag(self, tag_id):
+        """(Product, (rental_id, start_time) or None) for a tag, or (None, None) if unknown."""
+        try:
+            result = self.lookup_tag(tag_id)
+        except ServiceError as e:
+            if e.status == 404:
+                return None, None
+            raise
+        fields = result["product"]
+        product = Product(fields["id"], fields["name"], fields.get("tag_id", tag_id),
+                          fields.get("category"), fields["status"], fields["rental_type"],
+                          fields["rental_rate"])
+        rental = result["rental"]
+        return product, (rental["id"], rental["start_time"]) if rental else None
+
+    def checkout(self, product_id, customer_name, phone, email, vehicle, place, rental_duration):
+        return self._call("POST", "/checkout", {
+            "product_id": product_id, "customer_name": customer_name, "phone": phone,
+            "email": email, "vehicle": vehicle, "place": place,
+            "rental_duration": rental_duration,
+        })["rental_id"]
+
+    def checkin(self, rental_id, total_cost=None):
+        return self._call("POST", "/checkin", {"rental_id": rental_id, "total_cost": total_cost})
+
+    def rental_history_page(self, after=None, limit=None):
+        params = {}
+        if after is not None:
+            params["after_start"], params["after_id"] = after
+        if limit is not None:
+            params["limit"] = limit
+        query = "?" + urlencode(params) if params else ""
+        return self._call("GET", "/rentals" + query)["rentals"]
+
+    def open_rentals(self):
+        return self._call("GET", "/rentals/open")["rentals"]
+
+    def scans(self, since=0):
+        return self._call("GET", f"/scans?since={since}")
+
+
+class ScanPoller(threading.Thread):
+    """Follows the service's /scans and hands each tag event to a callback.
+
+    Stands in for the RFID reader thread when the readers belong to the
+    service; events come out as TagEvents, as from RFIDReaderThread.
+    """
+
+    def __init__(self, client, callback, error_callback=None, interval=SCAN_POLL_INTERVAL):
+        super().__init__(name="scan-poller", daemon=True)
+        self.client = client
+        self.callback = callback
+        self.error_callback = error_callback
+        self.interval = interval
+        self._stopped = threading.Event()
+
+    def stop(self):
+        self._stopped.set()
+
+    def run(self):
+        since = None
+        failing = False
+        while not self._stopped.is_set():
+            try:
+                result = self.client.scans(since or 0)
+                failing = False
+            except (ServiceError, OSError) as e:
+                # Report once per outage, not on every poll
+                if not failing and self.error_callback:
+                    self.error_callback("Rental Service", f"Cannot reach the rental service: {e}")
+                failing = True
+            else:
+                # Events read before the UI started are not replayed
+                if since is not None:
+                    for scan in result["scans"]:
+                        self.callback(TagEvent(scan["tag_id"], scan["reader_id"],
+                                               scan["received_at"]))
+                since = result["seq"]
+            self._stopped.wait(self.interval)
@@ -0,0 +1,55 @@
+import time
+from collections import OrderedDict
+
+# Seconds during which repeat reads of the same tag are dropped
+DEFAULT_DEDUP_WINDOW = 5.0
+# Upper bound on the number of tags remembered at once
+DEFAULT_MAX_TAGS = 4096
+
+
+class TagDeduplicator:
+    """Drops repeat reads of a tag within a time window.
+
+    Keeps a per-tag expiry table with bounded size. Because every entry
+    gets the same window, insertion order is also expiry order: expired
+    entries are purged from the front, and when the table is full the
+    least recently accepted tag is evicted.
+    """
+
+    def __init__(self, window=DEFAULT_DEDUP_WINDOW, max_tags=DEFAULT_MAX_TAGS,
+                 clock=time.monotonic):
+        self.window = window
+        self.max_tags = max_tags
+        self.clock = clock
+        self._expiry = OrderedDict()  # tag_id -> expiry time
+        self.accepted = 0
+        self.dropped = 0
+
+    def accept(self, tag_id):
+        """Return True if the read should be processed, False if it is a repeat."""
+        now = self.clock()
+        expiry = self._expiry
+        expires_at = expiry.get(tag_id)
+        if expires_at is not None and expires_at > now:
+            self.dropped += 1
+            return False
+
+        # Purge expired entries (oldest first)
+        while expiry:
+            oldest_tag, oldest_expiry = next(iter(expiry.items()))
+            if oldest_expiry > now:
+                break
+            del expiry[oldest_tag]
+
+        expiry[tag_id] = now + self.window
+        expiry.move_to_end(tag_id)
+        if len(expiry) > self.max_tags:
+            expiry.popitem(last=False)
+        self.accepted += 1
+        return True
+
+    def clear(self):
+        self._expiry.clear()
+
+    def __len__(self):
+        return len(self._expiry)
@@ -1,19 +1,51 @@
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 import tkinter as tk
-from modules.database import (add_product, fetch_all_products, delete_product, update_product,
-                              fetch_product_by_tag, add_rental, update_product_status, fetch_active_rental, end_rental)
+from modules.database import (add_product, delete_product, update_product,
+                              lookup_product_by_tag, rebuild_catalog, fetch_active_rental,
+                              fetch_rental_history_page, HISTORY_PAGE_SIZE, fetch_product_changes,
+                              close_all_connections, close_db_connection, search_products,
+                              search_rentals)
 from .rfid_handler import start_rfid_thread, stop_rfid_thread
+from .event_bus import TagEventDispatcher
+from .scan_journal import record_scan, run_action, stop_journal
+from .bulk_import import import_products
+from .export import export_rental_history
+from .pricing import calculate_rental_cost, outstanding_value
+from .active_rentals import ActiveRentalsView
+from .service_client import RentalServiceClient, ScanPoller
+import threading
 import time
-import sqlite3
-from .utils import format_time_to_ist
+from .utils import format_times_to_ist
+from . import metrics, scan_trace
 
 active_tab = None
-last_detected_tag = None
-last_detected_time = 0
-
-
-def create_ui(root):
-    global active_tab
+tag_dispatcher = None
+diagnostics_window = None
+# RentalServiceClient when the UI runs as a client of the rental service
+# (tag scans, lookups, checkouts and check-ins go through it), else None
+service = None
+scan_poller = None
+# Machines currently on hire, kept in memory from checkout/checkin events
+active_rentals_view = ActiveRentalsView()
+
+# How often the Products Management table checks the change log
+PRODUCT_POLL_INTERVAL_MS = 2000
+# How often the On Hire panel recomputes accrued costs
+ON_HIRE_REFRESH_MS = 1000
+# Pause after the last keystroke before a search box runs its query
+SEARCH_DEBOUNCE_MS = 250
+# How often an open Diagnostics window re-reads the metrics
+DIAGNOSTICS_REFRESH_MS = 1000
+# Delay before the RFID readers are opened, so the first frame is drawn first
+READER_START_DELAY_MS = 100
+
+
+def create_ui(root, service_url=None):
+    """Build the main window; with ``service_url`` the UI is a client of the
+    rental service at that URL instead of opening the RFID readers itself."""
+    global active_tab, service
+    if service_url:
+        service = RentalServiceClient(service_url)
     # Add tabs for Register Products and Rental Flow
     notebook = ttk.Notebook(root)
 
@@ -21,17 +53,31 @@ def create_ui(root):
     register_frame = ttk.Frame(notebook)
     rental_frame = ttk.Frame(notebook)
     product_management_frame = ttk.Frame(notebook)
+    on_hire_frame = ttk.Frame(notebook)
 
     notebook.add(register_frame, text="Register Products")
     notebook.add(rental_frame, text="Rental Flow")
     notebook.add(product_management_frame, text="Products Management")
+    notebook.add(on_hire_frame, text="On Hire")
 
     notebook.pack(fill="both", expand=True)
 
-    # Create Register Products UI
-    create_register_products_ui(register_frame)
-    create_rental_flow_ui(rental_frame)
-    create_products_table_ui(product_management_frame)
+    # Tabs are built the first time they are shown, so startup only pays
+    # for the Register Products tab
+    tab_builders = {
+        str(register_frame): create_register_products_ui,
+        str(rental_frame): create_rental_flow_ui,
+        str(product_management_frame): create_products_table_ui,
+        str(on_hire_frame): create_on_hire_ui,
+    }
+
+    def build_tab(tab_id):
+        builder = tab_builders.pop(str(tab_id), None)
+        if builder:
+            with metrics.timer("ui.build_tab." + builder.__name__):
+                builder(notebook.nametowidget(tab_id))
+
+    build_tab(notebook.select())
 
     # Handle tab change
     def on_tab_changed(event):
@@ -40,12 +86,7 @@ def create_ui(root):
         # Get the active tab
         selected_tab = event.widget.tab(event.widget.index("current"))["text"]
         active_tab = selected_tab
-
-        # Start or stop RFID thread based on the tab
-        if selected_tab == "Rental Flow":
-            print("selected_tab : ", selected_tab)
-        elif selected_tab == "Register Products":
-            print("selected_tab : ", selected_tab)
+        build_tab(event.widget.select())
 
     # Bind tab change event
     notebook.bind("<<NotebookTabChanged>>", on_tab_changed)
@@ -53,18 +94,66 @@ def create_ui(root):
     # Initialize active tab
     active_tab = notebook.tab(notebook.index("current"))["text"]
 
+    # Tools menu with the diagnostics window (also on F12)
+    menubar = tk.Menu(root)
+    tools_menu = tk.Menu(menubar, tearoff=0)
+    tools_menu.add_command(label="Diagnostics", accelerator="F12",
+                           command=lambda: open_diagnostics_window(root))
+    menubar.add_cascade(label="Tools", menu=tools_menu)
+    root.config(menu=menubar)
+    root.bind("<F12>", lambda event: open_diagnostics_window(root))
+
     # Handle application close
     root.protocol("WM_DELETE_WINDOW", lambda: on_close(root))
 
 
+def create_search_box(frame, on_search):
+    """Search entry that calls ``on_search(text)`` once typing pauses.
+
+    An empty text means the search was cleared.
+    """
+    search_frame = ttk.Frame(frame)
+    search_frame.pack(fill="x", padx=10)
+    ttk.Label(search_frame, text="Search").pack(side="left", padx=(0, 5))
+    search_entry = ttk.Entry(search_frame)
+    search_entry.pack(side="left", fill="x", expand=True)
+    state = {"pending": None, "text": ""}
+
+    def run_search():
+        state["pending"] = None
+        text = search_entry.get().strip()
+        if text != state["text"]:
+            state["text"] = text
+            on_search(text)
+
+    def schedule_search(event=None):
+        if state["pending"] is not None:
+            search_entry.after_cancel(state["pending"])
+        state["pending"] = search_entry.after(SEARCH_DEBOUNCE_MS, run_search)
+
+    def clear_search():
+        search_entry.delete(0, "end")
+        run_search()
+
+    search_entry.bind("<KeyRelease>", schedule_search)
+    search_entry.bind("<Escape>", lambda event: clear_search())
+    ttk.Button(search_frame, text="Clear", command=clear_search).pack(side="left", padx=5)
+    return search_entry
+
+
 def on_close(root):
     stop_rfid_thread()  # Stop the RFID reader thread
+    if scan_poller:
+        scan_poller.stop()  # Stop following the service's scans
+    if tag_dispatcher:
+        tag_dispatcher.stop()  # Stop the tag worker pool
+    active_rentals_view.close()  # Stop following rental events
+    stop_journal()  # Write out the buffered scan journal
+    close_all_connections()  # Close pooled database connections
     root.destroy()  # Destroy the application
 
 
 def create_register_products_ui(frame):
-    global last_detected_tag, last_detected_time
-
  # Styles for consistent light theme
     style = ttk.Style()
     style.configure("TFrame", foreground="#000", background="#fff")
@@ -178,14 +267,12 @@ def create_register_products_ui(frame):
         try:
             rental_rate = float(rental_rate)
         except ValueError:
-            print("Error", "Rental Rate must be a number.")
             messagebox.showerror("Error", "Rental Rate must be a number.")
             return
 
         result = add_product(name, tag_id, category,
                              status, rental_type, rental_rate)
         if result:
-            print("Error", "001 ", result)
             messagebox.showerror("Error", result)
         else:
             messagebox.showinfo("Success", "Product added successfully!")
@@ -209,40 +296,63 @@ def create_register_products_ui(frame):
             return
 
         try:
-            product = fetch_product_by_tag(product_entries["tag"].get())
+            tag_id = product_entries["tag"].get()
+            if service:
+                product, _ = service.find_tag(tag_id)
+            else:
+                product = lookup_product_by_tag(tag_id)
             if product:
-                product_id = product[0]
-                add_rental(product_id, customer_name, phone,
-                           email, vehicle, place, int(duration))
-                update_product_status(product_id, "Rented")
+                product_id = product.id
+                if service:
+                    service.checkout(product_id, customer_name, phone, email, vehicle, place,
+                                     int(duration))
+                else:
+                    run_action("checkout", tag_id,
+                               product_id=product_id, customer_name=customer_name, phone=phone,
+                               email=email, vehicle=vehicle, place=place,
+                               rental_duration=int(duration))
                 messagebox.showinfo(
                     "Success", f"Rental created successfully for {customer_name}!")
             else:
-                print("002 No product associated with this tag!")
                 messagebox.showerror(
                     "Error", "No product associated with this tag!")
         except Exception as e:
-            print("Error", f"An error occurred: {str(e)}")
             messagebox.showerror("Error", f"An error occurred: {str(e)}")
 
     # RFID Detection
-    def on_tag_detected(tag_id):
-        global last_detected_tag, last_detected_time
-
-        current_time = time.time()
-        debounce_interval = 5
-
-        if tag_id == last_detected_tag and (current_time - last_detected_time) < debounce_interval:
-            print(f"Ignoring repeated detection for tag {tag_id}")
-            return
-
-        last_detected_tag = tag_id
-        last_detected_time = current_time
-
-        product = fetch_product_by_tag(tag_id)
+    # Runs on the reader thread (repeat reads are already dropped there):
+    # hand the tag to the dispatcher.
+    def on_tag_detected(event):
+        tag_dispatcher.publish(event)
+
+    # Runs on a worker thread: all lookups for a scan (the product comes
+    # from the in-memory catalog, the open rental from the database, or
+    # both from the service, which journals the scan itself).
+    @metrics.timed("ui.lookup_tag")
+    def lookup_tag(event):
+        tag_id = event.tag_id
+        if service:
+            product, rental = service.find_tag(tag_id)
+            return tag_id, product, rental, event
+        product = lookup_product_by_tag(tag_id)
+        rental = None
+        if product and product.status == "Rented":
+            rental = fetch_active_rental(product.id)
+        if not product:
+            record_scan(event, "unknown")
+        else:
+            record_scan(event, "rented" if rental else "available",
+                        product.id, rental[0] if rental else None)
+        return tag_id, product, rental, event
+
+    # Runs on the Tk main loop: widget updates and dialogs.
+    @metrics.timed("ui.show_tag")
+    def show_tag(result):
+        tag_id, product, rental, event = result
+        trace = event.trace
         if product:
-            product_id, name, status, rental_type, rental_rate = product
-            product_id, name, status, rental_type, rental_rate = product
+            name, status = product.name, product.status
+            rental_type, rental_rate = product.rental_type, product.rental_rate
             product_entries["name"].delete(0, "end")
             product_entries["name"].insert(0, name)
             product_entries["tag"].delete(0, "end")
@@ -254,10 +364,11 @@ def create_register_products_ui(frame):
             product_info_label.config(
                 text=f"Product Name: {name}\nRental Type: {rental_type}\nRental Rate: {rental_rate}"
             )
+            # The scan is on screen; time spent in the dialogs below is the user's
+            scan_trace.mark(trace, "rendered")
 
             if status == "Rented":
                 # Handle already rented product
-                rental = fetch_active_rental(product_id)
                 if rental:
                     rental_id, start_time = rental
                     confirm = messagebox.askyesno(
@@ -265,25 +376,39 @@ def create_register_products_ui(frame):
                         f"The product '{name}' is currently rented. Do you want to mark it as received?",
                     )
                     if confirm:
-                        # Calculate rental cost
-                        total_cost = calculate_rental_cost(
-                            start_time, rental_type, rental_rate
-                        )
-                        end_rental(rental_id, total_cost)
-                        update_product_status(product_id, "Available")
-                        exit_time_label.config(
-                            text=time.strftime("%Y-%m-%d %H:%M:%S"))
-                        messagebox.showinfo(
-                            "Rental Ended",
-                            f"Rental for '{name}' ended.\nTotal Cost: {total_cost:.2f}",
-                        )
-                        product_info_label.config(text="")
-                        clear_rental_form()
+                        # Runs on a worker thread
+                        def end_rental():
+                            total_cost = calculate_rental_cost(
+                                start_time, rental_type, rental_rate
+                            )
+                            if service:
+                                service.checkin(rental_id, total_cost)
+                            else:
+                                run_action("checkin", tag_id, event.reader_id,
+                                           rental_id=rental_id, total_cost=total_cost)
+                            return total_cost
+
+                        def rental_ended(total_cost):
+                            exit_time_label.config(
+                                text=time.strftime("%Y-%m-%d %H:%M:%S"))
+                            messagebox.showinfo(
+                                "Rental Ended",
+                                f"Rental for '{name}' ended.\nTotal Cost: {total_cost:.2f}",
+                            )
+                            product_info_label.config(text="")
+                            clear_rental_form()
+
+                        def end_rental_failed(e):
+                            messagebox.showerror(
+                                "Error", f"Could not end the rental: {str(e)}")
+
+                        tag_dispatcher.submit(end_rental, rental_ended, end_rental_failed)
             else:
                 # Update Entry Time for new rental
                 entry_time_label.config(
                     text=time.strftime("%Y-%m-%d %H:%M:%S"))
         else:
+            scan_trace.mark(trace, "rendered")
             messagebox.showinfo(
                 "Info", "No product found. You can register it now."
             )
@@ -291,23 +416,24 @@ def create_register_products_ui(frame):
             product_entries["tag"].insert(0, tag_id)
             product_info_label.config(text="")
 
-    # Start RFID Reader
-    start_rfid_thread(on_tag_detected)
+    # Start the tag dispatcher and the RFID Reader once the window is up;
+    # opening the serial ports shouldn't hold back the first frame
+    def start_readers():
+        global tag_dispatcher, scan_poller
+        tag_dispatcher = TagEventDispatcher(frame, lookup_tag, show_tag)
+        tag_dispatcher.start()
 
-    def calculate_rental_cost(start_time, rental_type, rental_rate):
-        from datetime import datetime
+        def on_error(title, message):
+            tag_dispatcher.call_in_ui(messagebox.showerror, title, message)
 
-        start = datetime.strptime(start_time, "%Y-%m-%d %H:%M:%S")
-        end = datetime.now()
-        duration = (end - start).total_seconds()
+        if service:
+            # The readers belong to the service; follow its scans instead
+            scan_poller = ScanPoller(service, on_tag_detected, on_error)
+            scan_poller.start()
+        else:
+            start_rfid_thread(on_tag_detected, on_error)
 
-        if rental_type == "Per Hour":
-            hours = duration / 3600
-            return round(hours * rental_rate, 2)
-        elif rental_type == "Per Day":
-            days = duration / (24 * 3600)
-            return round(days * rental_rate, 2)
-        return 0
+    frame.after(READER_START_DELAY_MS, start_readers)
 
     def clear_rental_form():
         """Clears the rental form fields."""
@@ -323,7 +449,6 @@ def create_register_products_ui(frame):
 
 
 def create_rental_flow_ui(frame):
-    import sqlite3
     # Set style for the background and table
 
     # Set style for the Treeview and headings
@@ -360,6 +485,11 @@ def create_rental_flow_ui(frame):
     )
     title_label.pack(pady=10)
 
+    # Search by customer name, phone, vehicle or place
+    history_state = {"after": None, "has_more": True, "loading": False,
+                     "load_scheduled": False, "search": ""}
+    create_search_box(frame, lambda text: search_rental_history(text))
+
     # Table for Rental History
     rental_table = ttk.Treeview(frame, columns=(
         "ID", "Customer", "Phone", "Product Name", "Rental Type", "Place", "Duration", "Entry Time", "Exit Time", "Total Cost"), show="headings")
@@ -383,36 +513,21 @@ def create_rental_flow_ui(frame):
     rental_table.column("Entry Time", width=150, anchor="center")
     rental_table.column("Exit Time", width=150, anchor="center")
     rental_table.column("Total Cost", width=100, anchor="center")
+    # Scrollbar; scrolling near the bottom loads the next page of history
+    scrollbar_y = ttk.Scrollbar(
+        frame, orient="vertical", command=rental_table.yview)
+    scrollbar_y.pack(side="right", fill="y")
     rental_table.pack(fill="both", expand=True, padx=10, pady=10)
 
-    # Load Rental History
-    def load_rental_history():
-        for item in rental_table.get_children():
-            rental_table.delete(item)
-        conn = sqlite3.connect("db/rental.db")
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT 
-                rentals.id, 
-                rentals.customer_name, 
-                rentals.phone, 
-                products.name AS product_name, 
-                rentals.rental_type, 
-                rentals.place, 
-                rentals.rental_duration, 
-                rentals.start_time, 
-                rentals.end_time, 
-                rentals.total_cost
-            FROM rentals
-            INNER JOIN products ON rentals.product_id = products.id
-        """)
-        rows = cursor.fetchall()
-        print("ROWS : ", rows)
-        for row in rows:
-            formatted_start_time = format_time_to_ist(
-                row[7]) if row[7] else "N/A"
-            formatted_end_time = format_time_to_ist(
-                row[8]) if row[8] else "N/A"
+    # history_state: keyset of the last loaded row, whether older rows
+    # remain, whether a page load is queued, and the active search text
+    # (searches show one page of matches)
+    def insert_history_rows(rows):
+        # Convert the page's entry/exit time columns in one batch
+        start_times = format_times_to_ist([row[7] for row in rows])
+        end_times = format_times_to_ist([row[8] for row in rows])
+        for row, formatted_start_time, formatted_end_time in zip(
+                rows, start_times, end_times):
             rental_table.insert("", "end", values=(
                 row[0],  # ID
                 row[1],  # Customer Name
@@ -425,15 +540,111 @@ def create_rental_flow_ui(frame):
                 formatted_end_time,  # Exit Time (formatted)
                 row[9],  # Total Cost
             ))
-        conn.close()
+
+    @metrics.timed("ui.load_more_history")
+    def load_more_history():
+        if not history_state["has_more"] or history_state["loading"]:
+            return
+        history_state["loading"] = True
+        try:
+            rows = fetch_rental_history_page(history_state["after"])
+            insert_history_rows(rows)
+            if rows:
+                history_state["after"] = (rows[-1][7], rows[-1][0])
+            history_state["has_more"] = len(rows) == HISTORY_PAGE_SIZE
+        finally:
+            history_state["loading"] = False
+
+    def run_scheduled_history_load():
+        history_state["load_scheduled"] = False
+        load_more_history()
+
+    def on_history_scroll(first, last):
+        scrollbar_y.set(first, last)
+        # Scroll callbacks arrive in bursts; queue one page load at a time
+        if (float(last) > 0.9 and history_state["has_more"]
+                and not history_state["load_scheduled"]):
+            history_state["load_scheduled"] = True
+            rental_table.after_idle(run_scheduled_history_load)
+
+    rental_table.configure(yscrollcommand=on_history_scroll)
+
+    # Load Rental History (first page; older rows load while scrolling)
+    def load_rental_history():
+        rental_table.delete(*rental_table.get_children())
+        history_state["after"] = None
+        if history_state["search"]:
+            history_state["has_more"] = False
+            insert_history_rows(search_rentals(history_state["search"]))
+            return
+        history_state["has_more"] = True
+        load_more_history()
+
+    @metrics.timed("ui.search_rental_history")
+    def search_rental_history(text):
+        history_state["search"] = text
+        load_rental_history()
+
+    # Current value of everything on hire (one query, one pricing pass)
+    outstanding_label = ttk.Label(frame, text="", font=("Arial", 12))
+    outstanding_label.pack(pady=5)
+
+    @metrics.timed("ui.load_outstanding_value")
+    def load_outstanding_value():
+        open_count, total = outstanding_value()
+        outstanding_label.config(
+            text=f"On hire: {open_count} machines, outstanding value {total:.2f}")
+
+    def refresh_rental_flow():
+        load_rental_history()
+        load_outstanding_value()
 
     # Refresh Table Button
     refresh_button = ttk.Button(
-        frame, text="Refresh Table", command=load_rental_history)
+        frame, text="Refresh Table", command=refresh_rental_flow)
     refresh_button.pack(pady=10)
 
+    # Export runs on a background thread; poll for its result from the main loop
+    def handle_export_history():
+        path = filedialog.asksaveasfilename(
+            title="Export Rental History",
+            defaultextension=".csv",
+            filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl")],
+        )
+        if not path:
+            return
+        export_button.config(state="disabled")
+        result = {}
+
+        def run_export():
+            try:
+                result["count"] = export_rental_history(path)
+            except Exception as e:
+                result["error"] = e
+            finally:
+                close_db_connection()
+
+        def check_export():
+            if worker.is_alive():
+                frame.after(200, check_export)
+                return
+            export_button.config(state="normal")
+            if "error" in result:
+                messagebox.showerror("Error", f"Export failed: {result['error']}")
+            else:
+                messagebox.showinfo(
+                    "Export Rental History", f"Exported {result['count']} rentals to {path}")
+
+        worker = threading.Thread(target=run_export, daemon=True)
+        worker.start()
+        frame.after(200, check_export)
+
+    export_button = ttk.Button(
+        frame, text="Export History", command=handle_export_history)
+    export_button.pack(pady=10)
+
     # Initial load of rental history
-    load_rental_history()
+    refresh_rental_flow()
 
 
 def create_products_table_ui(frame):
@@ -473,6 +684,10 @@ def create_products_table_ui(frame):
     )
     title_label.pack(pady=10)
 
+    # Search by name, category or RFID tag
+    products_state = {"seq": None, "search": "", "poll": None}
+    create_search_box(frame, lambda text: search_product_table(text))
+
     # Table for Products
     product_table = ttk.Treeview(
         frame,
@@ -517,16 +732,86 @@ def create_products_table_ui(frame):
     product_table.configure(xscrollcommand=scrollbar_x.set,
                             yscrollcommand=scrollbar_y.set)
 
+    # Rows currently shown, keyed by product id, and the change log position
+    # they reflect. Refreshes apply only the products changed since then.
+    # While a search is active the table holds its matches instead, and any
+    # change re-runs the search.
+    shown_products = {}
+
+    def apply_product_row(product):
+        values = product.values()
+        iid = str(product.id)
+        if product.id not in shown_products:
+            product_table.insert("", "end", iid=iid, values=values)
+        elif shown_products[product.id] != values:
+            product_table.item(iid, values=values)
+        shown_products[product.id] = values
+
+    def remove_product_row(product_id):
+        if shown_products.pop(product_id, None) is not None:
+            product_table.delete(str(product_id))
+
     # Load Products
+    @metrics.timed("ui.load_products")
     def load_products():
-        for item in product_table.get_children():
-            product_table.delete(item)
-        products = fetch_all_products()
-        for product in products:
-            print("Product", product)
-            product_table.insert("", "end", values=product)
+        seq, rows, deleted_ids = fetch_product_changes(products_state["seq"])
+        if products_state["search"]:
+            if rows is None or rows or deleted_ids:
+                show_search_results()
+            products_state["seq"] = seq
+            return
+        if rows is None:
+            # Change log does not reach back far enough: diff the full table
+            catalog = rebuild_catalog()
+            rows = list(catalog)
+            deleted_ids = [product_id for product_id in shown_products
+                           if product_id not in catalog]
+        for product_id in deleted_ids:
+            remove_product_row(product_id)
+        for product in rows:
+            apply_product_row(product)
+        products_state["seq"] = seq
+
+    def show_search_results():
+        product_table.delete(*product_table.get_children())
+        shown_products.clear()
+        # Best match first
+        for product in search_products(products_state["search"]):
+            apply_product_row(product)
+
+    @metrics.timed("ui.search_product_table")
+    def search_product_table(text):
+        products_state["search"] = text
+        # Start over from an empty table: the matches, or the full table
+        # in its usual order once the search is cleared
+        product_table.delete(*product_table.get_children())
+        shown_products.clear()
+        products_state["seq"] = None
+        load_products()
+
+    # Poll the change log only while the tab is showing; the notebook
+    # unmaps the frame of a hidden tab, and maps it again when it is shown
+    def poll_product_changes():
+        products_state["poll"] = None
+        if not frame.winfo_ismapped():
+            return
+        load_products()
+        schedule_product_poll()
+
+    def schedule_product_poll():
+        if products_state["poll"] is None:
+            products_state["poll"] = product_table.after(
+                PRODUCT_POLL_INTERVAL_MS, poll_product_changes)
 
+    def on_products_tab_shown(event):
+        if event.widget is frame and products_state["poll"] is None:
+            # Catch up on what changed while the tab was hidden
+            load_products()
+            schedule_product_poll()
+
+    frame.bind("<Map>", on_products_tab_shown)
     load_products()
+    schedule_product_poll()
 
     # Product Edit and Delete Buttons
     button_frame = ttk.Frame(frame)  # No `background` directly here
@@ -540,7 +825,6 @@ def create_products_table_ui(frame):
             return
 
         product = product_table.item(selected_item)["values"]
-        print("Selected Product:", product)
         if not product:
             messagebox.showerror(
                 "Error", "Failed to fetch product details.")
@@ -638,7 +922,6 @@ def create_products_table_ui(frame):
         )
         if confirm:
             delete_product(product_id)
-            print("Success", "Product deleted successfully!")
             messagebox.showinfo("Success", "Product deleted successfully!")
             load_products()
 
@@ -647,6 +930,182 @@ def create_products_table_ui(frame):
     ttk.Button(button_frame, text="Delete Product",
                command=handle_delete_product).pack(side="left", padx=10, pady=10)
 
+    def handle_import_products():
+        path = filedialog.askopenfilename(
+            title="Import Products",
+            filetypes=[("CSV or JSON Lines", "*.csv *.jsonl"), ("All files", "*.*")],
+        )
+        if not path:
+            return
+        try:
+            report = import_products(path)
+        except Exception as e:
+            messagebox.showerror("Error", f"Import failed: {e}")
+            return
+        load_products()
+        message = f"Imported {report['imported']} products."
+        rejected = report["rejected"]
+        if rejected:
+            message += f"\n{len(rejected)} rows rejected:"
+            for line_number, tag_id, reason in rejected[:10]:
+                message += f"\nLine {line_number} ({tag_id}): {reason}"
+            if len(rejected) > 10:
+                message += f"\n... and {len(rejected) - 10} more."
+        messagebox.showinfo("Import Products", message)
+
+    ttk.Button(button_frame, text="Import Products",
+               command=handle_import_products).pack(side="left", padx=10, pady=10)
+
     # Refresh Button
     ttk.Button(button_frame, text="Refresh Table", command=load_products).pack(
         side="right", padx=10, pady=10)
+
+
+def create_on_hire_ui(frame):
+    # Title
+    title_label = ttk.Label(
+        frame,
+        text="On Hire",
+        font=("Arial", 20, "bold"),
+        background="#fff",
+        foreground="#000000",
+    )
+    title_label.pack(pady=10)
+
+    summary_label = ttk.Label(frame, text="", font=("Arial", 12))
+    summary_label.pack(pady=5)
+
+    # Table of machines currently out
+    columns = ("Rental ID", "Product", "Customer", "Phone",
+               "Start Time", "Due Time", "Accrued Cost")
+    on_hire_table = ttk.Treeview(frame, columns=columns, show="headings")
+    for column in columns:
+        on_hire_table.heading(column, text=column)
+        on_hire_table.column(column, width=120, anchor="center")
+    on_hire_table.tag_configure("overdue", foreground="#c62828")
+
+    scrollbar_y = ttk.Scrollbar(
+        frame, orient="vertical", command=on_hire_table.yview)
+    scrollbar_y.pack(side="right", fill="y")
+    on_hire_table.configure(yscrollcommand=scrollbar_y.set)
+    on_hire_table.pack(fill="both", expand=True, padx=10, pady=10)
+
+    shown_rows = {}  # rental_id -> (values, tags) currently in the table
+
+    # Refresh from the in-memory view only; no database access
+    @metrics.timed("ui.refresh_on_hire")
+    def refresh_on_hire():
+        now = time.time()
+        rows = active_rentals_view.snapshot(now)
+        current_ids = set()
+        total = 0
+        for rental, cost in rows:
+            current_ids.add(rental.rental_id)
+            total += cost
+            values = (rental.rental_id, rental.product_name, rental.customer_name,
+                      rental.phone, rental.start_display, rental.due_display, f"{cost:.2f}")
+            tags = ("overdue",) if now > rental.due_at else ()
+            shown = shown_rows.get(rental.rental_id)
+            if shown is None:
+                on_hire_table.insert("", "end", iid=str(rental.rental_id),
+                                     values=values, tags=tags)
+            elif shown != (values, tags):
+                on_hire_table.item(str(rental.rental_id), values=values, tags=tags)
+            shown_rows[rental.rental_id] = (values, tags)
+        for rental_id in set(shown_rows) - current_ids:
+            del shown_rows[rental_id]
+            on_hire_table.delete(str(rental_id))
+        summary_label.config(
+            text=f"{len(rows)} machines on hire, accrued value {total:.2f}")
+        frame.after(ON_HIRE_REFRESH_MS, refresh_on_hire)
+
+    active_rentals_view.seed()
+    refresh_on_hire()
+
+
+def open_diagnostics_window(root):
+    """Show the collected metrics: timings slowest-first, then counters."""
+    global diagnostics_window
+    if diagnostics_window is not None and diagnostics_window.winfo_exists():
+        diagnostics_window.lift()
+        return
+
+    window = tk.Toplevel(root)
+    window.title("Diagnostics")
+    window.geometry("760x640")
+    diagnostics_window = window
+
+    controls = ttk.Frame(window)
+    controls.pack(fill="x", padx=10, pady=10)
+
+    collecting = tk.BooleanVar(value=metrics.enabled)
+    ttk.Checkbutton(controls, text="Collect metrics", variable=collecting,
+                    command=lambda: metrics.enable(collecting.get())).pack(side="left")
+
+    columns = ("Name", "Count", "Mean ms", "p95 ms", "Max ms", "Total ms")
+    stats_table = ttk.Treeview(window, columns=columns, show="headings")
+    for column in columns:
+        stats_table.heading(column, text=column)
+        stats_table.column(column, width=90, anchor="e")
+    stats_table.column("Name", width=280, anchor="w")
+    scrollbar_y = ttk.Scrollbar(window, orient="vertical", command=stats_table.yview)
+    scrollbar_y.pack(side="right", fill="y")
+    stats_table.configure(yscrollcommand=scrollbar_y.set)
+    stats_table.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+
+    # Scan latency per stage over the recent scans (always recorded)
+    ttk.Label(window, text="Scan latency (recent scans)",
+              font=("Arial", 12, "bold")).pack(anchor="w", padx=10)
+    latency_columns = ("Stage", "Scans", "p50 ms", "p95 ms", "p99 ms", "Max ms")
+    latency_table = ttk.Treeview(window, columns=latency_columns, show="headings",
+                                 height=len(scan_trace.STAGES))
+    for column in latency_columns:
+        latency_table.heading(column, text=column)
+        latency_table.column(column, width=90, anchor="e")
+    latency_table.column("Stage", width=280, anchor="w")
+    latency_table.pack(fill="x", padx=10, pady=(0, 10))
+
+    def refresh_stats():
+        if not window.winfo_exists():
+            return
+        stats = metrics.snapshot()
+        stats_table.delete(*stats_table.get_children())
+        timings = sorted(stats["timings"].items(), key=lambda item: -item[1]["total_ms"])
+        for name, s in timings:
+            stats_table.insert("", "end", values=(
+                name, s["count"], f"{s['mean_ms']:.3f}", f"{s['p95_ms']:.3f}",
+                f"{s['max_ms']:.3f}", f"{s['total_ms']:.1f}"))
+        for name, value in stats["counters"].items():
+            stats_table.insert("", "end", values=(name, value, "", "", "", ""))
+        latency_table.delete(*latency_table.get_children())
+        for stage, s in scan_trace.summary().items():
+            latency_table.insert("", "end", values=(
+                stage, s["count"], f"{s['p50_ms']:.3f}", f"{s['p95_ms']:.3f}",
+                f"{s['p99_ms']:.3f}", f"{s['max_ms']:.3f}"))
+        window.after(DIAGNOSTICS_REFRESH_MS, refresh_stats)
+
+    def reset_stats():
+        metrics.reset()
+        scan_trace.clear()
+        stats_table.delete(*stats_table.get_children())
+        latency_table.delete(*latency_table.get_children())
+
+    def save_stats():
+        path = filedialog.asksaveasfilename(
+            parent=window,
+            title="Save Diagnostics",
+            defaultextension=".json",
+            filetypes=[("JSON", "*.json"), ("Text report", "*.txt")],
+        )
+        if not path:
+            return
+        try:
+            metrics.dump(path)
+            messagebox.showinfo("Diagnostics", f"Saved to {path}", parent=window)
+        except OSError as e:
+            messagebox.showerror("Error", f"Could not save diagnostics: {e}", parent=window)
+
+    ttk.Button(controls, text="Save to File", command=save_stats).pack(side="right", padx=5)
+    ttk.Button(controls, text="Reset", command=reset_stats).pack(side="right", padx=5)
+
+    refresh_stats()
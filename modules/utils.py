@@ -1,14 +1,54 @@
-from datetime import datetime
-import pytz
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+
+IST_ZONE_NAME = "Asia/Kolkata"
+# IST has no daylight saving, so a fixed offset is exact and much cheaper
+# than a pytz zone lookup per value.
+IST_OFFSET = timedelta(hours=5, minutes=30)
+# Shortened format: YYYY-MM-DD HH:MM AM/PM
+DISPLAY_FORMAT = "%Y-%m-%d %I:%M %p"
+
+
+@lru_cache(maxsize=None)
+def get_zone(tz_name):
+    """Return a cached tzinfo for a zone name."""
+    # pytz is only needed for zones other than IST; importing it lazily
+    # keeps it (and its zone database) off the startup path.
+    import pytz
+    return pytz.timezone(tz_name)
+
+
+@lru_cache(maxsize=4096)
+def _format_minute(minute_prefix, tz_name):
+    # The display format has minute resolution, so the result only depends
+    # on the "YYYY-MM-DD HH:MM" prefix; memoizing on it covers every value
+    # recorded within the same minute.
+    utc_time = datetime.fromisoformat(minute_prefix)
+    if tz_name == IST_ZONE_NAME:
+        local_time = utc_time + IST_OFFSET
+    else:
+        local_time = utc_time.replace(tzinfo=timezone.utc).astimezone(
+            get_zone(tz_name))
+    return local_time.strftime(DISPLAY_FORMAT)
+
+
+def format_times_to_ist(timestamps, tz_name=IST_ZONE_NAME):
+    """Converts a column of UTC timestamps (as stored by SQLite) to formatted
+    local times in one call. Empty values become "N/A"."""
+    format_minute = _format_minute
+    formatted = []
+    append = formatted.append
+    for timestamp in timestamps:
+        if not timestamp:
+            append("N/A")
+        else:
+            # Assuming the database stores time as YYYY-MM-DD HH:MM:SS
+            append(format_minute(timestamp[:16], tz_name))
+    return formatted
 
 
 def format_time_to_ist(timestamp):
     """Converts a UTC timestamp to Indian Standard Time (IST) and formats it in 12-hour format."""
     if not timestamp:
         return "N/A"
-    # Assuming the database stores time in this format
-    utc_time = datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S")
-    ist_time = utc_time.replace(tzinfo=pytz.UTC).astimezone(
-        pytz.timezone("Asia/Kolkata"))
-    # Shortened format: YYYY-MM-DD HH:MM AM/PM
-    return ist_time.strftime("%Y-%m-%d %I:%M %p")
+    return _format_minute(timestamp[:16], IST_ZONE_NAME)
@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from modules import active_rentals, database
+from modules.active_rentals import ActiveRentalsView
+
+
+class ActiveRentalsViewTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        database.use_database(os.path.join(self.tempdir.name, "rental.db"))
+        for tag in ("tag-1", "tag-2", "tag-3"):
+            database.add_product(f"Drill {tag}", tag, "Tools", "Available", "Per Day", 100)
+        self.view = ActiveRentalsView()
+
+    def tearDown(self):
+        self.view.close()
+        database.close_all_connections()
+        database.reset_catalog()
+        self.tempdir.cleanup()
+
+    def checkout(self, tag):
+        product = database.lookup_product_by_tag(tag)
+        return database.checkout(product.id, "Asha", "9000000000", None, "KL-01", "Yard", 1)
+
+    def rental_ids(self):
+        return sorted(rental.rental_id for rental, _ in self.view.snapshot())
+
+    def test_seed_then_follow_events(self):
+        first = self.checkout("tag-1")
+        self.view.seed()
+        self.assertEqual(self.rental_ids(), [first])
+        second = self.checkout("tag-2")
+        self.assertEqual(self.rental_ids(), [first, second])
+        database.checkin(first, 100.0)
+        self.assertEqual(self.rental_ids(), [second])
+
+    def test_changes_while_seeding_are_not_lost(self):
+        closed = self.checkout("tag-1")
+        kept = self.checkout("tag-2")
+        fetch_open_rentals = active_rentals.fetch_open_rentals
+
+        def fetch_then_race():
+            # The query's snapshot predates a check-in and a checkout that
+            # commit (and notify) before seed() stores its result
+            rows = fetch_open_rentals()
+            database.checkin(closed, 100.0)
+            opened.append(self.checkout("tag-3"))
+            return rows
+
+        opened = []
+        with mock.patch.object(active_rentals, "fetch_open_rentals", side_effect=fetch_then_race):
+            self.view.seed()
+        self.assertEqual(self.rental_ids(), sorted([kept] + opened))
+
+    def test_reseed_replaces_contents(self):
+        rental_id = self.checkout("tag-1")
+        self.view.seed()
+        self.view.close()
+        database.checkin(rental_id, 100.0)
+        self.view.seed()
+        self.assertEqual(self.rental_ids(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
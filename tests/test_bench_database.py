@@ -0,0 +1,32 @@
+import json
+import os
+import tempfile
+import unittest
+
+from modules import database
+
+
+class BenchDatabaseTest(unittest.TestCase):
+    """Runs the scale benchmark at a tiny size, so it keeps working as the database layer changes."""
+
+    def tearDown(self):
+        database.close_all_connections()
+        database.reset_catalog()
+
+    def test_small_run_writes_report(self):
+        from benchmarks.bench_database import main
+
+        with tempfile.TemporaryDirectory() as tempdir:
+            output = os.path.join(tempdir, "bench.json")
+            main(["--sizes", "500", "--iterations", "5", "--output", output,
+                  "--workdir", tempdir])
+            with open(output) as f:
+                report = json.load(f)
+        self.assertEqual(report["datasets"][0]["size"], 500)
+        operations = {result["operation"] for result in report["results"]}
+        self.assertIn("checkout_and_checkin", operations)
+        self.assertIn("rental_history_deep_page", operations)
+
+
+if __name__ == "__main__":
+    unittest.main()
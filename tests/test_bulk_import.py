@@ -0,0 +1,69 @@
+import json
+import os
+import tempfile
+import unittest
+
+from modules import database
+from modules.bulk_import import import_products
+
+
+class BulkImportTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        database.use_database(os.path.join(self.tempdir.name, "rental.db"))
+        database.add_product("Drill", "tag-1", "Tools", "Available", "Per Day", 100)
+
+    def tearDown(self):
+        database.close_all_connections()
+        database.reset_catalog()
+        self.tempdir.cleanup()
+
+    def write(self, name, text):
+        path = os.path.join(self.tempdir.name, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return path
+
+    def test_csv_import_and_rejections(self):
+        path = self.write("products.csv", "\n".join([
+            "name,tag_id,category,rental_type,rental_rate",
+            "Saw,tag-2,Tools,Per Hour,50",
+            "Drill Copy,tag-1,Tools,Per Day,100",     # already registered
+            "Saw Copy,tag-2,Tools,Per Hour,50",       # repeated in the file
+            ",tag-3,Tools,Per Day,10",                # no name
+            "Mixer,tag-4,Mixers,Per Week,10",         # unknown rental type
+            "Pump,tag-5,Pumps,Per Day,cheap",         # rate not a number
+            "Lift,tag-6,Lifts,,",                     # defaults
+        ]) + "\n")
+        report = import_products(path, chunk_size=2)
+        self.assertEqual(report["imported"], 2)
+        self.assertEqual([(line, reason) for line, _, reason in report["rejected"]], [
+            (3, "A product with this RFID tag already exists."),
+            (4, "Duplicate RFID tag in file."),
+            (5, "Product Name and RFID Tag are required."),
+            (6, "Unknown rental type: Per Week"),
+            (7, "Rental Rate must be a number."),
+        ])
+        lift = database.lookup_product_by_tag("tag-6")
+        self.assertEqual((lift.status, lift.rental_type, lift.rental_rate),
+                         ("Available", "Per Day", 0))
+        self.assertEqual(database.lookup_product_by_tag("tag-2").name, "Saw")
+
+    def test_jsonl_import_and_bad_lines(self):
+        path = self.write("products.jsonl", "\n".join([
+            json.dumps({"name": "Saw", "tag": "tag-2", "rental_rate": 50}),
+            "{not json",
+            "[1, 2]",
+            "",
+            json.dumps({"name": "Pump", "tag_id": "tag-3"}),
+        ]) + "\n")
+        report = import_products(path)
+        self.assertEqual(report["imported"], 2)
+        self.assertEqual([line for line, _, _ in report["rejected"]], [2, 3])
+        self.assertTrue(report["rejected"][0][2].startswith("Invalid JSON"))
+        self.assertEqual(database.lookup_product_by_tag("tag-3").name, "Pump")
+
+
+if __name__ == "__main__":
+    unittest.main()
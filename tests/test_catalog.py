@@ -0,0 +1,127 @@
+import random
+import threading
+import time
+import unittest
+
+from modules.catalog import Product, ProductCatalog
+
+
+def make_row(product_id, tag=None, status="Available", rate=100.0):
+    return (product_id, f"Machine {product_id}", tag or f"tag-{product_id}",
+            "Excavator", status, "Per Day", rate)
+
+
+class ProductCatalogTest(unittest.TestCase):
+
+    def test_lookup_by_tag_and_id(self):
+        catalog = ProductCatalog([make_row(1), make_row(2)])
+        self.assertEqual(catalog.by_tag("tag-2"), Product.from_row(make_row(2)))
+        self.assertEqual(catalog.get(1), Product.from_row(make_row(1)))
+        self.assertIsNone(catalog.by_tag("tag-3"))
+        self.assertIsNone(catalog.get(3))
+        self.assertEqual(len(catalog), 2)
+        self.assertIn(1, catalog)
+        self.assertNotIn(3, catalog)
+
+    def test_put_replaces_product(self):
+        catalog = ProductCatalog([make_row(1)])
+        catalog.put(make_row(1, status="Rented", rate=250.0))
+        product = catalog.by_tag("tag-1")
+        self.assertEqual(product.status, "Rented")
+        self.assertEqual(product.rental_rate, 250.0)
+        self.assertEqual(len(catalog), 1)
+
+    def test_put_moves_tag(self):
+        catalog = ProductCatalog([make_row(1)])
+        catalog.put(make_row(1, tag="tag-new"))
+        self.assertIsNone(catalog.by_tag("tag-1"))
+        self.assertEqual(catalog.by_tag("tag-new").id, 1)
+
+    def test_put_takes_tag_from_other_product(self):
+        catalog = ProductCatalog([make_row(1), make_row(2)])
+        catalog.put(make_row(2, tag="tag-1"))
+        self.assertEqual(catalog.by_tag("tag-1").id, 2)
+        self.assertNotIn(1, catalog)
+
+    def test_remove(self):
+        catalog = ProductCatalog([make_row(1), make_row(2)])
+        self.assertTrue(catalog.remove(1))
+        self.assertFalse(catalog.remove(1))
+        self.assertIsNone(catalog.by_tag("tag-1"))
+        self.assertEqual([product.id for product in catalog], [2])
+
+    def test_unicode_and_missing_values(self):
+        catalog = ProductCatalog([(1, "Bétonnière ⚙", "tag-é", None, "Available", None, None)])
+        product = catalog.by_tag("tag-é")
+        self.assertEqual(product.name, "Bétonnière ⚙")
+        self.assertEqual(product.category, "")
+        self.assertEqual(product.rental_rate, 0)
+
+    def test_matches_dict_under_random_writes(self):
+        self.check_random_writes(ProductCatalog())
+
+    def test_benchmark_open_addressing_catalog_matches(self):
+        # benchmarks/bench_catalog.py compares against it; it must behave the same
+        from benchmarks.bench_catalog import OpenAddressingCatalog
+        self.check_random_writes(OpenAddressingCatalog())
+
+    def check_random_writes(self, catalog):
+        # Enough writes to force rehashing and compaction
+        rng = random.Random(1)
+        expected = {}
+        for step in range(20000):
+            product_id = rng.randint(1, 500)
+            if rng.random() < 0.2:
+                catalog.remove(product_id)
+                expected.pop(product_id, None)
+            else:
+                row = make_row(product_id, tag=f"tag-{rng.randint(1, 600)}", rate=float(step))
+                # Tags are unique: the newer row takes the tag over
+                for other_id, other in list(expected.items()):
+                    if other[2] == row[2] and other_id != product_id:
+                        del expected[other_id]
+                catalog.put(row)
+                expected[product_id] = row
+        self.assertEqual(len(catalog), len(expected))
+        self.assertEqual(sorted(product.values() for product in catalog), sorted(expected.values()))
+        for row in expected.values():
+            self.assertEqual(catalog.by_tag(row[2]).values(), row)
+            self.assertEqual(catalog.get(row[0]).values(), row)
+
+    def test_sequential_id_updates_stay_fast(self):
+        count = 50000
+        catalog = ProductCatalog((make_row(i) for i in range(1, count + 1)), capacity=count)
+        started = time.perf_counter()
+        for product_id in range(1, 1001):
+            catalog.put(make_row(product_id, status="Rented"))
+        # Each update used to probe the whole run of sequential ids (when the
+        # catalog was indexed by open addressing)
+        self.assertLess(time.perf_counter() - started, 1.0)
+
+    def test_reads_during_writes(self):
+        catalog = ProductCatalog(make_row(i) for i in range(1, 3001))
+        misses = []
+        stop = threading.Event()
+
+        def read():
+            while not stop.is_set():
+                try:
+                    if catalog.by_tag("tag-5") is None:
+                        misses.append(None)
+                except Exception as e:
+                    misses.append(e)
+
+        reader = threading.Thread(target=read)
+        reader.start()
+        try:
+            for rate in range(10):
+                for product_id in range(1, 3001):
+                    catalog.put(make_row(product_id, rate=float(rate)))
+        finally:
+            stop.set()
+            reader.join()
+        self.assertEqual(misses, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+from modules import database
+
+
+class CheckoutCheckinTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        database.use_database(os.path.join(self.tempdir.name, "rental.db"))
+        database.add_product("Drill", "tag-1", "Tools", "Available", "Per Day", 100)
+        self.product_id = database.lookup_product_by_tag("tag-1").id
+
+    def tearDown(self):
+        database.close_all_connections()
+        database.reset_catalog()
+        self.tempdir.cleanup()
+
+    def checkout(self, product_id=None):
+        return database.checkout(product_id or self.product_id, "Asha", "9000000000", None,
+                                 "KL-01", "Yard", 2)
+
+    def product_status(self):
+        status, = database.get_db_connection().execute(
+            "SELECT status FROM products WHERE id = ?", (self.product_id,)).fetchone()
+        return status
+
+    def rental_count(self):
+        return database.get_db_connection().execute("SELECT COUNT(*) FROM rentals").fetchone()[0]
+
+    def test_checkout_and_checkin(self):
+        rental_id = self.checkout()
+        self.assertEqual(self.product_status(), "Rented")
+        self.assertEqual(database.fetch_active_rental(self.product_id)[0], rental_id)
+        rental_type, duration = database.get_db_connection().execute(
+            "SELECT rental_type, rental_duration FROM rentals WHERE id = ?", (rental_id,)).fetchone()
+        self.assertEqual((rental_type, duration), ("Per Day", 2))
+
+        self.assertEqual(database.checkin(rental_id, 200.0), self.product_id)
+        self.assertEqual(self.product_status(), "Available")
+        self.assertIsNone(database.fetch_active_rental(self.product_id))
+
+    def test_checkout_refused(self):
+        self.checkout()
+        with self.assertRaises(ValueError):
+            self.checkout()
+        with self.assertRaises(ValueError):
+            self.checkout(product_id=9999)
+        self.assertEqual(self.rental_count(), 1)
+
+    def test_checkin_refused(self):
+        rental_id = self.checkout()
+        database.checkin(rental_id, 200.0)
+        for closed_or_unknown in (rental_id, 9999):
+            with self.assertRaises(ValueError):
+                database.checkin(closed_or_unknown, 200.0)
+
+    def test_failed_checkin_changes_nothing(self):
+        rental_id = self.checkout()
+        with mock.patch.object(database, "_record_rental_summary",
+                               side_effect=sqlite3.OperationalError("disk I/O error")):
+            with self.assertRaises(sqlite3.OperationalError):
+                database.checkin(rental_id, 200.0)
+        self.assertEqual(self.product_status(), "Rented")
+        self.assertEqual(database.fetch_active_rental(self.product_id)[0], rental_id)
+
+    def test_listeners_hear_about_changes(self):
+        events = []
+        listener = lambda event, data: events.append((event, data))
+        database.add_rental_listener(listener)
+        try:
+            rental_id = self.checkout()
+            database.checkin(rental_id, 200.0)
+        finally:
+            database.remove_rental_listener(listener)
+        self.assertEqual([event for event, _ in events], ["checkout", "checkin"])
+        self.assertEqual(events[0][1][0], rental_id)
+        self.assertEqual(events[1][1], rental_id)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+
+from modules import database
+
+
+class ConnectionManagerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        database.use_database(os.path.join(self.tempdir.name, "rental.db"))
+
+    def tearDown(self):
+        database.close_all_connections()
+        database.reset_catalog()
+        self.tempdir.cleanup()
+
+    def connection_in_thread(self):
+        connections = []
+        thread = threading.Thread(target=lambda: connections.append(database.get_db_connection()))
+        thread.start()
+        thread.join()
+        return connections[0]
+
+    def test_one_persistent_connection_per_thread(self):
+        conn = database.get_db_connection()
+        self.assertIs(database.get_db_connection(), conn)
+        self.assertIsNot(self.connection_in_thread(), conn)
+
+    def test_connections_use_wal(self):
+        mode, = database.get_db_connection().execute("PRAGMA journal_mode").fetchone()
+        self.assertEqual(mode, "wal")
+
+    def test_close_db_connection_reopens_on_next_use(self):
+        conn = database.get_db_connection()
+        database.close_db_connection()
+        with self.assertRaises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+        self.assertEqual(database.get_db_connection().execute("SELECT 1").fetchone(), (1,))
+
+    def test_close_all_connections_closes_every_thread(self):
+        other = self.connection_in_thread()
+        conn = database.get_db_connection()
+        database.close_all_connections()
+        for closed in (conn, other):
+            with self.assertRaises(sqlite3.ProgrammingError):
+                closed.execute("SELECT 1")
+        # Threads that query again get a fresh connection
+        self.assertIsNot(database.get_db_connection(), conn)
+
+    def test_use_database_switches_files(self):
+        database.add_product("Drill", "tag-1", "Tools", "Available", "Per Day", 100)
+        database.use_database(os.path.join(self.tempdir.name, "other.db"))
+        count, = database.get_db_connection().execute("SELECT COUNT(*) FROM products").fetchone()
+        self.assertEqual(count, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
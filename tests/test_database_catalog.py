@@ -0,0 +1,89 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from modules import database
+from modules.catalog import ProductCatalog
+
+
+class DatabaseCatalogTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        database.use_database(os.path.join(self.tempdir.name, "rental.db"))
+        database.add_product("Drill", "tag-1", "Tools", "Available", "Per Day", 100)
+
+    def tearDown(self):
+        database.close_all_connections()
+        database.reset_catalog()
+        self.tempdir.cleanup()
+
+    def test_writes_update_catalog(self):
+        product = database.lookup_product_by_tag("tag-1")
+        database.update_product(product.id, "Drill", "tag-2", "Tools", "Available", "Per Day", 120)
+        self.assertIsNone(database.lookup_product_by_tag("tag-1"))
+        self.assertEqual(database.lookup_product_by_tag("tag-2").rental_rate, 120)
+
+        rental_id = database.checkout(product.id, "Asha", "9000000000", None, "KL-01", "Yard", 1)
+        self.assertEqual(database.lookup_product_by_tag("tag-2").status, "Rented")
+        database.checkin(rental_id, 100.0)
+        self.assertEqual(database.lookup_product_by_tag("tag-2").status, "Available")
+
+        database.delete_product(product.id)
+        self.assertIsNone(database.lookup_product_by_tag("tag-2"))
+
+    def test_lookup_by_tag_uses_the_catalog(self):
+        product = database.lookup_product_by_tag("tag-1")
+        self.assertEqual((product.name, product.status), ("Drill", "Available"))
+        self.assertIsNone(database.lookup_product_by_tag("tag-unknown"))
+        self.assertEqual(database.add_product("Saw", "tag-1", "Tools", "Available", "Per Hour", 50),
+                         "Error: A product with this RFID tag already exists.")
+        # Served from memory: a write behind the catalog's back is not seen
+        # until the catalog is rebuilt
+        conn = database.get_db_connection()
+        with conn:
+            conn.execute("UPDATE products SET name = 'Hammer Drill' WHERE id = ?", (product.id,))
+        self.assertEqual(database.lookup_product_by_tag("tag-1").name, "Drill")
+        database.rebuild_catalog()
+        self.assertEqual(database.lookup_product_by_tag("tag-1").name, "Hammer Drill")
+
+    def test_checkout_requires_available_product(self):
+        product = database.lookup_product_by_tag("tag-1")
+        database.update_product_status(product.id, "Not Available")
+        with self.assertRaises(ValueError):
+            database.checkout(product.id, "Asha", "9000000000", None, "KL-01", "Yard", 1)
+        self.assertIsNone(database.fetch_active_rental(product.id))
+
+    def test_write_during_load_is_not_lost(self):
+        loading = threading.Event()
+        release = threading.Event()
+
+        class SlowCatalog(ProductCatalog):
+            def __init__(self, rows=(), capacity=0):
+                super().__init__(rows, capacity)
+                loading.set()
+                release.wait(5)
+
+        def add_product():
+            database.add_product("Saw", "tag-saw", "Tools", "Available", "Per Hour", 50)
+            database.close_db_connection()
+
+        with mock.patch.object(database, "ProductCatalog", SlowCatalog):
+            loader = threading.Thread(target=database.get_catalog)
+            loader.start()
+            self.assertTrue(loading.wait(5))
+            # The catalog has read the products table; add one before it is published
+            writer = threading.Thread(target=add_product)
+            writer.start()
+            writer.join(0.2)
+            release.set()
+            loader.join(5)
+            writer.join(5)
+
+        self.assertEqual(database.lookup_product_by_tag("tag-saw").name, "Saw")
+
+
+if __name__ == "__main__":
+    unittest.main()
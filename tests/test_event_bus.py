@@ -0,0 +1,81 @@
+import threading
+import time
+import unittest
+
+from modules.event_bus import TagEventDispatcher
+
+
+class FakeWidget:
+    """Stands in for a Tk widget; ``pump`` runs the scheduled ``after`` callbacks."""
+
+    def __init__(self):
+        self.callbacks = []
+
+    def after(self, ms, func):
+        self.callbacks.append(func)
+
+    def pump(self):
+        callbacks, self.callbacks = self.callbacks, []
+        for func in callbacks:
+            func()
+
+
+class TagEventDispatcherTest(unittest.TestCase):
+
+    def setUp(self):
+        self.widget = FakeWidget()
+        self.ui_thread = threading.current_thread()
+        self.results = []
+        self.dispatcher = TagEventDispatcher(self.widget, self.handle, self.show)
+        self.dispatcher.start()
+
+    def tearDown(self):
+        self.dispatcher.stop()
+
+    def handle(self, event):
+        if event == "bad":
+            raise ValueError(event)
+        return event.upper(), threading.current_thread()
+
+    def show(self, result):
+        self.results.append((result, threading.current_thread()))
+
+    def pump_until(self, condition, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while not condition() and time.monotonic() < deadline:
+            self.widget.pump()
+            time.sleep(0.01)
+        return condition()
+
+    def test_events_are_handled_on_workers_and_shown_on_the_ui_thread(self):
+        self.dispatcher.publish("tag-1")
+        self.assertTrue(self.pump_until(lambda: self.results))
+        ((value, worker), shown_on), = self.results
+        self.assertEqual(value, "TAG-1")
+        self.assertIsNot(worker, self.ui_thread)
+        self.assertIs(shown_on, self.ui_thread)
+
+    def test_failing_handler_does_not_stop_the_dispatcher(self):
+        self.dispatcher.publish("bad")
+        self.dispatcher.publish("tag-2")
+        self.assertTrue(self.pump_until(lambda: self.results))
+        self.assertEqual([result[0][0] for result in self.results], ["TAG-2"])
+
+    def test_submit_reports_result_or_error_on_the_ui_thread(self):
+        outcomes = []
+
+        def fail():
+            raise ValueError("rental already closed")
+
+        self.dispatcher.submit(lambda: 42, lambda result: outcomes.append(
+            ("result", result, threading.current_thread())))
+        self.dispatcher.submit(fail, None, lambda e: outcomes.append(
+            ("error", str(e), threading.current_thread())))
+        self.assertTrue(self.pump_until(lambda: len(outcomes) == 2))
+        self.assertEqual(sorted(outcome[:2] for outcome in outcomes),
+                         [("error", "rental already closed"), ("result", 42)])
+        self.assertTrue(all(outcome[2] is self.ui_thread for outcome in outcomes))
+
+
+if __name__ == "__main__":
+    unittest.main()
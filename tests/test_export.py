@@ -0,0 +1,74 @@
+import csv
+import json
+import os
+import tempfile
+import unittest
+
+from modules import database
+from modules.export import export_rental_history, iter_rental_history, EXPORT_COLUMNS
+
+# UTC start times and the IST date each falls on
+START_TIMES = [
+    ("2024-03-01 18:29:59", "2024-03-01"),
+    ("2024-03-01 18:30:00", "2024-03-02"),
+    ("2024-03-02 18:29:59", "2024-03-02"),
+    ("2024-03-02 18:30:00", "2024-03-03"),
+]
+
+
+class ExportTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        database.use_database(os.path.join(self.tempdir.name, "rental.db"))
+        database.add_product("Drill", "tag-1", "Tools", "Available", "Per Day", 100)
+        product_id = database.lookup_product_by_tag("tag-1").id
+        conn = database.get_db_connection()
+        with conn:
+            conn.executemany("""
+                INSERT INTO rentals (product_id, customer_name, phone, place, rental_type,
+                                     rental_duration, start_time)
+                VALUES (?, ?, '9000000000', 'Yard', 'Per Day', 1, ?)
+            """, [(product_id, f"Customer {i}", start) for i, (start, _) in enumerate(START_TIMES)])
+
+    def tearDown(self):
+        database.close_all_connections()
+        database.reset_catalog()
+        self.tempdir.cleanup()
+
+    def customers(self, start_date=None, end_date=None):
+        return [row[1] for batch in iter_rental_history(start_date, end_date, batch_size=1)
+                for row in batch]
+
+    def test_date_filters_use_ist_days(self):
+        self.assertEqual(self.customers("2024-03-02", "2024-03-02"), ["Customer 1", "Customer 2"])
+        self.assertEqual(self.customers(start_date="2024-03-02"),
+                         ["Customer 1", "Customer 2", "Customer 3"])
+        self.assertEqual(self.customers(end_date="2024-03-01"), ["Customer 0"])
+        self.assertEqual(len(self.customers()), 4)
+
+    def test_times_are_converted(self):
+        row = next(iter_rental_history("2024-03-02", "2024-03-02"))[0]
+        self.assertEqual(row[EXPORT_COLUMNS.index("start_time")], "2024-03-02 12:00 AM")
+        self.assertEqual(row[EXPORT_COLUMNS.index("end_time")], "N/A")
+
+    def test_csv_and_jsonl_files(self):
+        csv_path = os.path.join(self.tempdir.name, "history.csv")
+        self.assertEqual(export_rental_history(csv_path, batch_size=3), 4)
+        with open(csv_path, newline="", encoding="utf-8") as f:
+            rows = list(csv.reader(f))
+        self.assertEqual(tuple(rows[0]), EXPORT_COLUMNS)
+        self.assertEqual(len(rows), 5)
+
+        jsonl_path = os.path.join(self.tempdir.name, "history.jsonl")
+        self.assertEqual(export_rental_history(jsonl_path, start_date="2024-03-03"), 1)
+        with open(jsonl_path, encoding="utf-8") as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(records[0]["customer_name"], "Customer 3")
+
+        with self.assertRaises(ValueError):
+            export_rental_history(csv_path, fmt="xlsx")
+
+
+if __name__ == "__main__":
+    unittest.main()
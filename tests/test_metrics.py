@@ -0,0 +1,71 @@
+import json
+import os
+import tempfile
+import unittest
+
+from modules import metrics
+
+
+class MetricsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.was_enabled = metrics.enabled
+        metrics.reset()
+        metrics.enable()
+
+    def tearDown(self):
+        metrics.enable(self.was_enabled)
+        metrics.reset()
+
+    def test_disabled_records_nothing(self):
+        metrics.enable(False)
+        metrics.increment("rfid.frames")
+        metrics.observe("db.query", 0.001)
+        stats = metrics.snapshot()
+        self.assertEqual((stats["counters"], stats["timings"]), ({}, {}))
+
+    def test_timed_counts_calls_and_errors(self):
+        @metrics.timed("test.work")
+        def work(fail=False):
+            if fail:
+                raise ValueError
+            return 42
+
+        self.assertEqual(work(), 42)
+        with self.assertRaises(ValueError):
+            work(fail=True)
+        with metrics.timer("test.block"):
+            pass
+        stats = metrics.snapshot()
+        self.assertEqual(stats["timings"]["test.work"]["count"], 2)
+        self.assertEqual(stats["timings"]["test.block"]["count"], 1)
+        self.assertEqual(stats["counters"], {"test.work.errors": 1})
+
+    def test_histogram_percentiles(self):
+        histogram = metrics.Histogram()
+        for _ in range(90):
+            histogram.add(0.000100)   # 100 us
+        for _ in range(10):
+            histogram.add(0.010)      # 10 ms
+        # Bucket upper bounds: 128 us, and the maximum for the slow tail
+        self.assertAlmostEqual(histogram.percentile(0.5), 0.000128)
+        self.assertAlmostEqual(histogram.percentile(0.99), 0.010)
+        self.assertEqual(histogram.summary()["count"], 100)
+        self.assertEqual(metrics.Histogram().percentile(0.5), 0.0)
+
+    def test_dump(self):
+        metrics.increment("rfid.frames", 3)
+        metrics.observe("db.query", 0.002)
+        with tempfile.TemporaryDirectory() as tempdir:
+            json_path = metrics.dump(os.path.join(tempdir, "metrics.json"))
+            with open(json_path) as f:
+                self.assertEqual(json.load(f)["counters"], {"rfid.frames": 3})
+            text_path = metrics.dump(os.path.join(tempdir, "metrics.txt"))
+            with open(text_path) as f:
+                text = f.read()
+        self.assertIn("db.query", text)
+        self.assertIn("rfid.frames", text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+from modules import migrations
+from modules.migrations import MIGRATIONS, get_schema_version, run_migrations
+
+
+class MigrationsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.conn = sqlite3.connect(os.path.join(self.tempdir.name, "rental.db"))
+
+    def tearDown(self):
+        self.conn.close()
+        self.tempdir.cleanup()
+
+    def test_fresh_database_reaches_latest_version(self):
+        latest = MIGRATIONS[-1][0]
+        self.assertEqual(run_migrations(self.conn), latest)
+        self.assertEqual(get_schema_version(self.conn), latest)
+        versions = [row[0] for row in self.conn.execute(
+            "SELECT version FROM schema_version ORDER BY version")]
+        self.assertEqual(versions, [version for version, _, _ in MIGRATIONS])
+
+    def test_rerun_is_a_no_op(self):
+        latest = run_migrations(self.conn)
+        self.assertEqual(run_migrations(self.conn), latest)
+        count, = self.conn.execute("SELECT COUNT(*) FROM schema_version").fetchone()
+        self.assertEqual(count, len(MIGRATIONS))
+
+    def test_migration_applied_by_another_process_is_skipped(self):
+        latest = run_migrations(self.conn)
+        # As if this process read the version before another one migrated
+        real = migrations.get_schema_version
+        calls = []
+
+        def stale_first(conn):
+            calls.append(conn)
+            return 0 if len(calls) == 1 else real(conn)
+
+        with mock.patch.object(migrations, "get_schema_version", side_effect=stale_first):
+            self.assertEqual(run_migrations(self.conn), latest)
+        count, = self.conn.execute("SELECT COUNT(*) FROM schema_version").fetchone()
+        self.assertEqual(count, len(MIGRATIONS))
+
+    def test_search_index_created_once_fts5_is_available(self):
+        # Migrated by a SQLite build without FTS5: version recorded, no tables
+        with mock.patch.object(migrations, "_fts5_available", return_value=False):
+            latest = run_migrations(self.conn)
+        self.assertIsNone(self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'products_fts'").fetchone())
+        with self.conn:
+            self.conn.execute("""
+                INSERT INTO products (name, tag_id, category) VALUES ('Drill', 'tag-1', 'Tools')
+            """)
+
+        self.assertEqual(run_migrations(self.conn), latest)
+        rows = self.conn.execute(
+            "SELECT rowid FROM products_fts WHERE products_fts MATCH 'drill'").fetchall()
+        self.assertEqual(len(rows), 1)
+
+    def test_failed_migration_is_rolled_back(self):
+        def broken(cursor):
+            cursor.execute("CREATE TABLE half_done (id INTEGER)")
+            cursor.execute("INSERT INTO no_such_table VALUES (1)")
+
+        with mock.patch.object(migrations, "MIGRATIONS", MIGRATIONS + [(99, "Broken", broken)]):
+            with self.assertRaises(sqlite3.Error):
+                run_migrations(self.conn)
+        self.assertEqual(get_schema_version(self.conn), MIGRATIONS[-1][0])
+        tables = {row[0] for row in self.conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table'")}
+        self.assertNotIn("half_done", tables)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+
+from modules.pricing import (accrued_costs, calculate_rental_cost, parse_db_timestamp,
+                             price_units)
+
+START = "2024-03-01 10:00:00"
+
+
+class PricingTest(unittest.TestCase):
+
+    def test_prorated_cost(self):
+        self.assertEqual(calculate_rental_cost(START, "Per Hour", 100, "2024-03-01 12:30:00"), 250.0)
+        self.assertEqual(calculate_rental_cost(START, "Per Day", 240, "2024-03-02 04:00:00"), 180.0)
+        self.assertEqual(calculate_rental_cost(START, "Per Week", 240, "2024-03-02 04:00:00"), 0)
+        # A clock behind the start time never gives a negative cost
+        self.assertEqual(calculate_rental_cost(START, "Per Hour", 100, "2024-03-01 09:00:00"), 0)
+
+    def test_rules(self):
+        rule = {"minimum_units": 1, "minimum_charge": 150,
+                "tiers": [(0, 1.0), (7, 0.8), (30, 0.6)]}
+        self.assertEqual(price_units(0.5, 100, rule), 150)   # minimum units, then charge
+        self.assertEqual(price_units(10, 100, rule), 700 + 3 * 80)
+        self.assertAlmostEqual(price_units(40, 100, rule), 700 + 23 * 80 + 10 * 60)
+        rules = {"Per Day": {"minimum_units": 1}}
+        self.assertEqual(calculate_rental_cost(START, "Per Day", 240, "2024-03-01 16:00:00",
+                                               rules=rules), 240)
+
+    def test_accrued_costs_match_single_pricing(self):
+        now = parse_db_timestamp("2024-03-01 13:00:00")
+        rentals = [(1, START, "Per Hour", 100), (2, START, "Per Day", 240),
+                   (3, "2024-03-01 12:00:00", "Per Hour", None), (4, None, "Per Hour", 100)]
+        costs = accrued_costs(rentals, now)
+        self.assertEqual(costs, {1: 300.0, 2: 30.0, 3: 0.0, 4: 0})
+        for rental_id, start, rental_type, rate in rentals[:2]:
+            self.assertEqual(costs[rental_id], calculate_rental_cost(
+                start, rental_type, rate, "2024-03-01 13:00:00"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+
+from modules import database
+
+
+class ProductChangesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        database.use_database(os.path.join(self.tempdir.name, "rental.db"))
+        database.add_product("Drill", "tag-1", "Tools", "Available", "Per Day", 100)
+        self.seq = database.fetch_product_changes(None)[0]
+
+    def tearDown(self):
+        database.close_all_connections()
+        database.reset_catalog()
+        self.tempdir.cleanup()
+
+    def test_changes_since_position(self):
+        product = database.lookup_product_by_tag("tag-1")
+        database.update_product_status(product.id, "Not Available")
+        database.add_product("Saw", "tag-2", "Tools", "Available", "Per Hour", 50)
+        seq, rows, deleted_ids = database.fetch_product_changes(self.seq)
+        self.assertEqual(sorted((row.name, row.status) for row in rows),
+                         [("Drill", "Not Available"), ("Saw", "Available")])
+        self.assertEqual(deleted_ids, [])
+
+        database.delete_product(product.id)
+        seq, rows, deleted_ids = database.fetch_product_changes(seq)
+        self.assertEqual((rows, deleted_ids), ([], [product.id]))
+        self.assertEqual(database.fetch_product_changes(seq), (seq, [], []))
+
+    def test_unknown_position_asks_for_a_reload(self):
+        seq, rows, deleted_ids = database.fetch_product_changes(None)
+        self.assertEqual((seq, rows, deleted_ids), (self.seq, None, None))
+
+    def test_log_is_pruned_in_batches(self):
+        conn = database.get_db_connection()
+
+        def log(count):
+            with conn:
+                conn.executemany("INSERT INTO product_changes (product_id) VALUES (?)",
+                                 [(1,)] * count)
+            return conn.execute("SELECT MIN(seq), MAX(seq) FROM product_changes").fetchone()
+
+        min_seq, max_seq = log(10999 - self.seq)
+        # Nothing is trimmed between batches
+        self.assertEqual((min_seq, max_seq), (1, 10999))
+        min_seq, max_seq = log(1)
+        self.assertEqual((min_seq, max_seq), (1001, 11000))
+        # A reader that fell behind the retained log reloads everything
+        self.assertEqual(database.fetch_product_changes(self.seq)[1:], (None, None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import os
+import tempfile
+import unittest
+
+from modules import database
+
+
+class RentalHistoryPageTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        database.use_database(os.path.join(self.tempdir.name, "rental.db"))
+        database.add_product("Drill", "tag-1", "Tools", "Available", "Per Day", 100)
+        product_id = database.lookup_product_by_tag("tag-1").id
+        conn = database.get_db_connection()
+        with conn:
+            # Pairs of rentals share a start time, so pages must break ties by id
+            conn.executemany("""
+                INSERT INTO rentals (product_id, customer_name, phone, place, rental_type,
+                                     rental_duration, start_time)
+                VALUES (?, ?, '9000000000', 'Yard', 'Per Day', 1, ?)
+            """, [(product_id, f"Customer {i}", f"2024-01-{1 + i // 2:02d} 10:00:00")
+                  for i in range(25)])
+
+    def tearDown(self):
+        database.close_all_connections()
+        database.reset_catalog()
+        self.tempdir.cleanup()
+
+    def test_pages_cover_history_once_newest_first(self):
+        pages, after = [], None
+        while True:
+            page = database.fetch_rental_history_page(after, limit=4)
+            if not page:
+                break
+            pages.append(page)
+            after = (page[-1][7], page[-1][0])
+        rows = [row for page in pages for row in page]
+        self.assertEqual(len(pages), 7)
+        self.assertEqual(len(rows), 25)
+        self.assertEqual(len({row[0] for row in rows}), 25)
+        keys = [(row[7], row[0]) for row in rows]
+        self.assertEqual(keys, sorted(keys, reverse=True))
+
+    def test_row_shape(self):
+        row, = database.fetch_rental_history_page(limit=1)
+        self.assertEqual(row[1:4], ("Customer 24", "9000000000", "Drill"))
+        self.assertEqual(row[7], "2024-01-13 10:00:00")
+        self.assertIsNone(row[8])
+
+
+if __name__ == "__main__":
+    unittest.main()
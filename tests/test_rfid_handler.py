@@ -0,0 +1,64 @@
+import os
+import time
+import unittest
+
+from modules.rfid_handler import RFIDReaderThread
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+@unittest.skipUnless(os.name == "posix", "virtual readers need a pseudo-terminal")
+class RFIDReaderThreadTest(unittest.TestCase):
+
+    def test_lost_reader_does_not_stop_the_others(self):
+        from benchmarks.rfid_simulator import VirtualReader, synthetic_tag_frames
+
+        lost, healthy = VirtualReader(), VirtualReader()
+        events, errors = [], []
+        thread = RFIDReaderThread([lost.port, healthy.port], framing="length")
+        thread.set_on_tag_detected_callback(events.append)
+        thread.set_on_error_callback(lambda title, message: errors.append(message))
+        thread.start()
+        try:
+            self.assertTrue(wait_for(lambda: len(thread.readers) == 2))
+            # Unplugging a reader makes its port raise EIO
+            os.close(lost.master_fd)
+            self.assertTrue(wait_for(lambda: errors))
+            os.write(healthy.master_fd, synthetic_tag_frames(1, seed=1)[0])
+            self.assertTrue(wait_for(lambda: events))
+        finally:
+            thread.stop()
+            thread.join()
+            os.close(lost._slave_fd)
+            healthy.close()
+
+        self.assertEqual([event.reader_id for event in events], [healthy.port])
+        self.assertIn(lost.port, errors[0])
+
+    def test_reader_rejecting_every_frame_is_reported(self):
+        from benchmarks.rfid_simulator import VirtualReader
+
+        reader = VirtualReader()
+        errors = []
+        thread = RFIDReaderThread([reader.port], framing="line")
+        thread.set_on_error_callback(lambda title, message: errors.append(message))
+        thread.start()
+        try:
+            self.assertTrue(wait_for(lambda: thread.readers))
+            os.write(reader.master_fd, b"not a tag frame\n" * 25)
+            self.assertTrue(wait_for(lambda: errors))
+        finally:
+            thread.stop()
+            thread.join()
+            reader.close()
+        self.assertEqual(len(errors), 1)
+        self.assertIn("HIDO_RFID_FRAMING", errors[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import os
+import unittest
+from unittest import mock
+
+from modules.rfid_handler import RFIDReaderThread, RFID_FRAMING_ENV, RFID_VERIFY_CHECKSUM_ENV
+from modules.rfid_protocol import (FrameParser, LineParser, build_frame, make_parser,
+                                   MAX_FRAME_LENGTH, TAG_ID_BYTES)
+
+FRAME = build_frame(0x83, bytes(range(0x10, 0x10 + 24)))
+TAG_ID = FRAME[:TAG_ID_BYTES].hex()
+
+
+def with_bad_checksum(frame):
+    corrupted = bytearray(frame)
+    corrupted[-3] ^= 0xFF
+    return bytes(corrupted)
+
+
+class FrameParserTest(unittest.TestCase):
+
+    def test_frames_split_and_packed(self):
+        parser = FrameParser()
+        data = FRAME * 3
+        tag_ids = parser.feed(data[:5]) + parser.feed(data[5:40]) + parser.feed(data[40:])
+        self.assertEqual(tag_ids, [TAG_ID] * 3)
+        self.assertEqual(parser.frames_rejected, 0)
+
+    def test_data_bytes_equal_to_lf(self):
+        frame = build_frame(0x83, b"\n" * 24)
+        self.assertEqual(FrameParser().feed(frame), [frame[:TAG_ID_BYTES].hex()])
+
+    def test_bad_checksum_is_rejected(self):
+        parser = FrameParser()
+        self.assertEqual(parser.feed(with_bad_checksum(FRAME) + FRAME), [TAG_ID])
+        self.assertEqual(parser.frames_rejected, 1)
+
+    def test_checksum_verification_can_be_turned_off(self):
+        parser = FrameParser(verify_checksum=False)
+        self.assertEqual(parser.feed(with_bad_checksum(FRAME)), [TAG_ID])
+
+    def test_frame_too_short_for_a_tag_id_is_rejected(self):
+        parser = FrameParser()
+        # Well formed, but its first 20 bytes would run into checksum and CR LF
+        self.assertEqual(parser.feed(build_frame(0x40, b"\x01\x02") + FRAME), [TAG_ID])
+        self.assertEqual(parser.frames_rejected, 1)
+
+    def test_oversized_length_is_rejected_and_parser_resyncs(self):
+        parser = FrameParser()
+        length = MAX_FRAME_LENGTH + 1
+        bogus = b"\xa5\x5a" + bytes((length >> 8, length & 0xFF)) + bytes(10)
+        self.assertEqual(parser.feed(bogus + FRAME), [TAG_ID])
+        self.assertEqual(parser.frames_rejected, 1)
+
+    def test_lf_only_trailer_is_rejected(self):
+        parser = FrameParser()
+        lf_only = FRAME[:-2] + b"\n"
+        self.assertEqual(parser.feed(lf_only), [])
+
+
+class LineParserTest(unittest.TestCase):
+
+    def test_lines_like_readline(self):
+        parser = LineParser()
+        data = FRAME + FRAME[:-2] + b"\n"
+        tag_ids = parser.feed(data[:7]) + parser.feed(data[7:])
+        self.assertEqual(tag_ids, [TAG_ID, TAG_ID])
+
+    def test_layout_beyond_header_is_not_checked(self):
+        # No length field or checksum to match, as with the original parser
+        line = b"\xa5\x5a" + bytes(range(0x20, 0x40)) + b"\n"
+        self.assertEqual(LineParser().feed(line), [line[:TAG_ID_BYTES].hex()])
+        self.assertEqual(LineParser().feed(with_bad_checksum(FRAME)), [TAG_ID])
+
+    def test_short_and_headerless_lines_are_rejected(self):
+        parser = LineParser()
+        self.assertEqual(parser.feed(b"\xa5\x5a\x01\x02\n" + b"noise\n" + FRAME), [TAG_ID])
+        self.assertEqual(parser.frames_rejected, 2)
+
+    def test_unterminated_data_is_not_buffered_forever(self):
+        parser = LineParser()
+        parser.feed(b"\xa5\x5a" + bytes(MAX_FRAME_LENGTH + 10))
+        self.assertEqual(parser.frames_rejected, 1)
+        self.assertEqual(parser.feed(FRAME), [TAG_ID])
+
+
+class ReaderSettingsTest(unittest.TestCase):
+
+    def test_unknown_framing(self):
+        with self.assertRaises(ValueError):
+            make_parser("xml")
+
+    def test_reader_thread_settings(self):
+        thread = RFIDReaderThread([])
+        self.assertEqual(thread.framing, "line")
+        self.assertTrue(thread.verify_checksum)
+        self.assertFalse(RFIDReaderThread([], verify_checksum=False).verify_checksum)
+        with mock.patch.dict(os.environ, {RFID_FRAMING_ENV: "length",
+                                          RFID_VERIFY_CHECKSUM_ENV: "0"}):
+            thread = RFIDReaderThread([])
+        self.assertEqual(thread.framing, "length")
+        self.assertFalse(thread.verify_checksum)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import json
+import os
+import sqlite3
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from modules import database, scan_journal
+from modules.rfid_handler import TagEvent
+
+
+class ScanJournalTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        database.use_database(os.path.join(self.tempdir.name, "rental.db"))
+        database.add_product("Drill", "tag-1", "Tools", "Available", "Per Day", 100)
+        self.product_id = database.lookup_product_by_tag("tag-1").id
+
+    def tearDown(self):
+        scan_journal.stop_journal()
+        database.close_all_connections()
+        database.reset_catalog()
+        self.tempdir.cleanup()
+
+    def checkout_params(self):
+        return dict(product_id=self.product_id, customer_name="Asha", phone="9000000000",
+                    email=None, vehicle="KL-01", place="Yard", rental_duration=1)
+
+    def entries(self, kind):
+        return database.get_db_connection().execute(
+            "SELECT decision, tag_id, product_id, rental_id, params FROM scan_journal"
+            " WHERE kind = ? ORDER BY id", (kind,)).fetchall()
+
+    def test_actions_are_journaled_with_the_rental(self):
+        rental_id = scan_journal.run_action("checkout", "tag-1", "reader-1",
+                                            **self.checkout_params())
+        scan_journal.run_action("checkin", "tag-1", rental_id=rental_id, total_cost=100.0)
+
+        actions = self.entries("action")
+        self.assertEqual([row[:4] for row in actions],
+                         [("checkout", "tag-1", self.product_id, rental_id),
+                          ("checkin", "tag-1", self.product_id, rental_id)])
+        self.assertEqual(json.loads(actions[0][4])["customer_name"], "Asha")
+        self.assertEqual(json.loads(actions[1][4]), {"total_cost": 100.0})
+
+    def test_action_and_its_entry_roll_back_together(self):
+        with mock.patch.object(database, "_journal_action",
+                               side_effect=sqlite3.OperationalError("disk I/O error")):
+            with self.assertRaises(sqlite3.OperationalError):
+                scan_journal.run_action("checkout", "tag-1", **self.checkout_params())
+        self.assertIsNone(database.fetch_active_rental(self.product_id))
+        self.assertEqual(self.entries("action"), [])
+
+    def test_refused_action_is_journaled_as_rejected(self):
+        database.update_product_status(self.product_id, "Not Available")
+        with self.assertRaises(ValueError):
+            scan_journal.run_action("checkout", "tag-1", **self.checkout_params())
+
+        self.assertEqual(self.entries("action"), [])
+        (decision, tag_id, product_id, _, params), = self.entries("rejected")
+        self.assertEqual((decision, tag_id, product_id), ("checkout", "tag-1", self.product_id))
+        self.assertIn("not available", json.loads(params)["reason"])
+
+    def test_scans_are_written_by_the_writer(self):
+        scan_journal.start_journal(flush_interval=0.5)
+        scan_journal.record_scan(TagEvent("tag-1", "reader-1", time.time()), "received")
+        self.assertEqual(self.entries("scan"), [])
+        scan_journal.stop_journal()
+        self.assertEqual([row[:2] for row in self.entries("scan")], [("received", "tag-1")])
+
+    def test_prune_removes_old_entries(self):
+        old = time.time() - 100 * 86400
+        conn = database.get_db_connection()
+        with conn:
+            conn.executemany("""
+                INSERT INTO scan_journal (recorded_at, kind, decision, tag_id)
+                VALUES (?, 'scan', 'received', 'tag-1')
+            """, [(old,), (time.time(),)])
+        self.assertEqual(scan_journal.prune_journal(), 1)
+        self.assertEqual(len(self.entries("scan")), 1)
+
+    def test_writer_prunes_in_batches(self):
+        old = time.time() - 100 * 86400
+        conn = database.get_db_connection()
+        with conn:
+            conn.executemany("""
+                INSERT INTO scan_journal (recorded_at, kind, decision, tag_id)
+                VALUES (?, 'scan', 'received', 'tag-1')
+            """, [(old,)] * 25)
+        with mock.patch.object(scan_journal, "PRUNE_BATCH", 10):
+            scan_journal.start_journal()
+            deadline = time.monotonic() + 5
+            while time.monotonic() < deadline:
+                remaining, = conn.execute("SELECT COUNT(*) FROM scan_journal").fetchone()
+                if not remaining:
+                    break
+                time.sleep(0.01)
+        self.assertEqual(remaining, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+
+from modules import metrics, scan_trace
+from modules.scan_trace import ScanTrace
+
+
+class ScanTraceTest(unittest.TestCase):
+
+    def setUp(self):
+        scan_trace.clear()
+        self.was_enabled = metrics.enabled
+        metrics.reset()
+
+    def tearDown(self):
+        scan_trace.clear()
+        metrics.enable(self.was_enabled)
+        metrics.reset()
+
+    def trace(self, **stamps):
+        trace = ScanTrace("tag-1", "reader-1", received=0.0)
+        for stage, at in stamps.items():
+            trace.mark(stage, at=at)
+        return trace
+
+    def test_durations_skip_missing_stages(self):
+        trace = self.trace(parsed=0.001, lookup_start=0.004, rendered=0.010)
+        trace.mark("parsed", at=0.5)  # the first stamp wins
+        durations = trace.durations()
+        self.assertEqual(set(durations), {"parsed", "lookup_start", "rendered", "total"})
+        self.assertAlmostEqual(durations["parsed"], 0.001)
+        self.assertAlmostEqual(durations["lookup_start"], 0.003)
+        self.assertAlmostEqual(durations["total"], 0.010)
+
+    def test_module_helpers_ignore_missing_trace(self):
+        scan_trace.mark(None, "parsed")
+        scan_trace.finish(None)
+        self.assertEqual(scan_trace.recent(), [])
+
+    def test_summary_percentiles(self):
+        for ms in range(1, 101):
+            scan_trace.finish(self.trace(parsed=ms / 1000))
+        summary = scan_trace.summary()
+        self.assertEqual(set(summary), {"parsed", "total"})
+        self.assertEqual(summary["parsed"]["count"], 100)
+        self.assertEqual(summary["parsed"]["p50_ms"], 50.0)
+        self.assertEqual(summary["parsed"]["p95_ms"], 95.0)
+        self.assertEqual(summary["total"]["max_ms"], 100.0)
+        self.assertEqual(len(scan_trace.recent(10)), 10)
+
+    def test_ring_buffer_is_bounded(self):
+        for _ in range(scan_trace.TRACE_BUFFER_SIZE + 5):
+            scan_trace.finish(self.trace(parsed=0.001))
+        self.assertEqual(len(scan_trace.recent()), scan_trace.TRACE_BUFFER_SIZE)
+
+    def test_finish_feeds_metrics_when_enabled(self):
+        metrics.enable()
+        scan_trace.finish(self.trace(parsed=0.002, rendered=0.005))
+        timings = metrics.snapshot()["timings"]
+        self.assertEqual(timings["scan.total"]["count"], 1)
+        self.assertIn("scan.rendered", timings)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from modules import database
+
+
+class SearchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        database.use_database(os.path.join(self.tempdir.name, "rental.db"))
+        database.add_product("Concrete Mixer", "tag-1", "Mixers", "Available", "Per Day", 100)
+        database.add_product("Bétonnière", "tag-2", "Mixers", "Available", "Per Day", 120)
+        database.add_product("Plate Compactor", "tag-3", "Compactors", "Available", "Per Hour", 50)
+        product = database.lookup_product_by_tag("tag-1")
+        database.checkout(product.id, "Ramesh Kumar", "9847000001", None, "KL-07-1234",
+                          "Kochi", 1)
+
+    def tearDown(self):
+        database.close_all_connections()
+        database.reset_catalog()
+        self.tempdir.cleanup()
+
+    def product_names(self, text):
+        return sorted(product.name for product in database.search_products(text))
+
+    def check_search(self):
+        self.assertEqual(self.product_names("mix"), ["Bétonnière", "Concrete Mixer"])
+        self.assertEqual(self.product_names("plate comp"), ["Plate Compactor"])
+        self.assertEqual(self.product_names("tag-3"), ["Plate Compactor"])
+        self.assertEqual(self.product_names("excavator"), [])
+        self.assertEqual(database.search_products("  "), [])
+        rentals = database.search_rentals("ram 9847")
+        self.assertEqual([(row[1], row[3]) for row in rentals], [("Ramesh Kumar", "Concrete Mixer")])
+        self.assertEqual(database.search_rentals("kochi")[0][1], "Ramesh Kumar")
+
+    def test_full_text_search(self):
+        self.assertTrue(database._has_search_index())
+        self.check_search()
+        self.assertEqual(self.product_names("betonniere"), ["Bétonnière"])
+
+    def test_index_follows_updates(self):
+        product = database.lookup_product_by_tag("tag-3")
+        database.update_product(product.id, "Road Roller", "tag-3", "Rollers", "Available",
+                                "Per Day", 300)
+        self.assertEqual(self.product_names("compactor"), [])
+        self.assertEqual(self.product_names("roller"), ["Road Roller"])
+        database.delete_product(product.id)
+        self.assertEqual(self.product_names("roller"), [])
+
+    def test_like_fallback_without_fts5(self):
+        with mock.patch.object(database, "_search_indexed", False):
+            self.check_search()
+
+
+if __name__ == "__main__":
+    unittest.main()
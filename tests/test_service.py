@@ -0,0 +1,113 @@
+import asyncio
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from modules import database
+from modules.service import RentalService, HTTPError
+
+
+class RentalServiceTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tempdir.name, "rental.db")
+        database.use_database(self.db_path)
+        database.add_product("Drill", "tag-1", "Tools", "Available", "Per Day", 100)
+        self.service = RentalService(use_rfid=False)
+        self.service.product_seq = database.fetch_product_changes(None)[0]
+        database.get_catalog()
+
+    def tearDown(self):
+        self.service.executor.shutdown(wait=True)
+        self.service.active_rentals.close()
+        database.close_all_connections()
+        database.reset_catalog()
+        self.tempdir.cleanup()
+
+    def add_product_elsewhere(self, tag_id):
+        # As the UI or a bulk import in another process would
+        conn = sqlite3.connect(self.db_path)
+        with conn:
+            conn.execute("""
+                INSERT INTO products (name, tag_id, category, status, rental_type, rental_rate)
+                VALUES ('Saw', ?, 'Tools', 'Available', 'Per Hour', 50)
+            """, (tag_id,))
+        conn.close()
+
+    def test_lookup_finds_product_added_by_another_process(self):
+        self.add_product_elsewhere("tag-saw")
+        result = self.service.handle_lookup("tag-saw")
+        self.assertEqual(result["product"]["name"], "Saw")
+
+    def test_sync_applies_changes_from_another_process(self):
+        self.add_product_elsewhere("tag-saw")
+        self.service.sync_products()
+        self.assertEqual(database.lookup_product_by_tag("tag-saw").name, "Saw")
+
+    def test_unknown_tag_is_not_found(self):
+        with self.assertRaises(HTTPError) as raised:
+            self.service.handle_lookup("tag-unknown")
+        self.assertEqual(raised.exception.status, 404)
+
+    def request(self, raw):
+        """Send a raw HTTP request through handle_connection; returns (status, payload)."""
+        class Writer:
+            data = b""
+
+            def write(self, data):
+                self.data += data
+
+            async def drain(self):
+                pass
+
+            def close(self):
+                pass
+
+        async def run():
+            reader = asyncio.StreamReader()
+            reader.feed_data(raw)
+            reader.feed_eof()
+            writer = Writer()
+            await self.service.handle_connection(reader, writer)
+            return writer.data
+
+        head, _, body = asyncio.run(run()).partition(b"\r\n\r\n")
+        return int(head.split()[1]), json.loads(body)
+
+    def post(self, path, body):
+        data = json.dumps(body).encode()
+        return self.request(f"POST {path} HTTP/1.1\r\nContent-Length: {len(data)}\r\n\r\n".encode()
+                            + data)
+
+    def test_malformed_content_length_is_bad_request(self):
+        for length in ("abc", "-5"):
+            status, payload = self.request(
+                f"POST /checkin HTTP/1.1\r\nContent-Length: {length}\r\n\r\n".encode())
+            self.assertEqual(status, 400, payload)
+
+    def test_invalid_fields_are_bad_request(self):
+        product_id = database.lookup_product_by_tag("tag-1").id
+        checkout = {"product_id": product_id, "customer_name": "Asha", "phone": "9000000000",
+                    "place": "Yard", "rental_duration": 1}
+        for body in ({"rental_id": "1; DROP TABLE rentals"}, {"rental_id": 1, "total_cost": -5},
+                     {"rental_id": 1, "total_cost": "lots"}, {"rental_id": True}):
+            self.assertEqual(self.post("/checkin", body)[0], 400, body)
+        for override in ({"product_id": "x"}, {"rental_duration": 0}, {"rental_duration": 1.5}):
+            self.assertEqual(self.post("/checkout", dict(checkout, **override))[0], 400, override)
+
+    def test_refused_state_changes_are_conflicts(self):
+        product_id = database.lookup_product_by_tag("tag-1").id
+        checkout = {"product_id": product_id, "customer_name": "Asha", "phone": "9000000000",
+                    "place": "Yard", "rental_duration": 1}
+        status, payload = self.post("/checkout", checkout)
+        self.assertEqual(status, 200, payload)
+        self.assertEqual(self.post("/checkout", checkout)[0], 409)
+        self.assertEqual(self.post("/checkin", {"rental_id": payload["rental_id"], "total_cost": 100})[0], 200)
+        self.assertEqual(self.post("/checkin", {"rental_id": payload["rental_id"], "total_cost": 100})[0], 409)
+
+
+if __name__ == "__main__":
+    unittest.main()
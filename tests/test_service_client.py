@@ -0,0 +1,73 @@
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from modules import database
+from modules.rfid_handler import TagEvent
+from modules.service import RentalService
+from modules.service_client import RentalServiceClient, ScanPoller, ServiceError
+
+
+class RentalServiceClientTest(unittest.TestCase):
+    """The client against a RentalService listening on an ephemeral port."""
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        database.use_database(os.path.join(self.tempdir.name, "rental.db"))
+        database.add_product("Drill", "tag-1", "Tools", "Available", "Per Day", 100)
+        self.service = RentalService(use_rfid=False)
+        self.loop = asyncio.new_event_loop()
+        self.server = self.loop.run_until_complete(
+            asyncio.start_server(self.service.handle_connection, "127.0.0.1", 0))
+        port = self.server.sockets[0].getsockname()[1]
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+        self.client = RentalServiceClient(f"http://127.0.0.1:{port}")
+
+    def tearDown(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.server.close()
+        self.service.executor.shutdown(wait=True)
+        self.service.active_rentals.close()
+        database.close_all_connections()
+        database.reset_catalog()
+        self.tempdir.cleanup()
+
+    def test_find_tag_checkout_and_checkin(self):
+        self.assertEqual(self.client.find_tag("tag-unknown"), (None, None))
+        product, rental = self.client.find_tag("tag-1")
+        self.assertEqual((product.name, product.tag_id, product.status), ("Drill", "tag-1", "Available"))
+        self.assertIsNone(rental)
+
+        rental_id = self.client.checkout(product.id, "Asha", "9000000000", None, "KL-01", "Yard", 1)
+        product, rental = self.client.find_tag("tag-1")
+        self.assertEqual((product.status, rental[0]), ("Rented", rental_id))
+        with self.assertRaises(ServiceError) as raised:
+            self.client.checkout(product.id, "Asha", "9000000000", None, "KL-01", "Yard", 1)
+        self.assertEqual(raised.exception.status, 409)
+
+        self.client.checkin(rental_id, 100.0)
+        self.assertEqual(self.client.find_tag("tag-1")[0].status, "Available")
+
+    def test_scan_poller_follows_new_scans(self):
+        self.service.on_tag_detected(TagEvent("tag-old", "reader-1", time.time()))
+        events = []
+        poller = ScanPoller(self.client, events.append, interval=0.01)
+        poller.start()
+        try:
+            deadline = time.monotonic() + 5
+            while time.monotonic() < deadline and not events:
+                self.service.on_tag_detected(TagEvent("tag-1", "reader-1", time.time()))
+                time.sleep(0.05)
+        finally:
+            poller.stop()
+            poller.join()
+        self.assertTrue(events)
+        # Scans from before the poller started are not replayed
+        self.assertEqual({event.tag_id for event in events}, {"tag-1"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import main
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class StartupTest(unittest.TestCase):
+
+    def run_python(self, code, **env):
+        return subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True,
+                              text=True, env=dict(os.environ, **env), check=True).stdout
+
+    def test_importing_the_database_layer_touches_nothing(self):
+        with tempfile.TemporaryDirectory() as tempdir:
+            path = os.path.join(tempdir, "rental.db")
+            output = self.run_python(
+                "import sys\n"
+                "from modules import database, utils\n"
+                "print(database.db_path, 'pytz' in sys.modules)\n"
+                "database.lookup_product_by_tag('tag-1')\n",
+                HIDO_DB_PATH=path)
+            self.assertEqual(output.split(), ["None", "False"])
+            # Created and migrated on the first query
+            self.assertTrue(os.path.exists(path))
+
+    def test_startup_report(self):
+        timer = main.StartupTimer(started=0.0)
+        timer.mark("window created")
+        timer.mark("ui built")
+        report = timer.report().splitlines()
+        self.assertEqual(report[0], "Startup timing:")
+        self.assertEqual([line.split()[0] for line in report[1:]], ["window", "ui"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+
+from modules import database
+
+
+class RentalSummaryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        database.use_database(os.path.join(self.tempdir.name, "rental.db"))
+        database.add_product("Drill", "tag-1", "Tools", "Available", "Per Day", 100)
+        database.add_product("Mixer", "tag-2", "Mixers", "Available", "Per Day", 300)
+        self.conn = database.get_db_connection()
+
+    def tearDown(self):
+        database.close_all_connections()
+        database.reset_catalog()
+        self.tempdir.cleanup()
+
+    def rent(self, tag, hours, cost):
+        product_id = database.lookup_product_by_tag(tag).id
+        rental_id = database.checkout(product_id, "Asha", "9000000000", None, "KL-01", "Yard", 1)
+        with self.conn:
+            self.conn.execute(
+                "UPDATE rentals SET start_time = datetime('now', ?) WHERE id = ?",
+                (f"-{hours} hours", rental_id))
+        database.checkin(rental_id, cost)
+
+    def summary(self):
+        return self.conn.execute("""
+            SELECT day, product_id, category, rental_count, rented_seconds, revenue
+            FROM rental_daily_summary ORDER BY product_id
+        """).fetchall()
+
+    def test_rentals_closed_the_same_day_are_added_up(self):
+        self.rent("tag-1", 2, 100.0)
+        self.rent("tag-1", 3, 150.0)
+        self.rent("tag-2", 1, 300.0)
+        (day, _, category, count, seconds, revenue), mixer = self.summary()
+        self.assertEqual((category, count, revenue), ("Tools", 2, 250.0))
+        self.assertAlmostEqual(seconds, 5 * 3600, delta=5)
+        self.assertEqual(mixer[2:4], ("Mixers", 1))
+
+        by_category = database.fetch_revenue_by_category(day, day)
+        self.assertEqual([(row[1], row[4]) for row in by_category],
+                         [("Mixers", 300.0), ("Tools", 250.0)])
+        self.assertEqual(database.fetch_product_utilization()[0][4], 300.0)
+
+    def test_rebuild_matches_incremental_summary(self):
+        self.rent("tag-1", 2, 100.0)
+        self.rent("tag-2", 4, 300.0)
+        self.rent("tag-1", 1, 50.0)
+        incremental = self.summary()
+        self.assertEqual(database.rebuild_rental_summaries(), 2)
+        self.assertEqual(self.summary(), incremental)
+
+    def test_open_rentals_are_not_summarized(self):
+        product_id = database.lookup_product_by_tag("tag-1").id
+        database.checkout(product_id, "Asha", "9000000000", None, "KL-01", "Yard", 1)
+        self.assertEqual(self.summary(), [])
+        self.assertEqual(database.rebuild_rental_summaries(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+
+from modules.tag_dedup import TagDeduplicator
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TagDeduplicatorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.dedup = TagDeduplicator(window=5.0, max_tags=3, clock=self.clock)
+
+    def test_repeat_inside_window_is_dropped(self):
+        self.assertTrue(self.dedup.accept("tag-1"))
+        self.clock.now += 4.9
+        self.assertFalse(self.dedup.accept("tag-1"))
+        self.assertTrue(self.dedup.accept("tag-2"))
+        self.assertEqual((self.dedup.accepted, self.dedup.dropped), (2, 1))
+
+    def test_window_is_per_tag_and_not_extended_by_repeats(self):
+        self.dedup.accept("tag-1")
+        self.clock.now += 3
+        self.dedup.accept("tag-1")  # dropped, does not restart the window
+        self.clock.now += 2
+        self.assertTrue(self.dedup.accept("tag-1"))
+
+    def test_expired_and_evicted_tags_are_forgotten(self):
+        for tag in ("tag-1", "tag-2", "tag-3", "tag-4"):
+            self.dedup.accept(tag)
+        # Bounded: the oldest tag was evicted
+        self.assertEqual(len(self.dedup), 3)
+        self.assertTrue(self.dedup.accept("tag-1"))
+        self.clock.now += 10
+        self.dedup.accept("tag-5")
+        self.assertEqual(len(self.dedup), 1)
+
+    def test_clear(self):
+        self.dedup.accept("tag-1")
+        self.dedup.clear()
+        self.assertTrue(self.dedup.accept("tag-1"))
+
+
+if __name__ == "__main__":
+    unittest.main()
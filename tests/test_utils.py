@@ -0,0 +1,25 @@
+import unittest
+
+from modules.utils import format_time_to_ist, format_times_to_ist
+
+
+class FormatTimesTest(unittest.TestCase):
+
+    def test_converts_utc_to_ist(self):
+        self.assertEqual(format_time_to_ist("2024-03-01 20:45:10"), "2024-03-02 02:15 AM")
+        self.assertEqual(format_time_to_ist(None), "N/A")
+
+    def test_batch_matches_single_conversion(self):
+        timestamps = ["2024-03-01 20:45:10", "", None, "2024-03-01 20:45:59",
+                      "2024-12-31 18:30:00"]
+        self.assertEqual(format_times_to_ist(timestamps),
+                         [format_time_to_ist(timestamp) for timestamp in timestamps])
+        self.assertEqual(format_times_to_ist(timestamps)[4], "2025-01-01 12:00 AM")
+
+    def test_other_zones(self):
+        self.assertEqual(format_times_to_ist(["2024-07-01 12:00:00"], "Europe/London"),
+                         ["2024-07-01 01:00 PM"])
+
+
+if __name__ == "__main__":
+    unittest.main()